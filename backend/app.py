@@ -11,6 +11,8 @@ Features:
   - User feedback collection
   - Error handling middleware
   - Response caching for performance
+  - Precomputed recommendation cube for common profile segments
+  - Zero-copy match results merged at JSON-encode time
   - Health monitoring with uptime stats
   - API versioning ready
 """
@@ -22,12 +24,15 @@ import logging
 from datetime import datetime, timedelta
 from functools import wraps
 from collections import defaultdict
+from collections.abc import Mapping
 
 from flask import Flask, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 from data_loader import DataLoader
-from matching_engine import MatchingEngine
+from matching_engine import MatchingEngine, MatchConfig
+from recommendation_cube import RecommendationCube
 from chatbot import GovSchemeBot
 from utils import (
     translate_schemes,
@@ -42,7 +47,20 @@ from utils import (
 # APP CONFIGURATION
 # ──────────────────────────────────────────────
 
+class SchemeJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes read-only match results (MatchedScheme)"""
+
+    @staticmethod
+    def default(o):
+        if hasattr(o, 'for_json'):
+            return o.for_json()
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+
 app = Flask(__name__)
+app.json = SchemeJSONProvider(app)
 CORS(app, resources={
     r"/api/*": {
         "origins": "*",
@@ -319,7 +337,21 @@ data_loader = DataLoader()
 all_schemes = data_loader.get_all_schemes()
 
 matcher = MatchingEngine(all_schemes)
-chatbot = GovSchemeBot(schemes=all_schemes)
+
+# Shared on-disk cube (CUBE_PATH), built at deploy time with
+# `python recommendation_cube.py --build`. Workers only load a current file;
+# building here (seconds, in every worker) is opt-in: RECOMMENDATION_CUBE_BUILD=true
+recommendation_cube = None
+if os.environ.get('RECOMMENDATION_CUBE', 'true').lower() == 'true':
+    try:
+        if os.environ.get('RECOMMENDATION_CUBE_BUILD', 'false').lower() == 'true':
+            recommendation_cube = RecommendationCube.load_or_build(matcher)
+        else:
+            recommendation_cube = RecommendationCube.load_current(matcher)
+    except Exception as e:
+        logger.error(f"Recommendation cube unavailable: {e}")
+
+chatbot = GovSchemeBot(schemes=all_schemes, matcher=matcher)
 
 analytics = Analytics()
 rate_limiter = RateLimiter(max_requests=100, window_seconds=60)
@@ -330,6 +362,10 @@ print(f"📊 Loaded {len(all_schemes)} schemes")
 print(f"🤖 Chatbot ready: {chatbot.is_ready}")
 print(f"🛡️  Rate limiter: 100 req/min per IP")
 print(f"💾 Cache TTL: 300s")
+if recommendation_cube is not None:
+    print(f"🧊 Recommendation cube: {len(recommendation_cube)} segments")
+else:
+    print("🧊 Recommendation cube: off (live matching only)")
 print("=" * 55)
 print("✅ All systems ready!\n")
 
@@ -394,6 +430,7 @@ def not_found(error):
             "GET  /",
             "GET  /api/health",
             "POST /api/recommend",
+            "POST /api/recommend/explain",
             "POST /api/chat",
             "POST /api/chat/reset",
             "GET  /api/chat/info",
@@ -449,6 +486,7 @@ def home():
         "endpoints": {
             "core": [
                 "POST /api/recommend → Get scheme recommendations",
+                "POST /api/recommend/explain → Reasons behind one recommendation",
                 "POST /api/chat → Chat with AI assistant",
                 "GET  /api/schemes → Browse all schemes",
                 "GET  /api/schemes/<id> → Scheme details",
@@ -499,6 +537,10 @@ def health_check():
                 "schemes_indexed": len(chatbot.schemes) if chatbot.schemes else 0
             },
             "cache": cache.stats(),
+            "recommendation_cube": (
+                recommendation_cube.stats() if recommendation_cube is not None
+                else {"status": "disabled"}
+            ),
             "rate_limiter": {
                 "max_requests_per_minute": rate_limiter.max_requests
             }
@@ -529,6 +571,14 @@ def recommend_schemes():
         "is_farmer": true,
         "language": "en"
     }
+
+    Paging: add "page_size" to get the first page of the full ranked list
+    plus a "next_cursor"; send {"cursor": ...} with the same profile fields
+    for the next page. The profile behind a cursor is only remembered by
+    the worker that served page one, so clients always resend it: a cursor
+    sent alone to another worker gets 410 profile_unavailable. With more
+    than one worker set the same PROFILE_DIGEST_KEY in each; a cursor issued
+    under another key gets 400 invalid_cursor.
     """
     try:
         user_data = request.json
@@ -539,6 +589,9 @@ def recommend_schemes():
                 "message": "Please send user profile as JSON body"
             }), 400
 
+        if isinstance(user_data, dict) and ('cursor' in user_data or 'page_size' in user_data):
+            return _recommend_page(user_data)
+
         # Sanitize input
         user_data = sanitizer.sanitize_user_data(user_data)
 
@@ -565,8 +618,12 @@ def recommend_schemes():
             cached['from_cache'] = True
             return jsonify(cached)
 
-        # Find matches
-        matched_schemes = matcher.find_matches(user_data)
+        # Find matches (exact segment hits come straight from the cube)
+        matched_schemes = None
+        if recommendation_cube is not None:
+            matched_schemes = recommendation_cube.lookup(matcher, user_data)
+        if matched_schemes is None:
+            matched_schemes = matcher.find_matches(user_data)
 
         # Track which schemes were recommended
         scheme_ids = [s.get('id', '') for s in matched_schemes]
@@ -611,6 +668,71 @@ def recommend_schemes():
         }), 500
 
 
+PAGE_ERROR_STATUS = {
+    'invalid_cursor': 400,
+    'missing_profile': 400,
+    'profile_mismatch': 400,
+    'stale_catalog': 409,
+    'profile_unavailable': 410
+}
+
+
+def _recommend_page(user_data):
+    """One page of recommendations (first page, or the page a cursor points at)"""
+    user_data = dict(user_data)
+    cursor = user_data.pop('cursor', None)
+    page_size = user_data.pop('page_size', None)
+    if page_size is not None and (
+        not isinstance(page_size, int) or isinstance(page_size, bool)
+        or not 1 <= page_size <= MatchConfig.ABSOLUTE_MAX_RESULTS
+    ):
+        return jsonify({
+            "error": "Validation failed",
+            "details": [f"page_size must be between 1 and {MatchConfig.ABSOLUTE_MAX_RESULTS}"],
+            "message": "Please fix the errors and try again"
+        }), 400
+
+    user_data = sanitizer.sanitize_user_data(user_data)
+    language = user_data.get('language', 'en')
+
+    # With a cursor the profile may be left out, but only the worker that
+    # served page one remembers it (410 profile_unavailable elsewhere)
+    profile = user_data if any(key != 'language' for key in user_data) else None
+    if cursor is None:
+        errors = validate_user_input(user_data)
+        if errors:
+            return jsonify({
+                "error": "Validation failed",
+                "details": errors,
+                "message": "Please fix the errors and try again"
+            }), 400
+        analytics.track_language(language)
+        if user_data.get('state'):
+            analytics.track_state(user_data['state'])
+
+    page = matcher.find_matches_page(profile, cursor=cursor, page_size=page_size)
+    if 'error' in page:
+        return jsonify(page), PAGE_ERROR_STATUS.get(page['reason'], 400)
+
+    matched_schemes = page['matches']
+    analytics.track_recommendations([s.get('id', '') for s in matched_schemes])
+    if language != 'en':
+        matched_schemes = translate_schemes(matched_schemes, language)
+
+    response_data = {
+        "success": True,
+        "total_matches": page['total_matches'],
+        "schemes": matched_schemes,
+        "offset": page['offset'],
+        "page_size": page['page_size'],
+        "next_cursor": page['next_cursor'],
+        "request_id": g.get('request_id')
+    }
+    if cursor is None:
+        response_data["tips"] = _get_recommendation_tips(user_data, matched_schemes)
+    return jsonify(response_data)
+
+
 def _get_recommendation_tips(user_data, schemes):
     """Generate helpful tips based on results"""
     tips = []
@@ -640,6 +762,63 @@ def _get_recommendation_tips(user_data, schemes):
     return tips
 
 
+EXPLAIN_ERROR_STATUS = {
+    'invalid_token': 400,
+    'profile_mismatch': 400,
+    'scheme_not_found': 404,
+    'stale_catalog': 409,
+    'profile_unavailable': 410
+}
+
+
+@app.route('/api/recommend/explain', methods=['POST'])
+def explain_recommendation():
+    """
+    Match reasons, score breakdown and adjustments for one recommendation,
+    built on demand (the recommend path itself skips all of this)
+
+    Expected JSON body:
+    {
+        "token": "<explanation_token from /api/recommend>",
+        "user_profile": {...}   // same profile sent to /api/recommend
+    }
+
+    Send user_profile with every token: only the worker that matched the
+    profile remembers it, so a token alone may get 410 profile_unavailable.
+    With more than one worker PROFILE_DIGEST_KEY is required (same value in
+    every worker): a token digested under another worker's key gets
+    400 invalid_token.
+    """
+    try:
+        data = request.json
+        if not data or not data.get('token'):
+            return jsonify({
+                "error": "Missing token in request body"
+            }), 400
+
+        user_profile = data.get('user_profile')
+        if user_profile:
+            user_profile = sanitizer.sanitize_user_data(user_profile)
+
+        explanation = matcher.explain_match(data['token'], user_profile or None)
+        if 'error' in explanation:
+            return jsonify(explanation), EXPLAIN_ERROR_STATUS.get(explanation['reason'], 400)
+
+        return jsonify({
+            "success": True,
+            **explanation
+        })
+
+    except Exception as e:
+        analytics.track_error('/api/recommend/explain', str(e))
+        logger.error(f"Explanation error: {e}")
+        return jsonify({
+            "error": "Processing failed",
+            "message": "Unable to explain this recommendation. Please try again.",
+            "request_id": g.get('request_id')
+        }), 500
+
+
 # ──────────────────────────────────────────────
 # 🤖 CHATBOT ENDPOINTS
 # ──────────────────────────────────────────────
@@ -730,7 +909,7 @@ def reset_chat():
             request.remote_addr or
             'default'
         )
-        chatbot.memory.clear_session(session_id)
+        chatbot.clear_session(session_id)
         return jsonify({
             "success": True,
             "message": "Chat session reset successfully",
@@ -1021,6 +1200,11 @@ def check_eligibility():
         },
         "scheme_ids": ["pm-kisan", "ayushman-bharat"]   // optional
     }
+
+    Up to MatchConfig.MAX_ELIGIBILITY_IDS ids are checked in one vectorized
+    call; "truncated" is set when more were sent. Each result's match_score
+    is the base score (as before); final_score is the score with the
+    boosts/penalties applied, as /api/recommend reports it.
     """
     try:
         data = request.json
@@ -1034,39 +1218,25 @@ def check_eligibility():
 
         # If specific schemes requested
         if scheme_ids:
-            results = []
-            for sid in scheme_ids[:20]:  # Max 20 at once
-                scheme = data_loader.get_scheme_by_id(sid)
-                if not scheme:
-                    results.append({
-                        "scheme_id": sid,
-                        "found": False,
-                        "eligible": False,
-                        "reason": "Scheme not found"
-                    })
-                    continue
-
-                elig = scheme.get('eligibility', {})
-                eligible = matcher._pass_hard_filters(user_profile, elig)
-
-                score = 0
-                if eligible:
-                    score = matcher.scorer.calculate_score(user_profile, elig)
-
-                reasons = _get_eligibility_reasons(user_profile, elig)
-
-                results.append({
-                    "scheme_id": sid,
-                    "scheme_name": scheme.get('name', ''),
-                    "found": True,
-                    "eligible": eligible,
-                    "match_score": score if eligible else 0,
-                    "reasons": reasons
-                })
+            if not isinstance(scheme_ids, list):
+                return jsonify({
+                    "error": "scheme_ids must be a list"
+                }), 400
+
+            limit = MatchConfig.MAX_ELIGIBILITY_IDS
+            results = matcher.check_eligibility_many(user_profile, scheme_ids[:limit])
+            for result in results:
+                if result['found']:
+                    result['reasons'] = _get_eligibility_reasons(
+                        user_profile, result.pop('eligibility')
+                    )
+                else:
+                    result['reason'] = result.pop('error')
 
             return jsonify({
                 "success": True,
                 "results": results,
+                "truncated": len(scheme_ids) > limit,
                 "user_profile": user_profile
             })
 
@@ -1300,7 +1470,9 @@ def full_analytics():
     return jsonify({
         "success": True,
         "analytics": analytics.get_summary(),
-        "cache_stats": cache.stats()
+        "cache_stats": cache.stats(),
+        "matching_stages": matcher.get_performance_stats()['stages'],
+        "matching_filter_order": matcher.get_filter_order()
     })
 
 
@@ -8,6 +8,9 @@ Features:
   - Follow-up question handling
   - Detailed scheme info on demand
   - Eligibility checker via chat
+  - Personal recommendations ranked by the matching engine (same as the
+    recommendation form), re-matched incrementally as the session profile
+    fills in; a basic profile filter when no engine is passed
   - Multi-language support
 """
 
@@ -341,7 +344,15 @@ class EntityExtractor:
 class GovSchemeBot:
     """Enhanced chatbot with scheme awareness and conversation memory"""
 
-    def __init__(self, schemes=None):
+    def __init__(self, schemes=None, matcher=None):
+        """
+        Args:
+            schemes: scheme list (default: loaded from schemes.json)
+            matcher: MatchingEngine for personal recommendations (ranked
+                exactly as /api/recommend, re-matched incrementally per
+                session). Without one they use SchemeSearcher's basic
+                profile filter instead, and a warning says so.
+        """
         self.model = None
         self.vectorizer = None
         self.intents = []
@@ -350,10 +361,15 @@ class GovSchemeBot:
         self.schemes = schemes or []
         self.searcher = None
         self.extractor = EntityExtractor()
+        self.matcher = matcher
 
         self.load_model()
         self._load_schemes_if_needed()
 
+        if self.matcher is None:
+            print("⚠️  Chatbot has no matching engine: personal recommendations "
+                  "use the basic profile filter")
+
     def _load_schemes_if_needed(self):
         """Load schemes from JSON if not passed during init"""
         if not self.schemes:
@@ -448,7 +464,7 @@ class GovSchemeBot:
 
         # Reset conversation
         if msg_lower in ['reset', 'start over', 'clear', 'new chat']:
-            self.memory.clear_session(session_id)
+            self.clear_session(session_id)
             return ("🔄 Conversation reset! Let's start fresh.\n\n"
                     "I'm Saarthi AI. I can help you:\n"
                     "• Find government schemes for you\n"
@@ -668,6 +684,24 @@ class GovSchemeBot:
 
         return base_response
 
+    def clear_session(self, session_id):
+        """Forget a session's memory and its matching state"""
+        self.memory.clear_session(session_id)
+        if self.matcher is not None:
+            self.matcher.end_session(session_id)
+
+    def _match_profile(self, session_id, profile):
+        """
+        Personal matches for a session profile: the matching engine when one
+        was given (only the fields changed since the session's last match are
+        re-matched), else SchemeSearcher's basic profile filter
+        """
+        if self.matcher is not None:
+            return self.matcher.find_session_matches(session_id, profile, max_results=8)
+        if self.searcher:
+            return self.searcher.get_for_user_profile(profile)
+        return []
+
     def _personal_recommendations(self, session_id, context):
         """Give personalized recommendations based on collected info"""
         user_info = self.memory.get_user_info(session_id)
@@ -683,28 +717,27 @@ class GovSchemeBot:
                     "\"I am a 25 year old farmer from Bihar\"\n\n"
                     "Or fill the form above for the best results! 😊")
 
-        if self.searcher:
-            results = self.searcher.get_for_user_profile(merged)
-            if results:
-                self.memory.set_last_schemes(session_id, results[:8])
-                header = "🎯 Based on your profile, here are matching schemes"
-                response = self._format_scheme_list(results[:8], header=header)
-
-                # Show what info we used
-                response += "\n\n📊 **Your profile I used:**\n"
-                if merged.get('age'):
-                    response += f"• Age: {merged['age']}\n"
-                if merged.get('state'):
-                    response += f"• State: {merged['state']}\n"
-                if merged.get('occupation'):
-                    response += f"• Occupation: {merged['occupation']}\n"
-                if merged.get('gender'):
-                    response += f"• Gender: {merged['gender']}\n"
-                if merged.get('category'):
-                    response += f"• Category: {merged['category'].upper()}\n"
-
-                response += "\n💡 *Tell me more about yourself for better results, or fill the form above!*"
-                return response
+        results = self._match_profile(session_id, merged)
+        if results:
+            self.memory.set_last_schemes(session_id, results[:8])
+            header = "🎯 Based on your profile, here are matching schemes"
+            response = self._format_scheme_list(results[:8], header=header)
+
+            # Show what info we used
+            response += "\n\n📊 **Your profile I used:**\n"
+            if merged.get('age'):
+                response += f"• Age: {merged['age']}\n"
+            if merged.get('state'):
+                response += f"• State: {merged['state']}\n"
+            if merged.get('occupation'):
+                response += f"• Occupation: {merged['occupation']}\n"
+            if merged.get('gender'):
+                response += f"• Gender: {merged['gender']}\n"
+            if merged.get('category'):
+                response += f"• Category: {merged['category'].upper()}\n"
+
+            response += "\n💡 *Tell me more about yourself for better results, or fill the form above!*"
+            return response
 
         return ("Based on what I know, I couldn't find specific matches. "
                 "Please fill the recommendation form above for accurate results!")
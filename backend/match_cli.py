@@ -0,0 +1,356 @@
+"""
+Saarthi AI - Batch Matching CLI
+===============================
+Screen beneficiary exports offline, without the Flask app.
+
+Features:
+  - Reads JSONL or CSV profiles from a file or stdin, as a stream
+  - Validates every row with validate_user_input_detailed (invalid rows are
+    reported in place, not dropped)
+  - Matches in chunks with the vectorized batch matcher (optionally across
+    worker processes) and writes JSONL results incrementally, in input order
+  - Constant memory regardless of input size (one chunk in flight,
+    fixed-size latency histogram)
+  - Summary on stderr: rows/sec and p50/p99 per-profile latency
+
+Usage:
+    python match_cli.py beneficiaries.jsonl -o matches.jsonl
+    python match_cli.py export.csv --max-results 5 --min-score 50
+    cat profiles.jsonl | python match_cli.py - --workers 8 > matches.jsonl
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import time
+import logging
+import argparse
+import contextlib
+
+from data_loader import DataLoader
+from matching_engine import MatchingEngine, MatchConfig
+from utils import validate_user_input_detailed
+
+logger = logging.getLogger('GovSchemeAI.MatchCLI')
+
+
+# ──────────────────────────────────────────────
+# INPUT
+# ──────────────────────────────────────────────
+
+def detect_format(path, fmt='auto'):
+    """'jsonl' or 'csv' from the explicit format or the file extension"""
+    if fmt != 'auto':
+        return fmt
+    if path and path != '-' and os.path.splitext(path)[1].lower() == '.csv':
+        return 'csv'
+    return 'jsonl'
+
+
+def read_profiles(stream, fmt):
+    """
+    Yield (row_number, profile_or_None, parse_error) one row at a time.
+    Row numbers are 1-based data rows (CSV header excluded); blank JSONL
+    lines are skipped.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row_number, row in enumerate(reader, start=1):
+            # Empty CSV cells mean "not provided"
+            yield row_number, {k: v for k, v in row.items() if k and v not in (None, '')}, None
+        return
+
+    row_number = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            profile = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(profile, dict):
+            yield row_number, None, "Row must be a JSON object"
+            continue
+        yield row_number, profile, None
+
+
+def validate_row(profile):
+    """
+    Validate one raw row.
+    Returns: (matchable profile or None, errors, warnings)
+    """
+    try:
+        result = validate_user_input_detailed(profile)
+    except (AttributeError, TypeError) as e:
+        # e.g. a non-string gender/state in a JSONL row
+        return None, [{"field": "data", "message": f"Malformed field: {e}"}], []
+    if not result.is_valid:
+        return None, result.errors, result.warnings
+    return {**profile, **result.sanitized_data}, [], result.warnings
+
+
+# ──────────────────────────────────────────────
+# LATENCY HISTOGRAM
+# ──────────────────────────────────────────────
+
+class LatencyHistogram:
+    """
+    Fixed-size log-bucketed histogram (constant memory for any row count).
+    Buckets grow by GROWTH (≈2.5% relative error) from MIN_MS up to MAX_MS.
+    """
+
+    MIN_MS = 0.001
+    MAX_MS = 600000.0
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.size = int(math.log(self.MAX_MS / self.MIN_MS, self.GROWTH)) + 2
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, value_ms):
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        if value_ms <= self.MIN_MS:
+            bucket = 0
+        else:
+            bucket = min(int(math.log(value_ms / self.MIN_MS, self.GROWTH)) + 1, self.size - 1)
+        self.counts[bucket] += 1
+
+    def percentile(self, p):
+        """Upper edge of the bucket holding the p-th percentile (ms)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.MIN_MS * self.GROWTH ** bucket, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / max(self.count, 1), 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3)
+        }
+
+
+# ──────────────────────────────────────────────
+# BATCH RUNNER
+# ──────────────────────────────────────────────
+
+class BatchRunner:
+    """
+    Streams rows → validated chunks → ranked matches → JSONL lines.
+
+    A chunk is flushed every chunk_size rows, valid or not, so at most one
+    chunk is held in memory. Per-profile latency is measured from the
+    moment a row is read to the moment its result line is written, so it
+    includes the time the row waits for its chunk to fill (lower
+    --chunk-size trades throughput for latency).
+    """
+
+    def __init__(self, engine, output, max_results=10, min_score=None,
+                 category_filter=None, type_filter=None, chunk_size=None,
+                 pool=None, include_warnings=False):
+        self.engine = engine
+        self.output = output
+        self.max_results = max_results
+        self.min_score = min_score
+        self.category_filter = category_filter
+        self.type_filter = type_filter
+        self.chunk_size = chunk_size or MatchConfig.BATCH_CHUNK_SIZE
+        self.pool = pool
+        self.include_warnings = include_warnings
+        self.latency = LatencyHistogram()
+
+        # Stats
+        self.rows = 0
+        self.valid = 0
+        self.invalid = 0
+        self.with_matches = 0
+        self.results = 0
+
+    def run(self, rows):
+        """Consume (row_number, profile, parse_error) tuples; returns summary dict"""
+        start_time = time.time()
+        pending = []        # (row_number, read_at, profile, errors, warnings)
+
+        for row_number, profile, parse_error in rows:
+            read_at = time.perf_counter()
+            self.rows += 1
+            if parse_error:
+                errors, warnings = [{"field": "data", "message": parse_error}], []
+                matchable = None
+            else:
+                matchable, errors, warnings = validate_row(profile)
+
+            pending.append((row_number, read_at, matchable, errors, warnings))
+            # Invalid rows count toward the chunk too: a long run of bad rows
+            # must keep streaming out instead of piling up in memory
+            if len(pending) >= self.chunk_size:
+                self._flush(pending)
+                pending = []
+
+        if pending:
+            self._flush(pending)
+
+        elapsed = time.time() - start_time
+        return {
+            "rows": self.rows,
+            "valid": self.valid,
+            "invalid": self.invalid,
+            "profiles_with_matches": self.with_matches,
+            "results": self.results,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else 0,
+            "latency": self.latency.summary()
+        }
+
+    def _flush(self, pending):
+        """Match the chunk's valid profiles and write one line per row, in order"""
+        profiles = [matchable for _, _, matchable, _, _ in pending if matchable is not None]
+        matches = [[] for _ in profiles]
+        if profiles:
+            source = self.pool.iter_matches if self.pool else self.engine.iter_batch_matches
+            for match in source(profiles, self.max_results, self.min_score,
+                                self.category_filter, self.type_filter):
+                matches[match.profile_index].append({
+                    "scheme_id": match.scheme_id,
+                    "score": match.score,
+                    "tier": match.tier
+                })
+
+        lines = []
+        valid_position = 0
+        for row_number, _, matchable, errors, warnings in pending:
+            record = {"row": row_number, "valid": matchable is not None}
+            if matchable is None:
+                self.invalid += 1
+                record["errors"] = [e["message"] for e in errors]
+            else:
+                self.valid += 1
+                row_matches = matches[valid_position]
+                valid_position += 1
+                self.results += len(row_matches)
+                if row_matches:
+                    self.with_matches += 1
+                if 'id' in matchable:
+                    record["id"] = matchable['id']
+                record["total_matches"] = len(row_matches)
+                record["matches"] = row_matches
+            if self.include_warnings and warnings:
+                record["warnings"] = [w["message"] for w in warnings]
+            lines.append(json.dumps(record, ensure_ascii=False))
+
+        self.output.write("\n".join(lines) + "\n")
+        self.output.flush()
+
+        written_at = time.perf_counter()
+        for _, read_at, _, _, _ in pending:
+            self.latency.add((written_at - read_at) * 1000)
+
+
+# ──────────────────────────────────────────────
+# ENTRY POINT
+# ──────────────────────────────────────────────
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='match_cli.py',
+        description='Match beneficiary profiles against the scheme catalog (JSONL out).'
+    )
+    parser.add_argument('input', nargs='?', default='-',
+                        help="JSONL/CSV file of profiles, or '-' for stdin (default)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="JSONL results file, or '-' for stdout (default)")
+    parser.add_argument('--format', choices=('auto', 'jsonl', 'csv'), default='auto',
+                        help='input format (default: from extension, jsonl for stdin)')
+    parser.add_argument('--schemes', default=None,
+                        help='schemes.json to match against (default: bundled catalog)')
+    parser.add_argument('--max-results', type=int, default=10,
+                        help='matches per profile (default: 10)')
+    parser.add_argument('--min-score', type=int, default=None,
+                        help=f'minimum match score (default: {MatchConfig.MIN_MATCH_SCORE})')
+    parser.add_argument('--category', default=None, help='only match this scheme category')
+    parser.add_argument('--type', dest='type_filter', choices=('central', 'state'), default=None,
+                        help='only match central or state schemes')
+    parser.add_argument('--chunk-size', type=int, default=MatchConfig.BATCH_CHUNK_SIZE,
+                        help=f'rows per chunk (default: {MatchConfig.BATCH_CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes (default: 1 = in-process)')
+    parser.add_argument('--warnings', action='store_true',
+                        help='include validation warnings in the output')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no summary on stderr')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    # DataLoader reports progress with print(); keep stdout for results
+    with contextlib.redirect_stdout(sys.stderr):
+        loader = DataLoader(file_path=args.schemes)
+        schemes = loader.get_all_schemes()
+    if not schemes:
+        print("❌ No schemes loaded", file=sys.stderr)
+        return 2
+    engine = MatchingEngine(schemes)
+
+    fmt = detect_format(args.input, args.format)
+    with contextlib.ExitStack() as stack:
+        if args.input == '-':
+            source = sys.stdin
+        else:
+            source = stack.enter_context(open(args.input, 'r', encoding='utf-8', newline=''))
+        if args.output == '-':
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(args.output, 'w', encoding='utf-8'))
+
+        pool = None
+        if args.workers > 1:
+            from parallel_batch import ParallelBatchMatcher
+            pool = stack.enter_context(ParallelBatchMatcher(
+                engine, workers=args.workers,
+                shard_size=max(args.chunk_size // args.workers, 1)
+            ))
+
+        runner = BatchRunner(
+            engine, output,
+            max_results=args.max_results, min_score=args.min_score,
+            category_filter=args.category, type_filter=args.type_filter,
+            chunk_size=args.chunk_size, pool=pool, include_warnings=args.warnings
+        )
+        summary = runner.run(read_profiles(source, fmt))
+
+    if not args.quiet:
+        latency = summary['latency']
+        print(
+            f"✅ {summary['rows']:,} rows ({summary['valid']:,} valid, "
+            f"{summary['invalid']:,} invalid) in {summary['elapsed_s']}s → "
+            f"{summary['rows_per_second']:,} rows/sec\n"
+            f"   {summary['profiles_with_matches']:,} profiles matched, "
+            f"{summary['results']:,} results\n"
+            f"   Latency per profile: p50 {latency['p50_ms']}ms, "
+            f"p99 {latency['p99_ms']}ms, max {latency['max_ms']}ms",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
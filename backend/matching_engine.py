@@ -3,29 +3,75 @@ Matching Engine v3.0 - Intelligent Scheme Matching Brain
 ========================================================
 Features:
   - Multi-tier filtering (hard → soft → boost)
+  - Columnar eligibility matrix (NumPy) for vectorized hard filtering
+  - Inverted bitmap indexes (state, gender, occupation, ...) for candidate pruning
   - Configurable matching thresholds
-  - Match explanation / reasoning for each scheme
+  - Match explanation / reasoning for each scheme (eager, or deferred via
+    explanation tokens and explain_match)
+  - Zero-copy results (read-only overlay on the shared scheme record)
   - Priority-based sorting (score + relevance tiers)
+  - Top-k heap selection with per-scheme score upper bounds (skips hopeless scoring)
+  - Cursor pagination over the full ranked list (cached once as compact
+    scheme positions + scores; each page costs only its own results)
+  - Tokens and cursors carry a keyed profile digest (PROFILE_DIGEST_KEY),
+    never a plain hash of the profile; clients resend the profile when a
+    token reaches a worker that never saw it, and workers share the key
+    (a digest under another key is rejected as invalid)
+  - Delta re-matching for chat sessions (only the profile fields that changed
+    are re-filtered and re-scored; the ranking is updated in place)
   - Batch matching for multiple users
+  - Vectorized batch mode (profiles × schemes) with compact results
+  - Compiled catalog as one swappable unit (shareable with batch worker processes)
   - Profile completeness scoring
   - Filter analytics (tracks why schemes are rejected)
+  - Adaptive hard-filter order (short-circuit checks re-sorted by measured
+    cost per rejection)
+  - Compiled per-scheme predicates and score programs (eligibility is read
+    once at catalog load, not on every match)
   - Category-wise best matches
   - Comparison engine (compare 2+ schemes for a user)
-  - Cached results with invalidation
-  - Performance tracking
+  - O(1) scheme lookup by id and bulk eligibility checks (one vectorized pass)
+  - Bounded LRU/TTL result cache (entry + byte budget) with atomic invalidation
+  - Canonical profile keys (catalog-derived equivalence classes) for cache hits
+  - Incremental catalog updates (diffed, patched in place of a full rebuild; only
+    cache entries that could surface a changed scheme are dropped)
+  - Performance tracking (per-stage latency histograms with p50/p95/p99)
   - Debug mode with detailed logs
 """
 
+import os
+import sys
+import json
+import base64
+import math
 import time
+import heapq
+import bisect
+import hashlib
 import logging
-from copy import deepcopy
-from collections import defaultdict
+import secrets
+import threading
+from types import MappingProxyType
+from collections import OrderedDict, defaultdict, namedtuple
+from collections.abc import Mapping
 
-from scoring import ScoringEngine
+import numpy as np
+
+from scoring import ScoringEngine, ScoringColumns, CategoricalColumn
 
 logger = logging.getLogger('GovSchemeAI.MatchingEngine')
 
 
+# Key for the profile digests in explanation tokens and page cursors.
+# Random per process, so with several workers PROFILE_DIGEST_KEY must be
+# set (same value everywhere): tokens under another key are rejected.
+PROFILE_DIGEST_KEY = (
+    hashlib.blake2b(os.environ['PROFILE_DIGEST_KEY'].encode('utf-8'), digest_size=32).digest()
+    if os.environ.get('PROFILE_DIGEST_KEY') else secrets.token_bytes(32)
+)
+PROFILE_KEY_ID = hashlib.blake2b(PROFILE_DIGEST_KEY, digest_size=3).hexdigest()
+
+
 class MatchConfig:
     """Centralized configuration for matching behavior"""
 
@@ -37,6 +83,35 @@ class MatchConfig:
     # Result limits
     DEFAULT_MAX_RESULTS = 20
     ABSOLUTE_MAX_RESULTS = 100
+    MAX_ELIGIBILITY_IDS = 500       # scheme ids per check_eligibility_many request
+
+    # Top-k mode: bound every candidate's score and only fully score schemes
+    # that can still enter the top max_results (debug always scores everything).
+    # Below TOPK_MIN_CANDIDATES survivors, bounding costs more than it saves.
+    TOPK_PRUNING = True
+    TOPK_MIN_CANDIDATES = 32
+
+    # Vectorized batch mode: profiles scored per chunk (bounds matrix memory)
+    BATCH_CHUNK_SIZE = 2048
+
+    # Result cache bounds (LRU eviction past either limit; TTL None = no expiry)
+    CACHE_MAX_ENTRIES = 2048
+    CACHE_MAX_BYTES = 64 * 1024 * 1024
+    CACHE_TTL_SECONDS = None
+
+    # Adaptive hard-filter order: re-sorted by cost per rejection every N matches
+    ADAPTIVE_FILTER_ORDER = True
+    FILTER_REPLAN_INTERVAL = 256
+
+    # Score survivors with per-scheme programs compiled from the catalog
+    # (same scores as ScoringEngine.calculate_score, without re-reading eligibility)
+    COMPILED_SCORING = True
+
+    # Deferred explanations: recently matched profiles kept for explain_match()
+    EXPLAIN_PROFILES = 1024
+
+    # Chat sessions: per-scheme match state kept for each session's last profile
+    SESSION_STATES = 1024
 
     # Boost values (added to base score)
     BOOST_BPL = 5                   # BPL users get slight priority
@@ -77,6 +152,82 @@ class FilterReason:
     LOW_SCORE = "low_score"
 
 
+def _read_only(value):
+    """Read-only view of a nested catalog value (lists → tuples, dicts → proxies)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_read_only(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    return value
+
+
+class MatchedScheme(Mapping):
+    """
+    Read-only match result: the shared scheme record plus a small overlay
+    (match_score, match_tier, match_reasons, ...). Nothing is copied when the
+    result is built; JSON encoders merge both layers via for_json().
+
+    Lookups return read-only views of nested lists/dicts so callers can't
+    mutate the catalog through a result. copy() gives a plain mutable dict
+    for callers that want to add or replace top-level keys.
+    """
+
+    __slots__ = ('_scheme', '_overlay')
+
+    def __init__(self, scheme, overlay):
+        self._scheme = scheme
+        self._overlay = overlay
+
+    def __getitem__(self, key):
+        if key in self._overlay:
+            return self._overlay[key]
+        return _read_only(self._scheme[key])
+
+    def __contains__(self, key):
+        return key in self._overlay or key in self._scheme
+
+    def __iter__(self):
+        yield from self._scheme
+        for key in self._overlay:
+            if key not in self._scheme:
+                yield key
+
+    def __len__(self):
+        return len(self._scheme) + sum(1 for key in self._overlay if key not in self._scheme)
+
+    def __eq__(self, other):
+        if isinstance(other, MatchedScheme):
+            return self.for_json() == other.for_json()
+        if isinstance(other, Mapping):
+            return self.for_json() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    @property
+    def scheme(self):
+        """The underlying catalog record (treat as read-only)"""
+        return self._scheme
+
+    def copy(self):
+        """Mutable top-level dict; nested catalog values stay read-only views"""
+        merged = {key: _read_only(value) for key, value in self._scheme.items()}
+        merged.update(self._overlay)
+        return merged
+
+    def for_json(self):
+        """Merged plain dict for serialization (shares nested values, do not mutate)"""
+        merged = dict(self._scheme)
+        merged.update(self._overlay)
+        return merged
+
+    def __repr__(self):
+        return (
+            f"<MatchedScheme: {self._scheme.get('id', '?')} "
+            f"+{sorted(self._overlay)}>"
+        )
+
+
 class MatchResult:
     """Structured result for a single scheme match"""
 
@@ -97,11 +248,1424 @@ class MatchResult:
             return "partial"
 
     def to_dict(self):
-        result = deepcopy(self.scheme)
-        result['match_score'] = self.score
-        result['match_tier'] = self.tier
-        result['match_reasons'] = self.reasons
-        return result
+        return MatchedScheme(self.scheme, {
+            'match_score': self.score,
+            'match_tier': self.tier,
+            'match_reasons': self.reasons
+        })
+
+
+# Compact batch result: one row per (profile, matched scheme)
+BatchMatch = namedtuple('BatchMatch', ['profile_index', 'scheme_id', 'score', 'tier'])
+
+# Full ranked match list kept in the result cache for paging: catalog
+# positions and final scores in find_matches() order
+MatchRanking = namedtuple('MatchRanking', ['positions', 'scores'])
+
+# Everything MatchingEngine compiles from a catalog (swapped in as one unit);
+# signatures: scheme id → (ranking digest, full-record digest)
+CompiledCatalog = namedtuple(
+    'CompiledCatalog',
+    ['version', 'eligibility', 'index', 'scoring_columns', 'canonical', 'signatures']
+)
+
+# Scheme-level difference between two catalogs (tuples of scheme ids).
+# ranking_changed: eligibility / URL / description / category / type differ,
+# so the scheme may enter or leave results; payload_changed: other fields only
+CatalogDiff = namedtuple(
+    'CatalogDiff', ['added', 'removed', 'ranking_changed', 'payload_changed']
+)
+
+
+class EligibilityMatrix:
+    """
+    Columnar hard-filter table compiled once per catalog load.
+
+    Each scheme's eligibility becomes one row across NumPy columns
+    (age bounds, income cap, gender code, BPL flag, state bitmask), so a
+    profile is screened against the whole catalog with a handful of array
+    comparisons. Semantics mirror MatchingEngine._pass_hard_filters exactly,
+    including which FilterReason wins when several checks fail.
+
+    Screening yields a failure bitmask per scheme (bit code-1 set for every
+    failing check); reason codes are its lowest set bit. Near misses are
+    read from the same masks (see near_miss_masks), so matches and near
+    misses come from one evaluation.
+    """
+
+    # Reason codes: index into REASONS, 0 = passed all hard filters
+    PASSED = 0
+    REASONS = (
+        None,
+        FilterReason.STATE_MISMATCH,
+        FilterReason.GENDER_MISMATCH,
+        FilterReason.AGE_TOO_YOUNG,
+        FilterReason.AGE_TOO_OLD,
+        FilterReason.INCOME_TOO_HIGH,
+        FilterReason.BPL_REQUIRED,
+    )
+    STATE_CODE, GENDER_CODE, YOUNG_CODE, OLD_CODE, INCOME_CODE, BPL_CODE = range(1, 7)
+
+    # Bits of the checks find_near_misses recounts (BPL is not recounted)
+    RECOUNT_BITS = (1 << (BPL_CODE - 1)) - 1
+    GENDER_BIT = 1 << (GENDER_CODE - 1)
+
+    # Failure bitmask → reason code of its earliest failing check (0 = passed)
+    FIRST_FAILURE = np.array(
+        [0] + [(mask & -mask).bit_length() for mask in range(1, 1 << 6)], dtype=np.int8
+    )
+
+    # Sentinels for "no limit" so missing bounds never trigger
+    NO_LOWER = int(np.iinfo(np.int64).min)
+    NO_UPPER = int(np.iinfo(np.int64).max)
+
+    # Per-scheme columns and the value new rows start from
+    COLUMNS = (
+        ('min_age', np.int64, NO_LOWER),
+        ('max_age', np.int64, NO_UPPER),
+        ('max_income', np.int64, NO_UPPER),
+        ('gender', np.int16, 0),            # 0 = open to all
+        ('bpl_required', bool, False),
+        ('all_states', bool, False),
+        ('women_only', bool, False),
+        ('has_url', bool, False),
+        ('has_description', bool, False),
+        ('recount_scalar', bool, False),    # near-miss recount can't use the columns
+    )
+
+    def __init__(self, schemes):
+        self.size = 0
+        for name, dtype, _ in self.COLUMNS:
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self.state_bits = np.zeros((0, 1), dtype=np.uint64)    # packed state bitmask
+        self.occupations = []       # lowered exact-match sets, per scheme
+        self.categories = []
+        self.state_sets = []        # state bit positions listed, per scheme
+        self.predicates = []        # compiled scalar check, per scheme
+
+        self._gender_codes = {}     # lowered requirement → code (1-based)
+        self._state_ids = {}        # state name → bit position
+
+        self._grow(len(schemes))
+        for i, scheme in enumerate(schemes):
+            self._compile_scheme(i, scheme)
+
+    def _grow(self, size):
+        """Copy every column to `size` rows; new rows start unconstrained"""
+        extra = size - self.size
+        for name, dtype, default in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.full(extra, default, dtype=dtype)]))
+        self.state_bits = np.vstack([
+            self.state_bits,
+            np.zeros((extra, self.state_bits.shape[1]), dtype=np.uint64)
+        ])
+        self.occupations = self.occupations + [frozenset()] * extra
+        self.categories = self.categories + [frozenset()] * extra
+        self.state_sets = self.state_sets + [frozenset()] * extra
+        self.predicates = self.predicates + [None] * extra
+        self.size = size
+
+    def _state_bit(self, state):
+        """Bit position for a state, widening the packed bitmask when needed"""
+        bit = self._state_ids.setdefault(state, len(self._state_ids))
+        if bit >> 6 >= self.state_bits.shape[1]:
+            self.state_bits = np.hstack([
+                self.state_bits, np.zeros((self.size, 1), dtype=np.uint64)
+            ])
+        return bit
+
+    def _compile_scheme(self, i, scheme):
+        """(Re)write row i from one scheme"""
+        eligibility = scheme.get('eligibility', {})
+        for name, _, default in self.COLUMNS:
+            getattr(self, name)[i] = default
+        self.state_bits[i] = 0
+
+        states = eligibility.get('states', 'all')
+        if isinstance(states, str) and states != 'all':
+            states = [states]
+        if isinstance(states, list):
+            bits = set()
+            for state in states:
+                bit = self._state_bit(state)
+                self.state_bits[i, bit >> 6] |= np.uint64(1 << (bit & 63))
+                bits.add(bit)
+            self.state_sets[i] = frozenset(bits)
+        else:
+            self.all_states[i] = True
+            self.state_sets[i] = frozenset()
+
+        gender_req = eligibility.get('gender', 'all')
+        if gender_req != 'all':
+            key = str(gender_req).lower()
+            self.gender[i] = self._gender_codes.setdefault(
+                key, len(self._gender_codes) + 1
+            )
+
+        if eligibility.get('min_age') is not None:
+            self.min_age[i] = int(eligibility['min_age'])
+        if eligibility.get('max_age') is not None:
+            self.max_age[i] = int(eligibility['max_age'])
+        if eligibility.get('max_income') is not None:
+            self.max_income[i] = int(eligibility['max_income'])
+
+        self.bpl_required[i] = eligibility.get('is_bpl') is True
+
+        # The near-miss recount compares truthy limits uncast and tests other
+        # state values by list membership; rows where that can disagree with
+        # the cast columns are recounted one by one
+        self.recount_scalar[i] = (
+            not isinstance(states, (list, str))
+            or not isinstance(gender_req, str)
+            or not all(
+                self._plain_limit(eligibility.get(key), positive)
+                for key, positive in (('min_age', False), ('max_age', False), ('max_income', True))
+            )
+        )
+
+        # Columns read by TIER 3 adjustments (batch path)
+        self.women_only[i] = eligibility.get('gender') == 'female'
+        self.has_url[i] = bool(scheme.get('url'))
+        self.has_description[i] = bool(scheme.get('description'))
+        self.occupations[i] = frozenset(o.lower() for o in eligibility.get('occupation') or ())
+        self.categories[i] = frozenset(c.lower() for c in eligibility.get('category') or ())
+        self.predicates[i] = self._compile_predicate(i)
+
+    @staticmethod
+    def _plain_limit(value, positive):
+        """Unset, or a non-zero whole number (> 0 when positive) that casts exactly"""
+        if value is None:
+            return True
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return value != 0 and value == int(value) and (value > 0 or not positive)
+
+    def _compile_predicate(self, i):
+        """
+        Row i as a scalar closure over its pre-cast limits and state-id set:
+        encoded profile → reason code (the one FIRST_FAILURE gives the row).
+        Used where a handful of schemes are checked one at a time.
+        """
+        all_states = bool(self.all_states[i])
+        states = self.state_sets[i]
+        gender = int(self.gender[i])
+        min_age, max_age = int(self.min_age[i]), int(self.max_age[i])
+        max_income = int(self.max_income[i])
+        bpl_required = bool(self.bpl_required[i])
+        passed, state_code, gender_code, young_code, old_code, income_code, bpl_code = (
+            self.PASSED, self.STATE_CODE, self.GENDER_CODE, self.YOUNG_CODE,
+            self.OLD_CODE, self.INCOME_CODE, self.BPL_CODE
+        )
+
+        def predicate(user):
+            state_id, user_gender, age, income, bpl = user
+            if not all_states and state_id not in states:
+                return state_code
+            if gender and user_gender and user_gender != gender:
+                return gender_code
+            if age < min_age:
+                return young_code
+            if age > max_age:
+                return old_code
+            if income > 0 and income > max_income:
+                return income_code
+            if bpl_required and not bpl:
+                return bpl_code
+            return passed
+
+        return predicate
+
+    def __getstate__(self):
+        """Picklable state (e.g. for shared batch catalogs): predicates are closures"""
+        state = self.__dict__.copy()
+        del state['predicates']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.predicates = [self._compile_predicate(i) for i in range(self.size)]
+
+    def patched(self, schemes, positions):
+        """
+        Copy of this matrix for an updated catalog in which only `positions`
+        changed (rows past the current size are appended). Unchanged rows are
+        copied, not recompiled; the original stays valid for in-flight matches.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._gender_codes = dict(self._gender_codes)
+        clone._state_ids = dict(self._state_ids)
+        clone._grow(len(schemes))
+        for i in positions:
+            clone._compile_scheme(i, schemes[i])
+        return clone
+
+    # ──────────────────────────────────────────────
+    # PROFILE ENCODING
+    # ──────────────────────────────────────────────
+
+    def encode_profile(self, user):
+        """
+        Reduce a profile to the scalars the hard filters look at.
+        Returns: (state_id, gender_code, age, income, is_bpl)
+        """
+        state_id = self._state_ids.get(user.get('state', ''), -1)
+        gender_code = self._gender_code(user.get('gender', ''))
+
+        age = self._clamp(MatchingEngine._safe_int(user.get('age', 0)))
+        income = self._clamp(MatchingEngine._safe_int(user.get('annual_income', 0)))
+
+        user_bpl = user.get('is_bpl', False)
+        if isinstance(user_bpl, str):
+            user_bpl = user_bpl.lower() == 'true'
+
+        return state_id, gender_code, age, income, bool(user_bpl)
+
+    def _gender_code(self, gender):
+        """Requirement code a profile gender compares against (0 = not given, -1 = unknown)"""
+        user_gender = gender.lower()
+        return self._gender_codes.get(user_gender, -1) if user_gender else 0
+
+    def encode_columns(self, columns):
+        """
+        encode_profiles for a columnar population (see ScoringEngine.encode_columns):
+        state and gender codes are resolved once per distinct value.
+        Returns: (state_ids, gender_codes, ages, incomes, is_bpl) arrays
+        """
+        states, genders = columns['state'], columns['gender']
+        state_ids = np.array([self._state_ids.get(state, -1) for state in states.values], dtype=np.int64)
+        gender_codes = np.array([self._gender_code(gender) for gender in genders.values], dtype=np.int64)
+        clamp = (self.NO_LOWER + 1, self.NO_UPPER - 1)
+        return (
+            states.take(state_ids),
+            genders.take(gender_codes),
+            np.clip(np.asarray(columns['age'], dtype=np.int64), *clamp),
+            np.clip(np.asarray(columns['annual_income'], dtype=np.int64), *clamp),
+            np.asarray(columns['is_bpl'], dtype=bool),
+        )
+
+    def encode_profiles(self, users):
+        """
+        Column-wise encode_profile for many profiles.
+        Returns: (state_ids, gender_codes, ages, incomes, is_bpl) arrays
+        """
+        rows = [self.encode_profile(user) for user in users]
+        state_ids, gender_codes, ages, incomes, bpl = zip(*rows) if rows else ((),) * 5
+        return (
+            np.asarray(state_ids, dtype=np.int64),
+            np.asarray(gender_codes, dtype=np.int64),
+            np.asarray(ages, dtype=np.int64),
+            np.asarray(incomes, dtype=np.int64),
+            np.asarray(bpl, dtype=bool),
+        )
+
+    def _clamp(self, value):
+        return max(self.NO_LOWER + 1, min(value, self.NO_UPPER - 1))
+
+    # ──────────────────────────────────────────────
+    # SCREENING
+    # ──────────────────────────────────────────────
+
+    def state_member(self, state_ids):
+        """
+        Boolean matrix (profiles × schemes): scheme lists the profile's state.
+        Unknown states (id -1) are never members.
+        """
+        state_ids = np.asarray(state_ids, dtype=np.int64)
+        known = state_ids >= 0
+        bits = np.where(known, state_ids, 0)
+        words = self.state_bits[:, bits >> 6].T
+        shift = (bits & 63).astype(np.uint64)[:, None]
+        member = ((words >> shift) & np.uint64(1)).astype(bool)
+        return member & known[:, None]
+
+    def reason_codes(self, user):
+        """
+        Screen one profile against every scheme.
+        Returns: int8 array, 0 where the scheme passes, else a REASONS index
+        """
+        return self.FIRST_FAILURE[self.failure_masks(user)]
+
+    def failure_masks(self, user):
+        """
+        Screen one profile against every scheme.
+        Returns: uint8 array of failure bitmasks (0 = passed)
+        """
+        return self.failure_mask_matrix(self.encode_profiles([user]))[0]
+
+    def reason_code_matrix(self, encoded):
+        """
+        Screen many encoded profiles against every scheme in one pass.
+        Returns: int8 matrix (profiles × schemes) of REASONS indexes
+        """
+        return self.FIRST_FAILURE[self.failure_mask_matrix(encoded)]
+
+    def failure_mask_matrix(self, encoded):
+        """
+        Every hard-filter check for many encoded profiles, in one pass.
+        Returns: uint8 matrix (profiles × schemes), bit (code - 1) set per failing check
+        """
+        state_ids, gender_codes, ages, incomes, bpl = (col[:, None] for col in encoded)
+        failures = (
+            (~(self.all_states | self.state_member(encoded[0])), self.STATE_CODE),
+            ((gender_codes != 0) & (self.gender != 0) & (self.gender != gender_codes),
+             self.GENDER_CODE),
+            (ages < self.min_age, self.YOUNG_CODE),
+            (ages > self.max_age, self.OLD_CODE),
+            ((incomes > 0) & (incomes > self.max_income), self.INCOME_CODE),
+            (~bpl & self.bpl_required, self.BPL_CODE),
+        )
+        masks = np.zeros((len(state_ids), self.size), dtype=np.uint8)
+        for failed, code in failures:
+            masks |= failed.astype(np.uint8) << np.uint8(code - 1)
+        return masks
+
+    def check_subset(self, code, user, positions):
+        """
+        One hard-filter check for one encoded profile over some schemes.
+        Returns: boolean array (True = fails), or None when it can't fail
+        (e.g. no income given, or the profile holds a BPL card)
+        """
+        state_id, gender_code, age, income, bpl = user
+        if code == self.STATE_CODE:
+            passed = self.all_states[positions]
+            if state_id >= 0:
+                words = self.state_bits[positions, state_id >> 6]
+                passed = passed | ((words >> np.uint64(state_id & 63)) & np.uint64(1)).astype(bool)
+            return ~passed
+        if code == self.GENDER_CODE:
+            if gender_code == 0:
+                return None
+            genders = self.gender[positions]
+            return (genders != 0) & (genders != gender_code)
+        if code == self.YOUNG_CODE:
+            return self.min_age[positions] > age
+        if code == self.OLD_CODE:
+            return self.max_age[positions] < age
+        if code == self.INCOME_CODE:
+            return None if income <= 0 else self.max_income[positions] < income
+        return None if bpl else self.bpl_required[positions]
+
+    def screen_ordered(self, user, positions, order, skip=()):
+        """
+        Short-circuit screening of one encoded profile: checks run in `order`,
+        each only over the schemes every earlier check passed. Rejected
+        schemes still get their canonical reason (lowest failing code, as
+        FIRST_FAILURE would give) by re-running only the lower-coded checks
+        they skipped. Checks in `skip` are known to pass (e.g. bitmap-pruned).
+
+        Returns: (passing positions in catalog order, int8 reason codes of the
+                  rejected schemes, [(code, checked, rejected, ns) per check run])
+        """
+        clock = time.perf_counter_ns
+        alive = positions
+        groups = []             # (code, rejected positions, checks they passed)
+        observations = []
+        passed_checks = set(skip)
+        for code in order:
+            if code in passed_checks:
+                continue
+            if not len(alive):
+                break
+            started = clock()
+            failed = self.check_subset(code, user, alive)
+            checked, rejected = len(alive), 0
+            if failed is not None and failed.any():
+                groups.append((code, alive[failed], frozenset(passed_checks)))
+                alive = alive[~failed]
+                rejected = checked - len(alive)
+            observations.append((code, checked, rejected, clock() - started))
+            passed_checks.add(code)
+
+        reasons = []
+        for code, rejected, known in groups:
+            codes = np.full(len(rejected), code, dtype=np.int8)
+            for earlier in range(code - 1, 0, -1):      # lowest failing code wins
+                if earlier not in known:
+                    failed = self.check_subset(earlier, user, rejected)
+                    if failed is not None:
+                        codes[failed] = earlier
+            reasons.append(codes)
+        reason_codes = np.concatenate(reasons) if reasons else np.empty(0, dtype=np.int8)
+        return alive, reason_codes, observations
+
+    @staticmethod
+    def single_failures(masks):
+        """Boolean array: exactly one hard-filter check failed"""
+        return (masks != 0) & ((masks & (masks - 1)) == 0)
+
+    def near_miss_masks(self, masks, user):
+        """
+        find_near_misses' recount of a screening pass: schemes that fail the
+        hard filters keep their state / gender / age / income bits (BPL isn't
+        recounted), and a blank gender counts against gender-restricted
+        schemes. Rows flagged recount_scalar must be recounted in Python.
+        Returns: uint8 recount bitmasks, 0 for schemes that pass
+        """
+        recount = masks & np.uint8(self.RECOUNT_BITS)
+        if not user.get('gender', '').lower():
+            recount |= np.where(self.gender != 0, np.uint8(self.GENDER_BIT), np.uint8(0))
+        return np.where(masks != 0, recount, np.uint8(0))
+
+    def exact_matches(self, column, values):
+        """
+        Boolean matrix (profiles × schemes): lowered value is in the scheme's
+        'occupations' or 'categories' set. Empty values never match.
+        """
+        sets = getattr(self, column)
+        if not isinstance(values, CategoricalColumn):
+            values = CategoricalColumn.factorize(values)
+
+        table = np.array(
+            [[bool(value) and value in allowed for allowed in sets] for value in values.values],
+            dtype=bool
+        ).reshape(len(values.values), self.size)
+        return values.take(table)
+
+    def screen(self, user):
+        """
+        Vectorized equivalent of _pass_hard_filters over the whole catalog.
+        Returns: (passed: bool array, reasons: list of FilterReason or None)
+        """
+        codes = self.reason_codes(user)
+        return codes == self.PASSED, [self.REASONS[c] for c in codes.tolist()]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return (
+            f"<EligibilityMatrix: {self.size} schemes, "
+            f"{len(self._state_ids)} states, {len(self._gender_codes)} genders>"
+        )
+
+
+class SchemeBitmapIndex:
+    """
+    Inverted bitmap indexes over the catalog, built once per load.
+
+    For every indexed attribute value there is one Python-int bitmap with
+    bit i set when scheme i accepts that value (unconstrained schemes are
+    folded into an "open" bitmap that every lookup ORs in). A profile's
+    candidate set is then a handful of bitwise AND/ORs.
+
+    Only state and gender prune candidates: they are the first two hard
+    filters, so pruned schemes map exactly onto STATE/GENDER rejections.
+    Occupation, social category and is_farmer are scored rather than
+    filtered in this engine, so their indexes are exposed for lookups and
+    statistics but never drop a scheme.
+    """
+
+    ATTRIBUTES = ('state', 'gender', 'occupation', 'social_category',
+                  'is_farmer', 'bpl_required', 'category', 'type')
+    PRUNING = ('state', 'gender')
+
+    def __init__(self, schemes):
+        self.size = len(schemes)
+        self.universe = (1 << self.size) - 1
+        self.bitmaps = {attribute: {} for attribute in self.ATTRIBUTES}
+        self.open = {attribute: 0 for attribute in self.ATTRIBUTES}
+
+        for i, scheme in enumerate(schemes):
+            self._index_scheme(i, scheme)
+
+    def _index_scheme(self, i, scheme):
+        bit = 1 << i
+        eligibility = scheme.get('eligibility', {})
+
+        states = eligibility.get('states', 'all')
+        if isinstance(states, list):
+            for state in states:
+                self._set('state', state, bit)
+        elif isinstance(states, str) and states != 'all':
+            self._set('state', states, bit)
+        else:
+            self.open['state'] |= bit
+
+        gender_req = eligibility.get('gender', 'all')
+        if gender_req == 'all':
+            self.open['gender'] |= bit
+        else:
+            self._set('gender', str(gender_req).lower(), bit)
+
+        self._index_values('occupation', eligibility.get('occupation'), bit)
+        self._index_values('social_category', eligibility.get('category'), bit)
+
+        farmer = eligibility.get('is_farmer')
+        if farmer is None:
+            self.open['is_farmer'] |= bit
+        else:
+            self._set('is_farmer', bool(farmer), bit)
+
+        self._set('bpl_required', eligibility.get('is_bpl') is True, bit)
+        self._set('category', scheme.get('category', '').lower(), bit)
+        self._set('type', scheme.get('type', '').lower(), bit)
+
+    def _set(self, attribute, key, bit):
+        maps = self.bitmaps[attribute]
+        maps[key] = maps.get(key, 0) | bit
+
+    def _index_values(self, attribute, values, bit):
+        if not values:
+            self.open[attribute] |= bit
+            return
+        for value in values:
+            self._set(attribute, str(value).lower(), bit)
+
+    def patched(self, schemes, positions):
+        """
+        Copy of this index for an updated catalog in which only `positions`
+        changed (positions past the current size are appended): their bits
+        are cleared everywhere and re-indexed, every other bitmap is kept.
+        """
+        clone = object.__new__(type(self))
+        clone.size = len(schemes)
+        clone.universe = (1 << clone.size) - 1
+        clone.bitmaps = {attribute: dict(maps) for attribute, maps in self.bitmaps.items()}
+        clone.open = dict(self.open)
+
+        cleared = sum(1 << i for i in positions)
+        for attribute in self.ATTRIBUTES:
+            clone.open[attribute] &= ~cleared
+            maps = clone.bitmaps[attribute]
+            for key, bits in list(maps.items()):
+                if bits & cleared:
+                    bits &= ~cleared
+                    if bits:
+                        maps[key] = bits
+                    else:
+                        del maps[key]
+        for i in positions:
+            clone._index_scheme(i, schemes[i])
+        return clone
+
+    # ──────────────────────────────────────────────
+    # LOOKUPS
+    # ──────────────────────────────────────────────
+
+    def lookup(self, attribute, value):
+        """Bitmap of schemes that accept this value (including unconstrained ones)"""
+        return self.bitmaps[attribute].get(value, 0) | self.open[attribute]
+
+    def pre_filter(self, category_filter=None, type_filter=None):
+        """Bitmap of schemes in the requested catalog category / type"""
+        bits = self.universe
+        if category_filter:
+            bits &= self.bitmaps['category'].get(category_filter.lower(), 0)
+        if type_filter:
+            bits &= self.bitmaps['type'].get(type_filter.lower(), 0)
+        return bits
+
+    def state_gender_pass(self, user):
+        """
+        Bitmaps of schemes passing the state and gender hard filters,
+        with _pass_hard_filters semantics (blank gender passes everything)
+        """
+        state_ok = self.lookup('state', user.get('state', ''))
+        user_gender = user.get('gender', '').lower()
+        gender_ok = self.lookup('gender', user_gender) if user_gender else self.universe
+        return state_ok, gender_ok
+
+    def positions(self, bits):
+        """Sorted scheme positions of the set bits"""
+        if not bits:
+            return np.empty(0, dtype=np.intp)
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder='little')[:self.size])
+
+    # ──────────────────────────────────────────────
+    # STATISTICS
+    # ──────────────────────────────────────────────
+
+    def stats(self):
+        """Per-attribute cardinality and selectivity (share of catalog a lookup keeps)"""
+        total = max(self.size, 1)
+        report = {}
+        for attribute in self.ATTRIBUTES:
+            maps = self.bitmaps[attribute]
+            open_count = self.open[attribute].bit_count()
+            kept = {
+                str(key): (bits | self.open[attribute]).bit_count()
+                for key, bits in maps.items()
+            }
+            report[attribute] = {
+                "cardinality": len(maps),
+                "unconstrained": open_count,
+                "prunes_candidates": attribute in self.PRUNING,
+                "avg_selectivity": round(
+                    sum(kept.values()) / (len(kept) * total), 3
+                ) if kept else 1.0,
+                "unknown_value_selectivity": round(open_count / total, 3),
+                "top_keys": dict(sorted(kept.items(), key=lambda kv: -kv[1])[:5])
+            }
+        return report
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return (
+            f"<SchemeBitmapIndex: {self.size} schemes, "
+            + ", ".join(f"{a}:{len(self.bitmaps[a])}" for a in self.ATTRIBUTES)
+            + ">"
+        )
+
+
+class ProfileCanonicalizer:
+    """
+    Maps profiles to equivalence-class keys for the result cache.
+
+    Two profiles share a key only if every hard filter, scoring gradient,
+    bonus, penalty and adjustment sees them identically, so they provably
+    produce the same find_matches() output:
+      - income: integer intervals between the catalog's breakpoints, i.e.
+        where any max_income comparison or _score_income ratio band
+        (0.5 / 0.8 / 1.0 / +10%) flips, evaluated with the scorer's own
+        float expressions
+      - age: runs of consecutive ages whose hard-filter outcomes and
+        _score_age gradients agree for every distinct age range (the
+        senior-citizen cutoff included)
+      - state / category / occupation: values the catalog names are kept
+        as-is; any other value is keyed by a digest of its exact per-scheme
+        scoring gradients (so e.g. unlisted states without listed neighbours
+        all share one class)
+      - gender: the lowercase form every check uses
+      - flags: every way a flag is parsed (hard filter, bonuses, flag match)
+    """
+
+    KEY_FIELDS = ('age', 'gender', 'state', 'category', 'annual_income', 'occupation')
+    FLAG_FIELDS = ('is_bpl', 'is_farmer', 'is_student', 'disability')
+    SENIOR_AGE = 60
+
+    # Cap on memoized signatures for values the catalog doesn't name
+    MAX_SIGNATURES = 4096
+
+    def __init__(self, schemes, scorer, columns):
+        eligibilities = [scheme.get('eligibility', {}) for scheme in schemes]
+        self.scorer = scorer
+        self.columns = columns
+        self.income_breakpoints = self._income_breakpoints(eligibilities)
+        self.age_limit, self.age_classes = self._age_classes(eligibilities, scorer)
+        self.known = self._known_values(eligibilities)
+        self._signatures = {}
+
+        # Unlisted-value digests cover the scheme id sequence too, so a class
+        # label can't be reused across catalogs whose rows mean different schemes
+        self._layout = hashlib.blake2b(
+            '\x1f'.join(str(scheme.get('id')) for scheme in schemes).encode('utf-8'),
+            digest_size=16
+        ).digest()
+
+    # ──────────────────────────────────────────────
+    # CLASS CONSTRUCTION
+    # ──────────────────────────────────────────────
+
+    @classmethod
+    def _income_breakpoints(cls, eligibilities):
+        """Sorted incomes (≥1) at which some income comparison changes value"""
+        limits = {
+            elig['max_income'] for elig in eligibilities
+            if elig.get('max_income') is not None and elig['max_income'] > 0
+        }
+        breakpoints = set()
+        for limit in limits:
+            hard_limit = int(limit)
+            predicates = (
+                lambda x, m=limit: x / m <= 0.5,
+                lambda x, m=limit: x / m <= 0.8,
+                lambda x, m=limit: x <= m,
+                lambda x, m=limit: (x - m) / m <= 0.1,
+                lambda x, m=hard_limit: x > m,
+            )
+            upper = int(limit * 2) + 2
+            for predicate in predicates:
+                flip = cls._first_flip(predicate, 1, upper)
+                if flip is not None:
+                    breakpoints.add(flip)
+        return sorted(breakpoints)
+
+    @staticmethod
+    def _first_flip(predicate, low, high):
+        """Smallest x in (low, high] where a monotone predicate differs from predicate(low)"""
+        start = predicate(low)
+        if predicate(high) == start:
+            return None
+        while high - low > 1:
+            mid = (low + high) // 2
+            if predicate(mid) == start:
+                low = mid
+            else:
+                high = mid
+        return high
+
+    def _age_classes(self, eligibilities, scorer):
+        """
+        Run-length classes over ages 0..limit. Beyond the limit every age is
+        above all bounds (and their 5-year partial-credit windows), so all
+        larger ages share the last class.
+        """
+        ranges = sorted(
+            {(elig.get('min_age'), elig.get('max_age')) for elig in eligibilities},
+            key=repr
+        )
+        bounded = [{'eligibility': {'min_age': lo, 'max_age': hi}} for lo, hi in ranges]
+        limits = [bound for pair in ranges for bound in pair if bound is not None]
+        limit = int(max(limits + [self.SENIOR_AGE])) + 7
+
+        ages = np.arange(limit + 1, dtype=np.int64)
+        matrix = EligibilityMatrix(bounded)
+        gradients = scorer._age_gradients(ages[:, None].astype(float), ScoringColumns(bounded))
+        signature = np.hstack([
+            gradients,
+            ages[:, None] < matrix.min_age,
+            ages[:, None] > matrix.max_age,
+            (ages >= self.SENIOR_AGE)[:, None],
+        ])
+
+        classes = np.zeros(limit + 1, dtype=np.int64)
+        for age in range(1, limit + 1):
+            same = np.array_equal(signature[age], signature[age - 1])
+            classes[age] = classes[age - 1] if same else age
+        return limit, classes
+
+    @staticmethod
+    def _known_values(eligibilities):
+        """Values the catalog names (in eligibility lists or the relation tables)"""
+        known = {'state': set(), 'category': set(), 'occupation': set()}
+        for elig in eligibilities:
+            states = elig.get('states', 'all')
+            known['state'].update(states if isinstance(states, list) else [states])
+            known['category'].update(str(c).lower() for c in elig.get('category') or ())
+            known['occupation'].update(str(o).lower() for o in elig.get('occupation') or ())
+        known['category'].update(ScoringEngine.CATEGORY_RELATIONS.ids)
+        known['occupation'].update(ScoringEngine.OCCUPATION_RELATIONS.ids)
+        return known
+
+    # ──────────────────────────────────────────────
+    # KEYS
+    # ──────────────────────────────────────────────
+
+    def value_class(self, field, value):
+        """
+        Class label for a state/category/occupation value. For values outside
+        the catalog every hard-filter and adjustment check fails the same way,
+        so only their scoring gradients can differ.
+        """
+        normalized = value if field == 'state' else value.lower()
+        if normalized in self.known[field]:
+            return normalized
+
+        scored = value.strip() if field == 'state' else value.lower().strip()
+        label = self._signatures.get((field, scored))
+        if label is None:
+            if len(self._signatures) >= self.MAX_SIGNATURES:
+                self._signatures.clear()
+            row = self.scorer._gather_rows(self.columns, field, [scored])[0]
+            label = "~" + hashlib.blake2b(
+                self._layout + row.tobytes(), digest_size=16
+            ).hexdigest()
+            self._signatures[(field, scored)] = label
+        return label
+
+    def age_class(self, value):
+        """Representative (first) age of the class containing this age"""
+        age = MatchingEngine._safe_int(value)
+        if age < 0:
+            return age
+        return int(self.age_classes[min(age, self.age_limit)])
+
+    def income_class(self, value):
+        """Lower bound of the income interval (0 for missing / non-positive)"""
+        income = MatchingEngine._safe_int(value)
+        if income <= 0:
+            return 0
+        slot = bisect.bisect_right(self.income_breakpoints, income)
+        return self.income_breakpoints[slot - 1] if slot else 1
+
+    @staticmethod
+    def _flag_class(value):
+        """Every parse the engine applies to a flag, in one short code"""
+        hard = value.lower() == 'true' if isinstance(value, str) else bool(value)
+        parsed = ScoringEngine._parse_bool(value)
+        matched = value.lower() in ('true', '1', 'yes') if isinstance(value, str) else value
+        if matched == True:  # noqa: E712 - mirrors _score_special_flags
+            match_code = '1'
+        elif matched == False:  # noqa: E712
+            match_code = '0'
+        else:
+            match_code = repr(matched)
+        return f"{int(hard)}{int(parsed)}{match_code}"
+
+    @staticmethod
+    def _provided(value):
+        return value is not None and value != '' and value != 0
+
+    def key(self, profile):
+        """Canonical equivalence-class key for a profile"""
+        provided = ''.join(
+            '1' if self._provided(profile.get(field)) else '0' for field in self.KEY_FIELDS
+        )
+        parts = [
+            f"age={self.age_class(profile.get('age', 0))}",
+            f"income={self.income_class(profile.get('annual_income', 0))}",
+            f"gender={profile.get('gender', '').lower()}",
+            f"state={self.value_class('state', profile.get('state', ''))}",
+            f"category={self.value_class('category', profile.get('category', ''))}",
+            f"occupation={self.value_class('occupation', profile.get('occupation', ''))}",
+            f"provided={provided}",
+        ]
+        for field in self.FLAG_FIELDS:
+            parts.append(f"{field}={self._flag_class(profile.get(field, False))}")
+        return "|".join(parts)
+
+    def stats(self):
+        return {
+            "age_classes": int(len(np.unique(self.age_classes))),
+            "income_classes": len(self.income_breakpoints) + 1,
+            "unlisted_value_signatures": len(self._signatures),
+            "age_limit": self.age_limit
+        }
+
+    def __repr__(self):
+        stats = self.stats()
+        return (
+            f"<ProfileCanonicalizer: {stats['age_classes']} age classes, "
+            f"{stats['income_classes']} income classes>"
+        )
+
+
+class MatchCache:
+    """
+    Bounded, thread-safe LRU cache for find_matches() results.
+
+    Entries are evicted least-recently-used once either the entry count or
+    the estimated byte budget is exceeded, and optionally expire after a TTL.
+    invalidate() bumps a generation counter, so results computed against
+    the previous catalog are dropped instead of re-entering the cache;
+    invalidate_where() does the same but only drops entries a predicate
+    selects (entries carry optional tags describing the profile).
+
+    Any object with the same get/set/discard/invalidate/stats/generation
+    surface can be passed to MatchingEngine(cache=...) instead; without
+    invalidate_where, catalog updates clear it completely.
+    """
+
+    def __init__(self, max_entries=2048, max_bytes=64 * 1024 * 1024, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()   # key → (value, size, expires_at, tags)
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.invalidated = 0
+
+    def get(self, key):
+        """Return the cached value (refreshing its LRU position) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, _, expires_at, _ = entry
+            if expires_at is not None and time.time() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None, tags=None):
+        """
+        Store a value. When generation is given and the cache has been
+        invalidated since it was read, the value is stale and discarded.
+        tags are kept alongside for invalidate_where().
+        """
+        size = self._estimate_size(value)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.rejected += 1
+                return False
+            if size > self.max_bytes:
+                self.rejected += 1
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at, tags)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def discard(self, key):
+        """Drop a single entry if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate(self):
+        """Drop every entry and start a new generation"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    def invalidate_where(self, predicate):
+        """
+        Drop entries for which predicate(value, tags) is true and start a new
+        generation (in-flight results from before the change are rejected).
+        Returns: number of entries dropped
+        """
+        with self._lock:
+            doomed = [
+                key for key, (value, _, _, tags) in self._entries.items()
+                if predicate(value, tags)
+            ]
+            for key in doomed:
+                self._remove(key)
+            self.invalidated += len(doomed)
+            self.generation += 1
+            return len(doomed)
+
+    def _remove(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _estimate_size(obj):
+        """Approximate deep size in bytes (dict keys are shared, so skipped)"""
+        getsize = sys.getsizeof
+        total = 0
+        stack = [obj]
+        while stack:
+            item = stack.pop()
+            total += getsize(item)
+            if isinstance(item, MatchedScheme):
+                # The scheme record is shared with the catalog; only the overlay is owned
+                stack.append(item._overlay)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                stack.extend(item)
+        return total
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = round((self.hits / total * 100), 1) if total > 0 else 0
+            return {
+                "cached_profiles": len(self._entries),
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "hit_rate": f"{hit_rate}%",
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejected_sets": self.rejected,
+                "invalidated": self.invalidated,
+                "bytes_used": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self.generation
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"<MatchCache: {len(self._entries)}/{self.max_entries} entries, "
+            f"{self._bytes}/{self.max_bytes} bytes>"
+        )
+
+
+class StageTimings:
+    """
+    Always-on latency histograms for the stages of find_matches().
+
+    Every stage has a fixed array of log-linear nanosecond buckets (four per
+    power of two, so percentiles are within ~19%), so memory is constant no
+    matter how many calls are recorded. A call's laps are folded in under
+    one lock acquisition, which keeps the counts exact when threaded
+    workers share an engine; each worker process keeps its own histograms.
+    """
+
+    STAGES = (
+        'cache_lookup', 'pre_filter', 'index_prune', 'hard_filters', 'scoring',
+        'adjustments', 'build_results', 'sort', 'to_dict', 'cache_store',
+        'bookkeeping', 'explanation_tokens', 'total'
+    )
+    BUCKETS = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {stage: [0] * self.BUCKETS for stage in self.STAGES}
+            self._calls = dict.fromkeys(self.STAGES, 0)
+            self._total_ns = dict.fromkeys(self.STAGES, 0)
+            self._max_ns = dict.fromkeys(self.STAGES, 0)
+
+    @staticmethod
+    def bucket(ns):
+        """Bucket index: exact below 4ns, then 4 sub-buckets per power of two"""
+        if ns < 4:
+            return max(ns, 0)
+        shift = ns.bit_length() - 3
+        return ((shift + 1) << 2) | ((ns >> shift) & 3)
+
+    @staticmethod
+    def bucket_upper_ns(bucket):
+        """Exclusive upper edge of a bucket, in nanoseconds"""
+        if bucket < 4:
+            return bucket + 1
+        return (5 + (bucket & 3)) << ((bucket >> 2) - 1)
+
+    def stopwatch(self):
+        """Start timing one call (see _Stopwatch)"""
+        return _Stopwatch(self)
+
+    def record(self, laps):
+        """Fold one call's {stage: ns} laps into the histograms"""
+        bucket = self.bucket
+        with self._lock:
+            for stage, ns in laps.items():
+                self._counts[stage][bucket(ns)] += 1
+                self._calls[stage] += 1
+                self._total_ns[stage] += ns
+                if ns > self._max_ns[stage]:
+                    self._max_ns[stage] = ns
+
+    def percentile_ms(self, stage, p):
+        """Upper bucket edge holding the p-th percentile of a stage (ms)"""
+        with self._lock:
+            counts, calls, max_ns = list(self._counts[stage]), self._calls[stage], self._max_ns[stage]
+        return self._percentile_ms(counts, calls, max_ns, p)
+
+    def _percentile_ms(self, counts, calls, max_ns, p):
+        if not calls:
+            return 0.0
+        rank = max(1, math.ceil(calls * p / 100))
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_upper_ns(bucket), max_ns) / 1e6
+        return max_ns / 1e6
+
+    def stats(self):
+        """{stage: {calls, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} for stages seen"""
+        with self._lock:
+            snapshot = {
+                stage: (list(self._counts[stage]), self._calls[stage],
+                        self._total_ns[stage], self._max_ns[stage])
+                for stage in self.STAGES if self._calls[stage]
+            }
+        return {
+            stage: {
+                "calls": calls,
+                "mean_ms": round(total_ns / calls / 1e6, 4),
+                "p50_ms": round(self._percentile_ms(counts, calls, max_ns, 50), 4),
+                "p95_ms": round(self._percentile_ms(counts, calls, max_ns, 95), 4),
+                "p99_ms": round(self._percentile_ms(counts, calls, max_ns, 99), 4),
+                "max_ms": round(max_ns / 1e6, 4)
+            }
+            for stage, (counts, calls, total_ns, max_ns) in snapshot.items()
+        }
+
+
+class _Stopwatch:
+    """
+    Lap timer for one find_matches() call. lap(stage) charges the time since
+    the previous lap to `stage`; carve(stage, ns) charges time measured
+    inside the next lap to another stage instead (e.g. adjustments within
+    scoring). finish() records everything plus the total.
+    """
+
+    __slots__ = ('_timings', '_started', '_mark', '_carved', 'laps')
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, timings):
+        self._timings = timings
+        self._started = self._mark = self.clock()
+        self._carved = 0
+        self.laps = {}
+
+    def lap(self, stage):
+        now = self.clock()
+        self.laps[stage] = self.laps.get(stage, 0) + (now - self._mark - self._carved)
+        self._mark = now
+        self._carved = 0
+
+    def carve(self, stage, ns):
+        self.laps[stage] = self.laps.get(stage, 0) + ns
+        self._carved += ns
+
+    def finish(self, stage=None):
+        if stage is not None:
+            self.lap(stage)
+        self.laps['total'] = self.clock() - self._started
+        self._timings.record(self.laps)
+
+
+class AdaptiveFilterOrder:
+    """
+    Orders the hard-filter checks by measured cost and rejection rate.
+
+    find_matches() screens in `order` and reports, for every check it ran,
+    how many schemes it saw, how many it rejected and how long it took.
+    Every `replan_interval` calls the checks are re-sorted by cost per
+    rejection (ns per scheme checked ÷ share rejected, the optimal order
+    for independent filters) and the counters are halved, so the order
+    follows drifting traffic. Reported reasons never depend on the order.
+    """
+
+    def __init__(self, codes, replan_interval=256):
+        self._lock = threading.Lock()
+        self.codes = tuple(codes)
+        self.order = self.codes
+        self.replan_interval = replan_interval
+        self.replans = 0
+        self._calls = 0
+        self._checked = dict.fromkeys(self.codes, 0)
+        self._rejected = dict.fromkeys(self.codes, 0)
+        self._ns = dict.fromkeys(self.codes, 0)
+
+    def observe(self, observations):
+        """Fold one screening pass's (code, checked, rejected, ns) tuples in"""
+        with self._lock:
+            for code, checked, rejected, ns in observations:
+                self._checked[code] += checked
+                self._rejected[code] += rejected
+                self._ns[code] += ns
+            self._calls += 1
+            if self._calls >= self.replan_interval:
+                self._replan()
+
+    def _rates(self):
+        """{code: (ns per scheme checked, share rejected)} for checks seen so far"""
+        return {
+            code: (self._ns[code] / self._checked[code],
+                   self._rejected[code] / self._checked[code])
+            for code in self.codes if self._checked[code]
+        }
+
+    def _replan(self):
+        rates = self._rates()
+
+        def rank(code):
+            if code not in rates:
+                return (1, 0.0)         # never measured: keep after measured checks
+            cost, reject = rates[code]
+            return (0, cost / max(reject, 1e-9))
+
+        self.order = tuple(sorted(self.codes, key=rank))
+        for counters in (self._checked, self._rejected, self._ns):
+            for code in counters:
+                counters[code] //= 2
+        self._calls = 0
+        self.replans += 1
+
+    @staticmethod
+    def expected_ns(order, rates):
+        """Expected screening ns per scheme for an order (independent checks)"""
+        total, reaching = 0.0, 1.0
+        for code in order:
+            if code in rates:
+                cost, reject = rates[code]
+                total += reaching * cost
+                reaching *= 1 - reject
+        return total
+
+    def stats(self):
+        """Debug view: current order, per-check rates and estimated work saved"""
+        with self._lock:
+            order, rates = self.order, self._rates()
+            checks = {
+                EligibilityMatrix.REASONS[code]: {
+                    "checked": self._checked[code],
+                    "rejected": self._rejected[code],
+                    "reject_rate": round(rates[code][1], 4) if code in rates else None,
+                    "ns_per_scheme": round(rates[code][0], 1) if code in rates else None
+                }
+                for code in self.codes
+            }
+        adaptive = self.expected_ns(order, rates)
+        fixed = self.expected_ns(self.codes, rates)
+        return {
+            "order": [EligibilityMatrix.REASONS[code] for code in order],
+            "replans": self.replans,
+            "checks": checks,
+            "estimated_ns_per_scheme": {
+                "adaptive": round(adaptive, 1),
+                "fixed": round(fixed, 1)
+            },
+            "estimated_work_saved": f"{(1 - adaptive / fixed) * 100:.1f}%" if fixed else "0.0%"
+        }
+
+    def __repr__(self):
+        return (
+            f"<AdaptiveFilterOrder: "
+            f"{' → '.join(EligibilityMatrix.REASONS[code] for code in self.order)}, "
+            f"{self.replans} replans>"
+        )
+
+
+class SessionMatchState:
+    """
+    Per-scheme matching state for one conversation's latest profile.
+
+    Keeps every scheme's hard-filter failure bitmask, per-field score
+    contributions, adjustment terms and final score, plus the passing schemes
+    ranked as find_matches() ranks them (score descending, catalog order on
+    ties). When the profile changes, only the changed fields' filter bits,
+    score contributions and adjustment terms are recomputed across the
+    catalog; contributions are then re-summed in field order (so scores
+    stay identical to find_matches) and only schemes whose score moved are
+    re-ranked.
+    """
+
+    # Profile field → (hard-filter checks, scoring gradients, adjustment terms) it feeds
+    FIELD_EFFECTS = {
+        'age': ((EligibilityMatrix.YOUNG_CODE, EligibilityMatrix.OLD_CODE), ('age',), ('personal',)),
+        'annual_income': ((EligibilityMatrix.INCOME_CODE,), ('income',), ()),
+        'gender': ((EligibilityMatrix.GENDER_CODE,), ('gender',), ('women',)),
+        'state': ((EligibilityMatrix.STATE_CODE,), ('state',), ()),
+        'category': ((), ('category',), ('category',)),
+        'occupation': ((), ('occupation',), ('occupation',)),
+        'is_bpl': ((EligibilityMatrix.BPL_CODE,), ('special_flags',), ('bpl',)),
+        'is_farmer': ((), ('special_flags',), ()),
+        'is_student': ((), ('special_flags',), ()),
+        'disability': ((), ('special_flags',), ('personal',)),
+    }
+    _MISSING = object()
+
+    def __init__(self, engine, user_profile):
+        self.engine = engine
+        self.catalog_version = engine.catalog_version
+        self.schemes = engine.schemes
+        self.matrix = engine._eligibility
+        self.columns = engine._scoring_columns
+
+        self.profile = {}
+        self.masks = np.zeros(self.matrix.size, dtype=np.uint8)
+        self.contributions = {}     # scoring field → ScoringEngine.field_contribution
+        self.adjustments = {}
+        self.scores = np.full(self.matrix.size, -1, dtype=np.int64)     # -1 = filtered out
+        self.ranking = []           # sorted (-score, position) of passing schemes
+        self.updates = 0
+
+        every = (
+            tuple(range(1, len(EligibilityMatrix.REASONS))),
+            ScoringColumns.FIELDS,
+            engine.ADJUSTMENT_TERMS
+        )
+        self._apply(user_profile, *every)
+
+    def changed_fields(self, user_profile):
+        """Profile fields whose value (or type) differs from the state's profile"""
+        missing = self._MISSING
+        changed = []
+        for field in self.FIELD_EFFECTS:
+            old, new = self.profile.get(field, missing), user_profile.get(field, missing)
+            if type(old) is not type(new) or old != new:
+                changed.append(field)
+        return changed
+
+    def update(self, user_profile):
+        """Bring the state to a new profile; returns the fields recomputed"""
+        changed = self.changed_fields(user_profile)
+        if changed:
+            checks, gradients, terms = set(), set(), set()
+            for field in changed:
+                field_checks, field_gradients, field_terms = self.FIELD_EFFECTS[field]
+                checks.update(field_checks)
+                gradients.update(field_gradients)
+                terms.update(field_terms)
+            self._apply(user_profile, checks, gradients, terms)
+            self.updates += 1
+        else:
+            self.profile = dict(user_profile)
+        return changed
+
+    def _apply(self, user_profile, checks, gradients, terms):
+        engine, matrix = self.engine, self.matrix
+        self.profile = dict(user_profile)
+
+        # Encoding one profile is O(fields); only the checks / gradients /
+        # terms below run across the catalog
+        user = matrix.encode_profile(user_profile)
+        users = engine.scorer.encode_profiles([user_profile])
+        everything = np.arange(matrix.size)
+
+        for code in checks:
+            bit = np.uint8(code - 1)
+            self.masks &= ~(np.uint8(1) << bit)
+            failed = matrix.check_subset(code, user, everything)
+            if failed is not None:
+                self.masks |= failed.astype(np.uint8) << bit
+
+        scorer = engine.scorer
+        for field in gradients:
+            gradient = scorer.field_gradient(field, users, self.columns)
+            self.contributions[field] = scorer.field_contribution(field, users, gradient, self.columns)
+
+        if terms:
+            encoded = tuple(np.asarray([value]) for value in user)
+            self.adjustments.update(engine._adjustment_terms(
+                matrix, encoded, *engine._adjustment_inputs([user_profile]), terms=tuple(terms)
+            ))
+
+        # Re-combine (bonuses and penalties read several fields) and re-rank movers
+        base = scorer.combine_contributions(users, self.contributions, self.columns)
+        final = np.clip(base + sum(self.adjustments.values()), 0, 100)[0]
+        scores = np.where(self.masks == 0, final, -1)
+        moved = np.flatnonzero(scores != self.scores)
+        for position, old, new in zip(
+            moved.tolist(), self.scores[moved].tolist(), scores[moved].tolist()
+        ):
+            if old >= 0:
+                del self.ranking[bisect.bisect_left(self.ranking, (-old, position))]
+            if new >= 0:
+                bisect.insort(self.ranking, (-new, position))
+        self.scores = scores
+
+    def top(self, max_results, min_score):
+        """[(position, score)] of the best passing schemes at or above min_score"""
+        top = []
+        for negative_score, position in self.ranking:
+            if -negative_score < min_score or len(top) >= max_results:
+                break
+            top.append((position, -negative_score))
+        return top
+
+    def __repr__(self):
+        return (
+            f"<SessionMatchState: {len(self.ranking)}/{len(self.scores)} passing, "
+            f"{self.updates} delta updates>"
+        )
 
 
 class MatchingEngine:
@@ -110,28 +1674,55 @@ class MatchingEngine:
     explanations, analytics, and performance tracking
     """
 
-    def __init__(self, schemes, config=None):
+    def __init__(self, schemes, config=None, cache=None, compiled=None, scorer=None):
         """
         Initialize Matching Engine
 
         Args:
             schemes: list of scheme dicts
             config: optional MatchConfig override
+            cache: optional result cache (default: MatchCache sized from config)
+            compiled: optional CompiledCatalog for these schemes (skips compilation,
+                e.g. in batch workers attached to a shared catalog)
+            scorer: optional ScoringEngine (default: balanced weights, gradient on)
         """
-        self.schemes = schemes
         self.config = config or MatchConfig()
-        self.scorer = ScoringEngine()
+        self.scorer = scorer or ScoringEngine()
+        self._install_catalog(schemes, compiled or self.compile_catalog(schemes))
 
         # Analytics
         self._filter_stats = defaultdict(int)
         self._match_history = []
         self._total_matches_run = 0
         self._total_time_ms = 0
+        self._topk_pruned = 0
+        self._topk_scored = 0
+        self._index_pruned = defaultdict(int)
+        self._index_screened = 0
+        self._stage_timings = StageTimings()
+
+        # Age / income / BPL checks; state and gender run first via the bitmap index
+        self._filter_order = AdaptiveFilterOrder(
+            (EligibilityMatrix.YOUNG_CODE, EligibilityMatrix.OLD_CODE,
+             EligibilityMatrix.INCOME_CODE, EligibilityMatrix.BPL_CODE),
+            replan_interval=self.config.FILTER_REPLAN_INTERVAL
+        )
 
         # Cache
-        self._cache = {}
-        self._cache_hits = 0
-        self._cache_misses = 0
+        self._cache = cache if cache is not None else MatchCache(
+            max_entries=self.config.CACHE_MAX_ENTRIES,
+            max_bytes=self.config.CACHE_MAX_BYTES,
+            ttl_seconds=self.config.CACHE_TTL_SECONDS
+        )
+
+        # Profiles behind recent explanation tokens and page cursors (profile hash → profile, LRU)
+        self._explain_profiles = OrderedDict()
+        self._explain_lock = threading.Lock()
+
+        # Delta re-matching state per conversation (session id → SessionMatchState, LRU)
+        self._session_states = OrderedDict()
+        self._session_lock = threading.Lock()
+        self._session_stats = defaultdict(int)
 
         logger.info(f"✅ MatchingEngine initialized with {len(schemes)} schemes")
 
@@ -141,7 +1732,7 @@ class MatchingEngine:
 
     def find_matches(self, user_profile, max_results=None, min_score=None,
                      include_reasons=False, category_filter=None,
-                     type_filter=None, debug=False):
+                     type_filter=None, debug=False, explanation_tokens=True):
         """
         Main matching function: user profile → ranked scheme list
 
@@ -153,12 +1744,18 @@ class MatchingEngine:
             category_filter: only match schemes in this category
             type_filter: only match 'central' or 'state' schemes
             debug: print detailed matching logs
+            explanation_tokens: tag results with an explanation_token (see
+                explain_match), which digests the profile and keeps it in the
+                recent-profile store; batch callers pass False
 
         Returns:
             List of scheme dicts with match_score, match_tier, match_reasons
+            and (unless explanation_tokens=False) an explanation_token
         """
         start_time = time.time()
+        watch = self._stage_timings.stopwatch()
         self._total_matches_run += 1
+        catalog_version = self.catalog_version
 
         max_results = min(
             max_results or self.config.DEFAULT_MAX_RESULTS,
@@ -166,23 +1763,30 @@ class MatchingEngine:
         )
         min_score = min_score or self.config.MIN_MATCH_SCORE
 
-        # Check cache
-        cache_key = self._build_cache_key(user_profile, category_filter, type_filter)
-        cached = self._cache.get(cache_key)
-        if cached and not debug:
-            self._cache_hits += 1
-            if debug:
-                print(f"   💾 Cache hit for profile")
-            return cached[:max_results]
-        self._cache_misses += 1
+        # Check cache (generation is captured so a catalog swap mid-match
+        # can't leave stale results behind)
+        cache_key = self._build_cache_key(
+            user_profile, category_filter, type_filter,
+            min_score=min_score, max_results=max_results, include_reasons=include_reasons
+        )
+        cache_generation = self._cache.generation
+        cached = None if debug else self._cache.get(cache_key)
+        watch.lap('cache_lookup')
+        if cached is not None:
+            results = cached[:max_results]
+            if explanation_tokens:
+                results = self._with_explanation_tokens(results, user_profile, catalog_version)
+            watch.finish('explanation_tokens')
+            return results
 
         # Pre-filter schemes by category/type if specified
-        candidate_schemes = self._pre_filter(category_filter, type_filter)
+        candidates = self._pre_filter(category_filter, type_filter)
+        watch.lap('pre_filter')
 
         if debug:
             print(f"\n{'=' * 55}")
             print(f"🔍 Matching engine started")
-            print(f"   Candidates: {len(candidate_schemes)} schemes")
+            print(f"   Candidates: {len(candidates)} schemes")
             print(f"   Min score: {min_score}")
             print(f"   Profile: {self._summarize_profile(user_profile)}")
             print(f"{'=' * 55}")
@@ -195,41 +1799,72 @@ class MatchingEngine:
         matched = []
         rejected = defaultdict(list)
 
-        for scheme in candidate_schemes:
-            scheme_id = scheme.get('id', 'unknown')
-            scheme_name = scheme.get('name', 'Unknown')
-            eligibility = scheme.get('eligibility', {})
-
-            # TIER 1: Hard filters (instant reject)
-            passed, rejection_reason = self._pass_hard_filters(user_profile, eligibility)
-            if not passed:
-                rejected[rejection_reason].append(scheme_name)
-                self._filter_stats[rejection_reason] += 1
-                if debug:
-                    print(f"   ❌ {scheme_name}: REJECTED ({rejection_reason})")
-                continue
-
-            # TIER 2: Soft scoring
-            base_score = self.scorer.calculate_score(user_profile, eligibility)
-
-            # TIER 3: Boost/penalty adjustments
-            adjusted_score, adjustments = self._apply_adjustments(
-                base_score, user_profile, scheme, eligibility
+        # TIER 0: Bitmap index pruning (state, gender). Pruned schemes are exactly
+        # the STATE/GENDER rejections, so they're counted without screening.
+        screened, rejected_count = candidates, 0
+        if not debug:
+            screened, rejected_count = self._index_prune(user_profile, category_filter, type_filter)
+        watch.lap('index_prune')
+
+        # TIER 1: Hard filters (instant reject). Index-pruned candidates already
+        # passed state/gender; the rest run short-circuit in the adaptive order.
+        if not debug and self.config.ADAPTIVE_FILTER_ORDER:
+            passing, reason_codes, observations = self._eligibility.screen_ordered(
+                self._eligibility.encode_profile(user_profile), screened,
+                self._filter_order.order,
+                skip=(EligibilityMatrix.STATE_CODE, EligibilityMatrix.GENDER_CODE)
             )
+            self._filter_order.observe(observations)
+            rejected_count += self._record_rejections(reason_codes)
+        else:
+            failure_masks = self._eligibility.failure_masks(user_profile)
+            reason_codes = EligibilityMatrix.FIRST_FAILURE[failure_masks[screened]]
+            rejected_count += self._record_rejections(reason_codes)
+            if debug:
+                order = self._filter_order.stats()
+                print(f"   🔀 Filter order: {' → '.join(order['order'])} "
+                      f"(est. work saved {order['estimated_work_saved']})")
+                for position, code in zip(screened.tolist(), reason_codes.tolist()):
+                    if code:
+                        scheme_name = self.schemes[position].get('name', 'Unknown')
+                        rejection_reason = EligibilityMatrix.REASONS[code]
+                        rejected[rejection_reason].append(scheme_name)
+                        print(f"   ❌ {scheme_name}: REJECTED ({rejection_reason})")
+            passing = screened[reason_codes == EligibilityMatrix.PASSED]
+        watch.lap('hard_filters')
+
+        # TIER 3 as numbers for the whole catalog; the boost/penalty text is
+        # only built below for the results that carry reasons
+        adjustment_row = self._adjustment_row(user_profile)
+        use_topk = (
+            self.config.TOPK_PRUNING and not debug
+            and len(passing) >= self.config.TOPK_MIN_CANDIDATES
+        )
+        if use_topk:
+            # TIER 2 + 3 for the top-k only; below-threshold schemes are counted
+            # as LOW_SCORE, schemes pruned by the k-th score are simply skipped
+            scored, low_count = self._select_top_k(
+                user_profile, passing, max_results, min_score, watch, adjustment_row
+            )
+            rejected_count += low_count
+            self._filter_stats[FilterReason.LOW_SCORE] += low_count
+        else:
+            scored = self._score_all(
+                user_profile, passing, min_score, rejected, debug, watch, adjustment_row
+            )
+            rejected_count += len(rejected[FilterReason.LOW_SCORE])
+        watch.lap('scoring')
 
-            # Final score cap
-            final_score = max(0, min(adjusted_score, 100))
-
-            if final_score < min_score:
-                rejected[FilterReason.LOW_SCORE].append(scheme_name)
-                self._filter_stats[FilterReason.LOW_SCORE] += 1
-                if debug:
-                    print(f"   ⚠️ {scheme_name}: LOW SCORE ({final_score} < {min_score})")
-                continue
+        for position, final_score, base_score, adjusted_score in scored:
+            scheme = self.schemes[position]
+            eligibility = scheme.get('eligibility', {})
 
             # Build match reasons
             reasons = []
             if include_reasons:
+                _, adjustments = self._apply_adjustments(
+                    base_score, user_profile, scheme, eligibility
+                )
                 reasons = self._build_match_reasons(
                     user_profile, eligibility, final_score, adjustments
                 )
@@ -240,30 +1875,40 @@ class MatchingEngine:
 
             if debug:
                 print(
-                    f"   ✅ {scheme_name}: {final_score}% "
+                    f"   ✅ {scheme.get('name', 'Unknown')}: {final_score}% "
                     f"(base:{base_score} adj:{adjusted_score}) [{result.tier}]"
                 )
 
+        watch.lap('build_results')
+
         # Sort by score (primary) and tier (secondary)
         tier_order = {"perfect": 0, "strong": 1, "moderate": 2, "partial": 3}
         matched.sort(key=lambda r: (-r.score, tier_order.get(r.tier, 4)))
+        watch.lap('sort')
 
         # Convert to dicts
         result_dicts = [r.to_dict() for r in matched[:max_results]]
+        watch.lap('to_dict')
 
         # Track performance
         elapsed_ms = round((time.time() - start_time) * 1000, 2)
         self._total_time_ms += elapsed_ms
 
-        # Cache results
-        self._cache[cache_key] = result_dicts
+        # Cache results (tagged with what catalog updates invalidate by)
+        self._cache.set(cache_key, result_dicts, generation=cache_generation, tags={
+            'state': user_profile.get('state', ''),
+            'gender': user_profile.get('gender', '').lower(),
+            'category': category_filter,
+            'type': type_filter
+        })
+        watch.lap('cache_store')
 
         # Track match history
         self._match_history.append({
             'profile_summary': self._summarize_profile(user_profile),
-            'total_candidates': len(candidate_schemes),
+            'total_candidates': len(candidates),
             'matched': len(result_dicts),
-            'rejected': sum(len(v) for v in rejected.values()),
+            'rejected': rejected_count,
             'top_score': result_dicts[0]['match_score'] if result_dicts else 0,
             'elapsed_ms': elapsed_ms,
             'completeness': completeness
@@ -277,33 +1922,211 @@ class MatchingEngine:
             print(f"{'=' * 55}\n")
 
         logger.info(
-            f"Matched {len(result_dicts)}/{len(candidate_schemes)} schemes "
+            f"Matched {len(result_dicts)}/{len(candidates)} schemes "
             f"in {elapsed_ms}ms (top: {result_dicts[0]['match_score'] if result_dicts else 0}%)"
         )
 
-        return result_dicts
+        watch.lap('bookkeeping')
+
+        results = result_dicts
+        if explanation_tokens:
+            results = self._with_explanation_tokens(result_dicts, user_profile, catalog_version)
+        watch.finish('explanation_tokens')
+        return results
 
     # ──────────────────────────────────────────────
     # FILTERING TIERS
     # ──────────────────────────────────────────────
 
     def _pre_filter(self, category_filter=None, type_filter=None):
-        """Pre-filter schemes by category and type before scoring"""
-        schemes = self.schemes
+        """
+        Pre-filter schemes by category and type before scoring
+        Returns: array of catalog positions (indexes into self.schemes)
+        """
+        return self._index.positions(self._index.pre_filter(category_filter, type_filter))
 
-        if category_filter:
-            schemes = [
-                s for s in schemes
-                if s.get('category', '').lower() == category_filter.lower()
-            ]
+    def _index_prune(self, user, category_filter=None, type_filter=None):
+        """
+        Candidate set via bitmap AND/OR over the state and gender indexes
+        Returns: (positions to screen, number pruned as STATE/GENDER rejections)
+        """
+        index = self._index
+        pre = index.pre_filter(category_filter, type_filter)
+        state_ok, gender_ok = index.state_gender_pass(user)
+
+        # Same precedence as _pass_hard_filters: state is checked before gender
+        state_rejected = (pre & ~state_ok).bit_count()
+        gender_rejected = (pre & state_ok & ~gender_ok).bit_count()
+        if state_rejected:
+            self._filter_stats[FilterReason.STATE_MISMATCH] += state_rejected
+            self._index_pruned['state'] += state_rejected
+        if gender_rejected:
+            self._filter_stats[FilterReason.GENDER_MISMATCH] += gender_rejected
+            self._index_pruned['gender'] += gender_rejected
+        self._index_screened += pre.bit_count()
+
+        return index.positions(pre & state_ok & gender_ok), state_rejected + gender_rejected
+
+    def _score_all(self, user, positions, min_score, rejected, debug=False, watch=None,
+                   adjustment_row=None):
+        """
+        Score every hard-filter survivor (TIER 2 + TIER 3)
+        Returns: list of (position, final, base, adjusted) at or above min_score
+        """
+        if adjustment_row is None:
+            adjustment_row = self._adjustment_row(user)
+        scored = []
+        programs, facts = self._score_programs(user)
+        for position in positions.tolist():
+            scheme = self.schemes[position]
+            eligibility = scheme.get('eligibility', {})
+            final_score, base_score, adjusted_score = self._score_scheme(
+                user, scheme, eligibility, watch, programs[position] if facts else None, facts,
+                adjustment=int(adjustment_row[position])
+            )
 
-        if type_filter:
-            schemes = [
-                s for s in schemes
-                if s.get('type', '').lower() == type_filter.lower()
-            ]
+            if final_score < min_score:
+                scheme_name = scheme.get('name', 'Unknown')
+                rejected[FilterReason.LOW_SCORE].append(scheme_name)
+                self._filter_stats[FilterReason.LOW_SCORE] += 1
+                if debug:
+                    print(f"   ⚠️ {scheme_name}: LOW SCORE ({final_score} < {min_score})")
+                continue
+
+            scored.append((position, final_score, base_score, adjusted_score))
+        return scored
+
+    def _select_top_k(self, user, positions, k, min_score, watch=None, adjustment_row=None):
+        """
+        Top-k selection with score upper-bound pruning.
+
+        Candidates are visited in descending upper-bound order (catalog order
+        on ties) and fully scored only while their bound can still beat the
+        current k-th result, so the selection equals sorting every score.
+
+        Returns: (ranked list of (position, final, base, adjusted),
+                  number of candidates known to be below min_score)
+        """
+        if adjustment_row is None:
+            adjustment_row = self._adjustment_row(user)
+        bounds = self._score_upper_bounds(user, adjustment_row)[positions]
+        order = np.lexsort((positions, -bounds))
+
+        programs, facts = self._score_programs(user)
+        heap = []           # (score, -position, entry): heap[0] is the current k-th
+        low_count = 0
+        visited = 0
+        for idx in order.tolist():
+            bound = int(bounds[idx])
+            position = int(positions[idx])
+            if bound < min_score:
+                break
+            if len(heap) == k:
+                kth_score, kth_neg_position, _ = heap[0]
+                if bound < kth_score or (bound == kth_score and position > -kth_neg_position):
+                    break
+
+            visited += 1
+            scheme = self.schemes[position]
+            final_score, base_score, adjusted_score = self._score_scheme(
+                user, scheme, scheme.get('eligibility', {}), watch,
+                programs[position] if facts else None, facts,
+                adjustment=int(adjustment_row[position])
+            )
+            if final_score < min_score:
+                low_count += 1
+                continue
+
+            entry = (position, final_score, base_score, adjusted_score)
+            if len(heap) < k:
+                heapq.heappush(heap, (final_score, -position, entry))
+            else:
+                heapq.heappushpop(heap, (final_score, -position, entry))
+
+        # Unvisited candidates whose ceiling is under min_score are certain low scores
+        low_count += int((bounds < min_score).sum())
+        self._topk_scored += visited
+        self._topk_pruned += len(positions) - visited
 
-        return schemes
+        ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [entry for _, _, entry in ranked], low_count
+
+    def _score_upper_bounds(self, user, adjustment_row=None):
+        """Ceiling on the final (adjusted, capped) score for every scheme"""
+        base = self.scorer.score_upper_bounds(user, self._scoring_columns)
+        if adjustment_row is None:
+            adjustment_row = self._adjustment_row(user)
+        return np.clip(base + adjustment_row, 0, 100)
+
+    def _adjustment_row(self, user):
+        """Net TIER 3 boost/penalty of one profile for every scheme (no text)"""
+        return self._adjustment_matrix([user], self._eligibility.encode_profiles([user]))[0]
+
+    def _score_programs(self, user):
+        """
+        Compiled score programs for the current catalog and the profile's
+        ScoreFacts, or (None, None) to score through calculate_score
+        """
+        if not self.config.COMPILED_SCORING:
+            return None, None
+        facts = self.scorer.score_facts(user)
+        if facts is None:
+            return None, None
+        return self.scorer.compile_programs(self._scoring_columns), facts
+
+    def _score_scheme(self, user, scheme, eligibility, watch=None, program=None, facts=None,
+                      adjustment=None):
+        """
+        Full TIER 2 + TIER 3 score: (final, base, adjusted).
+        With a compiled program and the profile's facts the base score skips
+        the generic scorer. `adjustment` is the scheme's entry of
+        _adjustment_row; without it the boosts and penalties are applied one
+        by one. With a stopwatch, the adjustment time is charged to
+        'adjustments'.
+        """
+        base_score = self._base_score(user, eligibility, program, facts)
+        if watch is not None:
+            adjust_start = watch.clock()
+        if adjustment is not None:
+            adjusted_score = base_score + adjustment
+        else:
+            adjusted_score, _ = self._apply_adjustments(base_score, user, scheme, eligibility)
+        if watch is not None:
+            watch.carve('adjustments', watch.clock() - adjust_start)
+        return max(0, min(adjusted_score, 100)), base_score, adjusted_score
+
+    def _base_score(self, user, eligibility, program=None, facts=None):
+        """TIER 2 score, through the compiled program when there is one"""
+        if program is not None:
+            return self.scorer.score_compiled(program, facts)
+        return self.scorer.calculate_score(user, eligibility)
+
+    def _record_rejections(self, reason_codes):
+        """Fold hard-filter reason codes into filter stats, return rejected count"""
+        counts = np.bincount(reason_codes, minlength=len(EligibilityMatrix.REASONS))
+        for code, count in enumerate(counts.tolist()):
+            if code != EligibilityMatrix.PASSED and count:
+                self._filter_stats[EligibilityMatrix.REASONS[code]] += count
+        return int(len(reason_codes) - counts[EligibilityMatrix.PASSED])
+
+    def _hard_filter_checker(self, user):
+        """
+        _pass_hard_filters for one profile through the compiled per-scheme
+        predicates: returns check(position, eligibility) → (passed, reason).
+        Profiles the encoder can't read (e.g. a non-string gender) are
+        checked by _pass_hard_filters itself.
+        """
+        matrix = self._eligibility
+        try:
+            encoded = matrix.encode_profile(user)
+        except (AttributeError, TypeError):
+            return lambda position, eligibility: self._pass_hard_filters(user, eligibility)
+
+        def check(position, eligibility):
+            reason = EligibilityMatrix.REASONS[matrix.predicates[position](encoded)]
+            return reason is None, reason
+
+        return check
 
     def _pass_hard_filters(self, user, eligibility):
         """
@@ -651,9 +2474,12 @@ class MatchingEngine:
             List of schemes with scores, reasons, and comparison data
         """
         results = []
+        check_hard_filters = self._hard_filter_checker(user_profile)
+        programs, facts = self._score_programs(user_profile)
 
         for scheme_id in scheme_ids:
-            scheme = self._find_scheme(scheme_id)
+            position = self._scheme_position(scheme_id)
+            scheme = self.schemes[position] if position is not None else None
             if not scheme:
                 results.append({
                     "scheme_id": scheme_id,
@@ -663,18 +2489,20 @@ class MatchingEngine:
                 continue
 
             eligibility = scheme.get('eligibility', {})
-            passed, rejection_reason = self._pass_hard_filters(user_profile, eligibility)
+            passed, rejection_reason = check_hard_filters(position, eligibility)
 
             if not passed:
-                result = deepcopy(scheme)
-                result['match_score'] = 0
-                result['eligible'] = False
-                result['rejection_reason'] = rejection_reason
-                result['match_reasons'] = [f"❌ Not eligible: {rejection_reason}"]
-                results.append(result)
+                results.append(MatchedScheme(scheme, {
+                    'match_score': 0,
+                    'eligible': False,
+                    'rejection_reason': rejection_reason,
+                    'match_reasons': [f"❌ Not eligible: {rejection_reason}"]
+                }))
                 continue
 
-            base_score = self.scorer.calculate_score(user_profile, eligibility)
+            base_score = self._base_score(
+                user_profile, eligibility, programs[position] if facts else None, facts
+            )
             adjusted_score, adjustments = self._apply_adjustments(
                 base_score, user_profile, scheme, eligibility
             )
@@ -684,17 +2512,17 @@ class MatchingEngine:
                 user_profile, eligibility, final_score, adjustments
             )
 
-            result = deepcopy(scheme)
-            result['match_score'] = final_score
-            result['eligible'] = True
-            result['match_tier'] = MatchResult(scheme, final_score).tier
-            result['match_reasons'] = reasons
-            result['score_breakdown'] = {
-                'base_score': base_score,
-                'adjustments': adjustments,
-                'final_score': final_score
-            }
-            results.append(result)
+            results.append(MatchedScheme(scheme, {
+                'match_score': final_score,
+                'eligible': True,
+                'match_tier': MatchResult(scheme, final_score).tier,
+                'match_reasons': reasons,
+                'score_breakdown': {
+                    'base_score': base_score,
+                    'adjustments': adjustments,
+                    'final_score': final_score
+                }
+            }))
 
         # Sort by score
         results.sort(
@@ -704,6 +2532,65 @@ class MatchingEngine:
 
         return results
 
+    def check_eligibility_many(self, user_profile, scheme_ids):
+        """
+        Hard filters and final scores for many schemes in one vectorized pass
+
+        The profile is screened and scored against the whole compiled catalog
+        at once, then the requested ids are picked out through the id index.
+        match_score is the base (TIER 2) score, as calculate_score gives it;
+        final_score adds the boosts/penalties and caps it (the match_score
+        find_matches reports) and match_tier follows final_score. Unlike
+        find_matches, schemes scoring below MIN_MATCH_SCORE are still
+        reported as eligible. Found schemes carry their eligibility criteria
+        for callers that explain the result (the catalog's dict, shared: do
+        not mutate).
+
+        Returns:
+            List of dicts in request order:
+            {"scheme_id", "found", "scheme_name", "eligible",
+             "rejection_reason", "match_score", "final_score", "match_tier",
+             "eligibility"}
+        """
+        positions = [self._scheme_position(scheme_id) for scheme_id in scheme_ids]
+        found = [position for position in positions if position is not None]
+
+        if found:
+            encoded = self._eligibility.encode_profiles([user_profile])
+            masks = self._eligibility.failure_mask_matrix(encoded)[0]
+            base = self.scorer.score_profiles([user_profile], self._scoring_columns)
+            final = np.clip(base + self._adjustment_matrix([user_profile], encoded), 0, 100)[0]
+            codes = EligibilityMatrix.FIRST_FAILURE[masks[found]].tolist()
+            scores = dict(zip(found, zip(codes, base[0][found].tolist(), final[found].tolist())))
+
+        results = []
+        for scheme_id, position in zip(scheme_ids, positions):
+            if position is None:
+                results.append({
+                    "scheme_id": scheme_id,
+                    "found": False,
+                    "eligible": False,
+                    "error": "Scheme not found"
+                })
+                continue
+
+            code, base_score, final_score = scores[position]
+            eligible = code == EligibilityMatrix.PASSED
+            scheme = self.schemes[position]
+            results.append({
+                "scheme_id": scheme_id,
+                "found": True,
+                "scheme_name": scheme.get('name', ''),
+                "eligible": eligible,
+                "rejection_reason": None if eligible else EligibilityMatrix.REASONS[code],
+                "match_score": base_score if eligible else 0,
+                "final_score": final_score if eligible else 0,
+                "match_tier": MatchResult({}, final_score).tier if eligible else None,
+                "eligibility": scheme.get('eligibility', {})
+            })
+
+        return results
+
     def check_eligibility(self, user_profile, scheme_id):
         """
         Detailed eligibility check for a single scheme
@@ -911,115 +2798,482 @@ class MatchingEngine:
         failed_checks = [c for c in checks if c['status'] == 'fail']
         is_eligible = len(failed_checks) == 0
 
-        # Score
-        score = 0
-        if is_eligible:
-            score = self.scorer.calculate_score(user_profile, eligibility)
-            adj_score, _ = self._apply_adjustments(
-                score, user_profile, scheme, eligibility
-            )
-            score = max(0, min(adj_score, 100))
+        # Score
+        score = 0
+        if is_eligible:
+            score = self.scorer.calculate_score(user_profile, eligibility)
+            adj_score, _ = self._apply_adjustments(
+                score, user_profile, scheme, eligibility
+            )
+            score = max(0, min(adj_score, 100))
+
+        # Recommendation
+        if is_eligible and score >= 75:
+            recommendation = "🌟 Highly recommended! You meet all eligibility criteria."
+        elif is_eligible:
+            recommendation = "✅ You are eligible. Consider applying for this scheme."
+        elif len(failed_checks) == 1:
+            failed_field = failed_checks[0]['field']
+            recommendation = f"⚠️ Almost eligible! Only '{failed_field}' doesn't match."
+        else:
+            recommendation = f"❌ Not eligible. {len(failed_checks)} criteria don't match."
+
+        return {
+            "scheme_id": scheme_id,
+            "scheme_name": scheme.get('name', ''),
+            "eligible": is_eligible,
+            "match_score": score,
+            "total_checks": len(checks),
+            "passed": len(passed_checks),
+            "failed": len(failed_checks),
+            "checks": checks,
+            "recommendation": recommendation
+        }
+
+    def find_near_misses(self, user_profile, max_results=5):
+        """
+        Find schemes the user ALMOST qualifies for
+        (failed only 1 hard filter)
+        Useful for showing "you're close to qualifying" suggestions
+        """
+        masks = self._eligibility.failure_masks(user_profile)
+        return self._near_misses_from_masks(user_profile, masks, max_results)
+
+    def _near_misses_from_masks(self, user_profile, masks, max_results):
+        """
+        Near misses from a screening pass, in catalog order: schemes that
+        fail the hard filters with exactly one recounted check failing
+        (see EligibilityMatrix.near_miss_masks)
+        """
+        matrix = self._eligibility
+        recount = matrix.near_miss_masks(masks, user_profile)
+        candidates = np.flatnonzero(
+            (EligibilityMatrix.single_failures(recount) & ~matrix.recount_scalar)
+            | ((masks != 0) & matrix.recount_scalar)
+        )
+
+        near_misses = []
+        for position in candidates.tolist():
+            scheme = self.schemes[position]
+            eligibility = scheme.get('eligibility', {})
+            if matrix.recount_scalar[position]:
+                failure_reasons = self._recount_failures(user_profile, eligibility)
+                if len(failure_reasons) != 1:
+                    continue
+            else:
+                code = int(EligibilityMatrix.FIRST_FAILURE[recount[position]])
+                failure_reasons = [self._failure_reason_text(user_profile, eligibility, code)]
+            near_misses.append(MatchedScheme(scheme, {
+                'near_miss': True,
+                'failure_reasons': failure_reasons,
+                'failures_count': 1
+            }))
+            if len(near_misses) >= max_results:
+                break
+        return near_misses
+
+    def _recount_failures(self, user_profile, eligibility):
+        """Per-check failure reasons, as find_near_misses has always counted them"""
+        failure_reasons = []
+
+        states = eligibility.get('states', 'all')
+        if states != 'all':
+            if user_profile.get('state', '') not in (
+                states if isinstance(states, list) else [states]
+            ):
+                failure_reasons.append(f"State: need {states}")
+
+        gender_req = eligibility.get('gender', 'all')
+        if gender_req != 'all':
+            if user_profile.get('gender', '').lower() != gender_req.lower():
+                failure_reasons.append(f"Gender: need {gender_req}")
+
+        user_age = self._safe_int(user_profile.get('age', 0))
+        min_age = eligibility.get('min_age')
+        max_age = eligibility.get('max_age')
+        if min_age and user_age < min_age:
+            failure_reasons.append(f"Age: need ≥{min_age} (you: {user_age})")
+        if max_age and user_age > max_age:
+            failure_reasons.append(f"Age: need ≤{max_age} (you: {user_age})")
+
+        max_income = eligibility.get('max_income')
+        if max_income:
+            user_income = self._safe_int(user_profile.get('annual_income', 0))
+            if user_income > max_income:
+                failure_reasons.append(
+                    f"Income: need ≤₹{max_income:,} (you: ₹{user_income:,})"
+                )
+
+        return failure_reasons
+
+    def _failure_reason_text(self, user, eligibility, code):
+        """Human-readable requirement for one recounted check (state, gender, age, income)"""
+        if code == EligibilityMatrix.STATE_CODE:
+            return f"State: need {eligibility.get('states', 'all')}"
+        if code == EligibilityMatrix.GENDER_CODE:
+            return f"Gender: need {eligibility.get('gender', 'all')}"
+        if code == EligibilityMatrix.YOUNG_CODE:
+            user_age = self._safe_int(user.get('age', 0))
+            return f"Age: need ≥{eligibility.get('min_age')} (you: {user_age})"
+        if code == EligibilityMatrix.OLD_CODE:
+            user_age = self._safe_int(user.get('age', 0))
+            return f"Age: need ≤{eligibility.get('max_age')} (you: {user_age})"
+        user_income = self._safe_int(user.get('annual_income', 0))
+        return f"Income: need ≤₹{eligibility.get('max_income'):,} (you: ₹{user_income:,})"
+
+    # ──────────────────────────────────────────────
+    # DEFERRED EXPLANATIONS
+    # ──────────────────────────────────────────────
+
+    def with_explanation_tokens(self, results, user_profile):
+        """
+        Tag results with explanation tokens for user_profile.
+        Cached results are shared across profiles, so tokens are attached per
+        call on a fresh overlay instead of being stored in the cache.
+        """
+        return self._with_explanation_tokens(results, user_profile, self.catalog_version)
+
+    def _with_explanation_tokens(self, results, user_profile, catalog_version, profile_hash=None):
+        prefix = f"{catalog_version}:{profile_hash or self._remember_profile(user_profile)}:"
+        return [
+            MatchedScheme(result.scheme, {
+                **result._overlay,
+                'explanation_token': prefix + str(result.scheme.get('id'))
+            })
+            for result in results
+        ]
+
+    def _profile_hash(self, user_profile):
+        """
+        Keyed digest of the raw profile (reasons quote raw values, so no
+        canonicalization), prefixed with the key id: "<key id>.<digest>".
+        Tokens and cursors carry it, so it must not be a plain hash of PII.
+        """
+        payload = json.dumps(user_profile, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=8, key=PROFILE_DIGEST_KEY)
+        return f"{PROFILE_KEY_ID}.{digest.hexdigest()}"
+
+    def _remember_profile(self, user_profile):
+        """Keep the profile for explain_match() (bounded LRU); returns its hash"""
+        profile_hash = self._profile_hash(user_profile)
+        with self._explain_lock:
+            if profile_hash in self._explain_profiles:
+                self._explain_profiles.move_to_end(profile_hash)
+            else:
+                self._explain_profiles[profile_hash] = dict(user_profile)
+                while len(self._explain_profiles) > self.config.EXPLAIN_PROFILES:
+                    self._explain_profiles.popitem(last=False)
+        return profile_hash
+
+    def _recall_profile(self, profile_hash, user_profile, issued):
+        """
+        Profile behind a token / cursor: the caller's (checked against the
+        hash) or the recent-profile store's.
+
+        The store is per process: behind several workers a token or cursor
+        may reach one that never saw the profile, so clients resend it.
+        A digest made under another key can't be checked, so it is rejected
+        as invalid: workers must share PROFILE_DIGEST_KEY.
+        Returns: (profile, None) or (None, error dict)
+        """
+        if profile_hash.partition('.')[0] != PROFILE_KEY_ID:
+            return None, {
+                "error": f"This {issued} was issued under another PROFILE_DIGEST_KEY",
+                "reason": f"invalid_{issued}"
+            }
+
+        if user_profile is not None:
+            if self._profile_hash(user_profile) != profile_hash:
+                return None, {
+                    "error": f"user_profile is not the profile this {issued} was issued for",
+                    "reason": "profile_mismatch"
+                }
+            return user_profile, None
+
+        with self._explain_lock:
+            user_profile = self._explain_profiles.get(profile_hash)
+        if user_profile is None:
+            return None, {
+                "error": f"Profile no longer available; send user_profile with the {issued}",
+                "reason": "profile_unavailable"
+            }
+        return user_profile, None
+
+    def explain_match(self, token, user_profile=None):
+        """
+        Rebuild the reasons, ScoreBreakdown and adjustments behind a result.
+
+        Args:
+            token: explanation_token from a find_matches() result,
+                "<catalog version>:<profile hash>:<scheme id>"
+            user_profile: the matched profile, needed once it has aged out
+                of the engine's recent-profile store (must hash to the token)
+
+        Returns:
+            dict with match_score, match_tier, match_reasons, score_breakdown
+            and adjustments, or {"error": ..., "reason": code} where code is
+            'invalid_token', 'stale_catalog', 'profile_mismatch',
+            'profile_unavailable' or 'scheme_not_found'
+        """
+        parts = token.split(':', 2) if isinstance(token, str) else []
+        if len(parts) != 3:
+            return {"error": "Invalid explanation token", "reason": "invalid_token"}
+        catalog_version, profile_hash, scheme_id = parts
+
+        if catalog_version != self.catalog_version:
+            return {
+                "error": "The scheme catalog has changed since this match; match again",
+                "reason": "stale_catalog"
+            }
+
+        user_profile, error = self._recall_profile(profile_hash, user_profile, 'token')
+        if error:
+            return error
 
-        # Recommendation
-        if is_eligible and score >= 75:
-            recommendation = "🌟 Highly recommended! You meet all eligibility criteria."
-        elif is_eligible:
-            recommendation = "✅ You are eligible. Consider applying for this scheme."
-        elif len(failed_checks) == 1:
-            failed_field = failed_checks[0]['field']
-            recommendation = f"⚠️ Almost eligible! Only '{failed_field}' doesn't match."
-        else:
-            recommendation = f"❌ Not eligible. {len(failed_checks)} criteria don't match."
+        position = self._scheme_position(scheme_id)
+        if position is None:
+            return {"error": "Scheme not found", "reason": "scheme_not_found"}
+
+        scheme = self.schemes[position]
+        eligibility = scheme.get('eligibility', {})
+        passed, rejection_reason = self._hard_filter_checker(user_profile)(position, eligibility)
+        breakdown = self.scorer.calculate_detailed_score(user_profile, eligibility)
+        adjusted_score, adjustments = self._apply_adjustments(
+            breakdown.final_score, user_profile, scheme, eligibility
+        )
+        final_score = max(0, min(adjusted_score, 100)) if passed else 0
 
         return {
             "scheme_id": scheme_id,
             "scheme_name": scheme.get('name', ''),
-            "eligible": is_eligible,
-            "match_score": score,
-            "total_checks": len(checks),
-            "passed": len(passed_checks),
-            "failed": len(failed_checks),
-            "checks": checks,
-            "recommendation": recommendation
+            "eligible": passed,
+            "rejection_reason": rejection_reason,
+            "match_score": final_score,
+            "match_tier": MatchResult(scheme, final_score).tier,
+            "match_reasons": self._build_match_reasons(
+                user_profile, eligibility, final_score, adjustments
+            ) if passed else [f"❌ Not eligible: {rejection_reason}"],
+            "score_breakdown": breakdown.to_dict(),
+            "adjustments": adjustments,
+            "base_score": breakdown.final_score
         }
 
-    def find_near_misses(self, user_profile, max_results=5):
+    # ──────────────────────────────────────────────
+    # PAGINATED MATCHES
+    # ──────────────────────────────────────────────
+
+    def find_matches_page(self, user_profile=None, cursor=None, page_size=None,
+                          min_score=None, category_filter=None, type_filter=None):
         """
-        Find schemes the user ALMOST qualifies for
-        (failed only 1 hard filter)
-        Useful for showing "you're close to qualifying" suggestions
+        One page of the complete ranked match list, plus a cursor for the next.
+
+        The ranking (every scheme at or above min_score, in find_matches()
+        order, with no ABSOLUTE_MAX_RESULTS cut) is computed once per profile
+        class and cached as compact position / score arrays, so each page
+        only builds its own results.
+
+        Args:
+            user_profile: the profile (required without a cursor; with one,
+                only needed once the profile has aged out of the engine's
+                recent-profile store, and must hash to the cursor)
+            cursor: next_cursor from the previous page
+            page_size: results per page (default: the cursor's, else
+                DEFAULT_MAX_RESULTS; capped at ABSOLUTE_MAX_RESULTS)
+            min_score, category_filter, type_filter: as for find_matches()
+                (a cursor carries the first page's)
+
+        Returns:
+            dict with matches, total_matches, offset, page_size and
+            next_cursor (None on the last page), or {"error": ..., "reason": code}
+            where code is 'invalid_cursor', 'missing_profile', 'stale_catalog',
+            'profile_mismatch' or 'profile_unavailable'
         """
-        near_misses = []
+        catalog_version = self.catalog_version
+        offset = 0
+        if cursor is not None:
+            state = self._decode_cursor(cursor)
+            if state is None:
+                return {"error": "Invalid page cursor", "reason": "invalid_cursor"}
+            (cursor_version, profile_hash, offset, cursor_page_size,
+             min_score, category_filter, type_filter) = state
+            if cursor_version != catalog_version:
+                return {
+                    "error": "The scheme catalog has changed since this page; match again",
+                    "reason": "stale_catalog"
+                }
+            user_profile, error = self._recall_profile(profile_hash, user_profile, 'cursor')
+            if error:
+                return error
+            page_size = page_size or cursor_page_size
+        elif user_profile is None:
+            return {"error": "Send user_profile or a cursor", "reason": "missing_profile"}
+
+        page_size = min(
+            page_size or self.config.DEFAULT_MAX_RESULTS,
+            self.config.ABSOLUTE_MAX_RESULTS
+        )
+        min_score = min_score or self.config.MIN_MATCH_SCORE
+        ranking = self._ranking(user_profile, min_score, category_filter, type_filter)
 
-        for scheme in self.schemes:
-            eligibility = scheme.get('eligibility', {})
-            passed, reason = self._pass_hard_filters(user_profile, eligibility)
+        stop = offset + page_size
+        page = [
+            MatchResult(self.schemes[position], score).to_dict()
+            for position, score in zip(
+                ranking.positions[offset:stop].tolist(), ranking.scores[offset:stop].tolist()
+            )
+        ]
+        profile_hash = self._remember_profile(user_profile)
+        total = len(ranking.positions)
+
+        next_cursor = None
+        if stop < total:
+            next_cursor = self._encode_cursor((
+                catalog_version, profile_hash, stop, page_size,
+                min_score, category_filter, type_filter
+            ))
+        return {
+            "matches": self._with_explanation_tokens(page, user_profile, catalog_version, profile_hash),
+            "total_matches": total,
+            "offset": offset,
+            "page_size": page_size,
+            "next_cursor": next_cursor
+        }
 
-            if passed:
-                continue  # Already eligible, not a near miss
+    def _ranking(self, user_profile, min_score, category_filter=None, type_filter=None):
+        """Full MatchRanking for a profile, from the result cache or computed once"""
+        cache_key = "ranked|" + self._build_cache_key(
+            user_profile, category_filter, type_filter, min_score=min_score, max_results='all'
+        )
+        cache_generation = self._cache.generation
+        ranking = self._cache.get(cache_key)
+        if ranking is not None:
+            return ranking
+
+        screened, _ = self._index_prune(user_profile, category_filter, type_filter)
+        failure_masks = self._eligibility.failure_masks(user_profile)
+        reason_codes = EligibilityMatrix.FIRST_FAILURE[failure_masks[screened]]
+        self._record_rejections(reason_codes)
+        passing = screened[reason_codes == EligibilityMatrix.PASSED]
+        scored = self._score_all(user_profile, passing, min_score, defaultdict(list))
+
+        # find_matches() order: score descending, catalog order on ties
+        positions = np.array([entry[0] for entry in scored], dtype=np.int32)
+        scores = np.array([entry[1] for entry in scored], dtype=np.int16)
+        order = np.lexsort((positions, -scores))
+        ranking = MatchRanking(positions[order], scores[order].astype(np.uint8))
+
+        self._cache.set(cache_key, ranking, generation=cache_generation, tags={
+            'state': user_profile.get('state', ''),
+            'gender': user_profile.get('gender', '').lower(),
+            'category': category_filter,
+            'type': type_filter
+        })
+        return ranking
 
-            # Check how many filters failed
-            failures = 0
-            failure_reasons = []
+    @staticmethod
+    def _encode_cursor(state):
+        payload = json.dumps(list(state), separators=(',', ':'), ensure_ascii=False)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
 
-            # Re-check each filter individually
-            states = eligibility.get('states', 'all')
-            if states != 'all':
-                if user_profile.get('state', '') not in (
-                    states if isinstance(states, list) else [states]
-                ):
-                    failures += 1
-                    failure_reasons.append(f"State: need {states}")
+    @staticmethod
+    def _decode_cursor(cursor):
+        """Cursor state tuple, or None if the cursor is malformed"""
+        if not isinstance(cursor, str) or not cursor:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            state = json.loads(payload.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if not isinstance(state, list) or len(state) != 7:
+            return None
+        version, profile_hash, offset, page_size, min_score, category, type_filter = state
+        if not (isinstance(version, str) and isinstance(profile_hash, str)):
+            return None
+        if not all(type(n) is int for n in (offset, page_size, min_score)):
+            return None
+        if offset < 0 or page_size < 1:
+            return None
+        if not all(f is None or isinstance(f, str) for f in (category, type_filter)):
+            return None
+        return tuple(state)
 
-            gender_req = eligibility.get('gender', 'all')
-            if gender_req != 'all':
-                if user_profile.get('gender', '').lower() != gender_req.lower():
-                    failures += 1
-                    failure_reasons.append(f"Gender: need {gender_req}")
-
-            user_age = self._safe_int(user_profile.get('age', 0))
-            min_age = eligibility.get('min_age')
-            max_age = eligibility.get('max_age')
-            if min_age and user_age < min_age:
-                failures += 1
-                failure_reasons.append(f"Age: need ≥{min_age} (you: {user_age})")
-            if max_age and user_age > max_age:
-                failures += 1
-                failure_reasons.append(f"Age: need ≤{max_age} (you: {user_age})")
+    # ──────────────────────────────────────────────
+    # SESSION RE-MATCHING
+    # ──────────────────────────────────────────────
 
-            max_income = eligibility.get('max_income')
-            if max_income:
-                user_income = self._safe_int(user_profile.get('annual_income', 0))
-                if user_income > max_income:
-                    failures += 1
-                    failure_reasons.append(
-                        f"Income: need ≤₹{max_income:,} (you: ₹{user_income:,})"
-                    )
+    def find_session_matches(self, session_id, user_profile, max_results=None, min_score=None):
+        """
+        find_matches() for a conversation whose profile is refined a field
+        at a time. The session's per-scheme state is kept between calls, so
+        only the fields that changed since its last profile are re-filtered
+        and re-scored across the catalog (see SessionMatchState).
+
+        Args:
+            session_id: conversation key (state is LRU-bounded by SESSION_STATES)
+            user_profile: the session's current profile
+            max_results / min_score: as for find_matches()
 
-            # Only 1 failure = near miss
-            if failures == 1:
-                scheme_copy = deepcopy(scheme)
-                scheme_copy['near_miss'] = True
-                scheme_copy['failure_reasons'] = failure_reasons
-                scheme_copy['failures_count'] = failures
-                near_misses.append(scheme_copy)
+        Returns:
+            Same list as find_matches(user_profile, max_results, min_score)
+        """
+        max_results = min(
+            max_results or self.config.DEFAULT_MAX_RESULTS,
+            self.config.ABSOLUTE_MAX_RESULTS
+        )
+        min_score = min_score or self.config.MIN_MATCH_SCORE
 
-        return near_misses[:max_results]
+        # Take the state out while updating it, so a concurrent turn of the
+        # same session builds its own instead of sharing a half-updated one
+        with self._session_lock:
+            state = self._session_states.pop(session_id, None)
+        if state is None or state.catalog_version != self.catalog_version:
+            state = SessionMatchState(self, user_profile)
+            self._session_stats['full_matches'] += 1
+        else:
+            changed = state.update(user_profile)
+            self._session_stats['delta_matches' if changed else 'unchanged'] += 1
+            self._session_stats['fields_recomputed'] += len(changed)
+
+        results = [
+            MatchResult(state.schemes[position], score).to_dict()
+            for position, score in state.top(max_results, min_score)
+        ]
+        with self._session_lock:
+            self._session_states[session_id] = state
+            while len(self._session_states) > self.config.SESSION_STATES:
+                self._session_states.popitem(last=False)
+        return self._with_explanation_tokens(results, user_profile, state.catalog_version)
+
+    def end_session(self, session_id):
+        """Drop a conversation's match state (e.g. when the chat is reset)"""
+        with self._session_lock:
+            return self._session_states.pop(session_id, None) is not None
+
+    def get_session_stats(self):
+        with self._session_lock:
+            active = len(self._session_states)
+        return {"active_sessions": active, **self._session_stats}
 
     # ──────────────────────────────────────────────
     # BATCH OPERATIONS
     # ──────────────────────────────────────────────
 
-    def batch_match(self, user_profiles, max_results_each=10):
+    def batch_match(self, user_profiles, max_results_each=10, explanation_tokens=False):
         """
         Match multiple user profiles at once
 
         Args:
             user_profiles: list of user profile dicts
             max_results_each: max results per user
+            explanation_tokens: tag results with explanation tokens (keeps
+                every profile in the recent-profile store; off by default)
 
         Returns:
             List of result sets, one per user
+
+        For large lists prefer batch_match_compact(), which scores every
+        profile in one vectorized pass and skips caching/deep copies.
         """
         all_results = []
         start_time = time.time()
@@ -1028,7 +3282,8 @@ class MatchingEngine:
             results = self.find_matches(
                 profile,
                 max_results=max_results_each,
-                include_reasons=False
+                include_reasons=False,
+                explanation_tokens=explanation_tokens
             )
             all_results.append({
                 "profile_index": i,
@@ -1044,6 +3299,243 @@ class MatchingEngine:
 
         return all_results
 
+    def batch_match_compact(self, user_profiles, max_results_each=10, min_score=None,
+                            category_filter=None, type_filter=None, chunk_size=None,
+                            track_stats=True):
+        """
+        Vectorized batch matching for large beneficiary lists.
+
+        Hard filters, ScoringEngine scores and boost/penalty adjustments are
+        evaluated as profiles × schemes matrices, chunk by chunk. Ranking and
+        scores are identical to find_matches() (see verify_batch_parity), but
+        nothing is cached, logged per profile, deep-copied or kept in the
+        recent-profile store.
+        track_stats=False keeps offline jobs out of the filter analytics.
+
+        Returns:
+            List of BatchMatch(profile_index, scheme_id, score, tier),
+            grouped by profile and ranked within each profile
+        """
+        return list(self.iter_batch_matches(
+            user_profiles, max_results_each, min_score,
+            category_filter, type_filter, chunk_size, track_stats
+        ))
+
+    def iter_batch_matches(self, user_profiles, max_results_each=10, min_score=None,
+                           category_filter=None, type_filter=None, chunk_size=None,
+                           track_stats=True, first_index=0):
+        """
+        Generator form of batch_match_compact (streams one chunk at a time).
+        first_index offsets profile_index, for callers matching a long
+        stream slice by slice.
+        """
+        start_time = time.time()
+        max_results = min(
+            max_results_each or self.config.DEFAULT_MAX_RESULTS,
+            self.config.ABSOLUTE_MAX_RESULTS
+        )
+        min_score = min_score or self.config.MIN_MATCH_SCORE
+        chunk_size = chunk_size or self.config.BATCH_CHUNK_SIZE
+
+        candidates = self._pre_filter(category_filter, type_filter)
+        scheme_ids = [self.schemes[position].get('id') for position in candidates.tolist()]
+        tiers = [MatchResult({}, score).tier for score in range(101)]
+        total = 0
+
+        for offset in range(0, len(user_profiles), chunk_size):
+            chunk = user_profiles[offset:offset + chunk_size]
+            scores = self._score_chunk(chunk, candidates, min_score, track_stats)
+            row_index = first_index + offset
+
+            # Rank key: higher score first, then catalog order (stable sort in find_matches)
+            count = scores.shape[1]
+            keys = scores * count + (count - 1 - np.arange(count))
+            keep = min(max_results, count)
+            if keep == 0:
+                continue
+            top = np.argpartition(-keys, keep - 1, axis=1)[:, :keep]
+            order = np.take_along_axis(
+                top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1
+            )
+            ranked = np.take_along_axis(scores, order, axis=1)
+
+            for row, (columns, values) in enumerate(zip(order.tolist(), ranked.tolist())):
+                for column, score in zip(columns, values):
+                    if score < 0:
+                        break
+                    total += 1
+                    yield BatchMatch(row_index + row, scheme_ids[column], score, tiers[score])
+
+        elapsed = round((time.time() - start_time) * 1000, 2)
+        logger.info(
+            f"Vectorized batch matched {len(user_profiles)} profiles "
+            f"({total} results) in {elapsed}ms"
+        )
+
+    def _score_chunk(self, profiles, candidates, min_score, track_stats=True):
+        """
+        Final scores (profiles × candidates) for one chunk, -1 where the
+        scheme is hard-filtered out or scores below min_score
+        """
+        encoded = self._eligibility.encode_profiles(profiles)
+        reason_codes = self._eligibility.reason_code_matrix(encoded)[:, candidates]
+        if track_stats:
+            self._record_rejections(reason_codes.ravel())
+
+        # TIER 2 + TIER 3 over the whole chunk
+        base = self.scorer.score_profiles(profiles, self._scoring_columns)
+        adjusted = base + self._adjustment_matrix(profiles, encoded)
+        final = np.clip(adjusted, 0, 100)[:, candidates]
+
+        passed = reason_codes == EligibilityMatrix.PASSED
+        low = passed & (final < min_score)
+        if track_stats:
+            self._filter_stats[FilterReason.LOW_SCORE] += int(low.sum())
+
+        return np.where(passed & ~low, final, -1)
+
+    def score_population(self, columns, schemes=None):
+        """
+        Hard filters and final scores for a columnar population (layout as in
+        ScoringEngine.encode_columns) in one vectorized pass, against the
+        catalog or against `schemes` compiled on the fly (e.g. what-if
+        variants). Scores equal find_matches' for the same profiles;
+        nothing is counted in filter stats or scoring analytics.
+
+        Returns: (int8 reason codes, int64 final scores), people × schemes
+        """
+        if schemes is None:
+            matrix, scoring_columns = self._eligibility, self._scoring_columns
+        else:
+            matrix, scoring_columns = EligibilityMatrix(schemes), self.scorer.compile_columns(schemes)
+
+        encoded = matrix.encode_columns(columns)
+        users = self.scorer.encode_columns(columns)
+        gradients = self.scorer.field_gradients(users, scoring_columns)
+        base = self.scorer.combine_gradients(users, gradients, scoring_columns)
+
+        genders = columns['gender'].map(str.lower)
+        female = genders.take(np.array([gender == 'female' for gender in genders.values], dtype=bool))
+        adjustments = self._adjustment_columns(
+            matrix, encoded, np.asarray(columns['disability'], dtype=bool), female,
+            columns['occupation'].map(str.lower), columns['category'].map(str.lower)
+        )
+        return matrix.reason_code_matrix(encoded), np.clip(base + adjustments, 0, 100)
+
+    def _adjustment_matrix(self, profiles, encoded):
+        """Vectorized _apply_adjustments: net boost/penalty (profiles × schemes)"""
+        return self._adjustment_columns(self._eligibility, encoded, *self._adjustment_inputs(profiles))
+
+    @staticmethod
+    def _adjustment_inputs(profiles):
+        """Profile columns the adjustments read: (disability, female, occupations, categories)"""
+        disability = []
+        genders, occupations, categories = [], [], []
+        for user in profiles:
+            user_disability = user.get('disability', False)
+            if isinstance(user_disability, str):
+                user_disability = user_disability.lower() == 'true'
+            disability.append(bool(user_disability))
+            genders.append(user.get('gender', '').lower())
+            occupations.append(user.get('occupation', '').lower())
+            categories.append(user.get('category', '').lower())
+
+        female = np.array([gender == 'female' for gender in genders], dtype=bool)
+        return np.array(disability, dtype=bool), female, occupations, categories
+
+    def _adjustment_columns(self, matrix, encoded, disability, female, occupations, categories):
+        """
+        _adjustment_matrix over normalized columns: disability / female bool
+        arrays, lowered occupations / categories (lists or CategoricalColumn)
+        """
+        return sum(self._adjustment_terms(
+            matrix, encoded, disability, female, occupations, categories
+        ).values())
+
+    # TIER 3 terms, each read from one or two profile fields (see SessionMatchState)
+    ADJUSTMENT_TERMS = ('personal', 'static', 'bpl', 'women', 'occupation', 'category')
+
+    def _adjustment_terms(self, matrix, encoded, disability, female, occupations, categories,
+                          terms=ADJUSTMENT_TERMS):
+        """
+        The adjustment terms named in `terms`, each broadcastable to
+        profiles × schemes; their (integer) sum is the net adjustment
+        """
+        config = self.config
+        _, _, ages, _, bpl = encoded
+        built = {}
+
+        for term in terms:
+            if term == 'personal':
+                # Per-profile boosts
+                built[term] = (
+                    np.where(disability, config.BOOST_DISABILITY, 0)
+                    + np.where(ages >= 60, config.BOOST_SENIOR_CITIZEN, 0)
+                )[:, None]
+            elif term == 'static':
+                # Per-scheme penalties
+                built[term] = -(
+                    np.where(matrix.has_url, 0, config.PENALTY_NO_URL)
+                    + np.where(matrix.has_description, 0, config.PENALTY_NO_DESCRIPTION)
+                )
+            elif term == 'bpl':
+                built[term] = np.where(bpl[:, None] & matrix.bpl_required, config.BOOST_BPL, 0)
+            elif term == 'women':
+                built[term] = np.where(female[:, None] & matrix.women_only, config.BOOST_WOMEN, 0)
+            elif term == 'occupation':
+                built[term] = np.where(matrix.exact_matches('occupations', occupations),
+                                       config.BOOST_EXACT_OCCUPATION, 0)
+            elif term == 'category':
+                built[term] = np.where(matrix.exact_matches('categories', categories),
+                                       config.BOOST_EXACT_CATEGORY, 0)
+        return built
+
+    def verify_batch_parity(self, user_profiles, max_results_each=10, min_score=None,
+                            category_filter=None, type_filter=None):
+        """
+        Check batch_match_compact against per-profile find_matches.
+        Returns: dict with checked/mismatched profile counts and examples
+        """
+        compact = defaultdict(list)
+        for match in self.batch_match_compact(
+            user_profiles, max_results_each, min_score, category_filter, type_filter
+        ):
+            compact[match.profile_index].append(
+                (match.scheme_id, match.score, match.tier)
+            )
+
+        mismatches = []
+        for i, profile in enumerate(user_profiles):
+            # Bypass the result cache so every profile is really re-matched
+            self._cache.discard(self._build_cache_key(
+                profile, category_filter, type_filter,
+                min_score=min_score or self.config.MIN_MATCH_SCORE,
+                max_results=min(
+                    max_results_each or self.config.DEFAULT_MAX_RESULTS,
+                    self.config.ABSOLUTE_MAX_RESULTS
+                )
+            ))
+            expected = [
+                (scheme.get('id'), scheme['match_score'], scheme['match_tier'])
+                for scheme in self.find_matches(
+                    profile, max_results=max_results_each, min_score=min_score,
+                    category_filter=category_filter, type_filter=type_filter,
+                    explanation_tokens=False
+                )
+            ]
+            if expected != compact.get(i, []):
+                mismatches.append({
+                    'profile_index': i,
+                    'expected': expected,
+                    'batch': compact.get(i, [])
+                })
+
+        return {
+            'profiles_checked': len(user_profiles),
+            'mismatches': len(mismatches),
+            'examples': mismatches[:5]
+        }
+
     # ──────────────────────────────────────────────
     # SCHEME LOOKUP
     # ──────────────────────────────────────────────
@@ -1053,52 +3545,282 @@ class MatchingEngine:
         return self._find_scheme(scheme_id)
 
     def _find_scheme(self, scheme_id):
-        """Internal scheme lookup"""
-        for scheme in self.schemes:
-            if scheme.get('id') == scheme_id:
-                return scheme
-        return None
-
-    def update_schemes(self, new_schemes):
-        """Update scheme list and clear cache"""
-        self.schemes = new_schemes
-        self.clear_cache()
-        logger.info(f"🔄 Updated to {len(new_schemes)} schemes, cache cleared")
+        """Internal scheme lookup (O(1) through the id index)"""
+        position = self._scheme_position(scheme_id)
+        return None if position is None else self.schemes[position]
+
+    def _scheme_position(self, scheme_id):
+        """Catalog position of a scheme id, or None (unknown or unhashable id)"""
+        try:
+            return self._positions.get(scheme_id)
+        except TypeError:
+            return None
+
+    @staticmethod
+    def _index_positions(schemes):
+        """id → catalog position; the first occurrence wins, like a linear scan"""
+        positions = {}
+        for position, scheme in enumerate(schemes):
+            try:
+                positions.setdefault(scheme.get('id'), position)
+            except TypeError:
+                continue
+        return positions
+
+    def update_schemes(self, new_schemes, changeset=None):
+        """
+        Swap in an updated catalog, invalidating only what it can affect.
+
+        The new catalog is diffed against the current one by scheme id and
+        signature (or `changeset`, a dict of 'added' / 'removed' / 'modified'
+        id lists, is trusted instead). In-place edits and appended schemes
+        patch the compiled structures row by row; only cache entries whose
+        results could change are dropped (those listing a changed scheme,
+        or whose state / gender / filters admit an added or re-ranked one).
+        Reordered catalogs or duplicate ids fall back to a full rebuild.
+
+        Returns: CatalogDiff, or None when everything was rebuilt and cleared
+        """
+        old_schemes, old = self.schemes, self.get_compiled_catalog()
+        signatures = self._scheme_signatures(new_schemes)
+        diff = self._diff_catalog(old_schemes, old, new_schemes, signatures, changeset)
+
+        # Compile before swapping so the engine never sees a half-built catalog
+        compiled = None
+        if diff is not None:
+            compiled = self._patch_catalog(old_schemes, old, new_schemes, signatures, diff)
+        patched = compiled is not None
+        if compiled is None:
+            compiled = self.compile_catalog(new_schemes, signatures)
+        self._install_catalog(new_schemes, compiled)
+
+        if diff is None:
+            self.clear_cache()
+            logger.info(f"🔄 Updated to {len(new_schemes)} schemes, cache cleared")
+            return None
+
+        dropped = self._invalidate_changed(old_schemes, new_schemes, diff)
+        logger.info(
+            f"🔄 Updated to {len(new_schemes)} schemes "
+            f"(+{len(diff.added)} -{len(diff.removed)} ~{len(diff.ranking_changed)} "
+            f"ranking, ~{len(diff.payload_changed)} payload; "
+            f"{'patched' if patched else 'recompiled'}), {dropped} cache entries invalidated"
+        )
+        return diff
+
+    def compile_catalog(self, schemes, signatures=None):
+        """Build every per-catalog structure the engine matches against"""
+        signatures = signatures or self._scheme_signatures(schemes)
+        scoring_columns = self.scorer.compile_columns(schemes)
+        return CompiledCatalog(
+            version=self._catalog_version(signatures),
+            eligibility=EligibilityMatrix(schemes),
+            index=SchemeBitmapIndex(schemes),
+            scoring_columns=scoring_columns,
+            canonical=ProfileCanonicalizer(schemes, self.scorer, scoring_columns),
+            signatures=signatures
+        )
+
+    def _install_catalog(self, schemes, compiled):
+        self.schemes = schemes
+        self.catalog_version = compiled.version
+        self._eligibility = compiled.eligibility
+        self._index = compiled.index
+        self._scoring_columns = compiled.scoring_columns
+        self._canonical = compiled.canonical
+        self._signatures = compiled.signatures
+        self._positions = self._index_positions(schemes)
+
+    def get_compiled_catalog(self):
+        """The compiled structures currently in use (see compile_catalog)"""
+        return CompiledCatalog(
+            self.catalog_version, self._eligibility, self._index,
+            self._scoring_columns, self._canonical, self._signatures
+        )
+
+    @staticmethod
+    def _scheme_signatures(schemes):
+        """
+        Per-scheme digests, in catalog order: (id, ranking digest, record digest).
+        The ranking digest covers everything matching reads from a scheme.
+        """
+        def digest(value):
+            payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+            return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+        return tuple(
+            (
+                scheme.get('id'),
+                digest([
+                    scheme.get('eligibility', {}),
+                    bool(scheme.get('url')),
+                    bool(scheme.get('description')),
+                    scheme.get('category', '').lower(),
+                    scheme.get('type', '').lower(),
+                ]),
+                digest(scheme)
+            )
+            for scheme in schemes
+        )
+
+    @staticmethod
+    def _diff_catalog(old_schemes, old, new_schemes, signatures, changeset=None):
+        """
+        CatalogDiff between the installed catalog and a new one, or None when
+        the catalogs can't be compared scheme by scheme (duplicate ids, or
+        surviving schemes in a different order, which changes tie-breaking)
+        """
+        old_ids = [sig[0] for sig in old.signatures]
+        new_ids = [sig[0] for sig in signatures]
+        old_set, new_set = set(old_ids), set(new_ids)
+        if len(old_set) != len(old_ids) or len(new_set) != len(new_ids):
+            return None
+        if [i for i in old_ids if i in new_set] != [i for i in new_ids if i in old_set]:
+            return None
+
+        if changeset is not None:
+            return CatalogDiff(
+                added=tuple(changeset.get('added', ())),
+                removed=tuple(changeset.get('removed', ())),
+                ranking_changed=tuple(changeset.get('modified', ())),
+                payload_changed=()
+            )
+
+        before = {sig[0]: sig[1:] for sig in old.signatures}
+        ranking_changed, payload_changed = [], []
+        for scheme_id, ranking, record in signatures:
+            previous = before.get(scheme_id)
+            if previous is None:
+                continue
+            if previous[0] != ranking:
+                ranking_changed.append(scheme_id)
+            elif previous[1] != record:
+                payload_changed.append(scheme_id)
+
+        return CatalogDiff(
+            added=tuple(i for i in new_ids if i not in old_set),
+            removed=tuple(i for i in old_ids if i not in new_set),
+            ranking_changed=tuple(ranking_changed),
+            payload_changed=tuple(payload_changed)
+        )
+
+    def _patch_catalog(self, old_schemes, old, new_schemes, signatures, diff):
+        """
+        Patched copies of the compiled structures when every existing scheme
+        keeps its position (in-place edits, appends); None otherwise
+        """
+        if diff.removed or [sig[0] for sig in signatures[:len(old_schemes)]] != [
+            sig[0] for sig in old.signatures
+        ]:
+            return None
+
+        changed = set(diff.ranking_changed)
+        positions = [
+            i for i, sig in enumerate(signatures[:len(old_schemes)]) if sig[0] in changed
+        ] + list(range(len(old_schemes), len(new_schemes)))
+
+        if not positions:
+            # Payload-only edits: nothing matching reads has changed
+            return old._replace(version=self._catalog_version(signatures), signatures=signatures)
+
+        scoring_columns = old.scoring_columns.patched(new_schemes, positions)
+        return CompiledCatalog(
+            version=self._catalog_version(signatures),
+            eligibility=old.eligibility.patched(new_schemes, positions),
+            index=old.index.patched(new_schemes, positions),
+            scoring_columns=scoring_columns,
+            canonical=ProfileCanonicalizer(new_schemes, self.scorer, scoring_columns),
+            signatures=signatures
+        )
+
+    def _invalidate_changed(self, old_schemes, new_schemes, diff):
+        """Drop cache entries a CatalogDiff can affect; returns how many"""
+        if not hasattr(self._cache, 'invalidate_where'):
+            self._cache.invalidate()
+            return -1
+
+        stale_ids = set(diff.removed) | set(diff.ranking_changed) | set(diff.payload_changed)
+        entering = set(diff.added) | set(diff.ranking_changed)
+        # Both versions of a re-ranked scheme: it may leave or enter results
+        candidates = [
+            scheme for scheme in old_schemes + new_schemes
+            if scheme.get('id') in entering
+        ]
+
+        def affected(results, tags):
+            if isinstance(results, MatchRanking):
+                return True     # positions refer to the old catalog
+            if any(result.get('id') in stale_ids for result in results):
+                return True
+            if tags is None:
+                return bool(candidates)
+            return any(self._could_match(scheme, tags) for scheme in candidates)
+
+        return self._cache.invalidate_where(affected)
+
+    @staticmethod
+    def _could_match(scheme, tags):
+        """
+        Could this scheme appear in a cached entry's results? Checks only
+        what every profile sharing the entry's key has in common: the state
+        and gender hard filters and the category / type pre-filters.
+        """
+        eligibility = scheme.get('eligibility', {})
+        states = eligibility.get('states', 'all')
+        if states != 'all':
+            allowed = states if isinstance(states, list) else [states]
+            if tags['state'] not in allowed:
+                return False
+
+        gender_req = eligibility.get('gender', 'all')
+        if gender_req != 'all' and tags['gender'] and tags['gender'] != gender_req.lower():
+            return False
+
+        if tags['category'] and scheme.get('category', '').lower() != tags['category'].lower():
+            return False
+        if tags['type'] and scheme.get('type', '').lower() != tags['type'].lower():
+            return False
+        return True
 
     # ──────────────────────────────────────────────
     # CACHE MANAGEMENT
     # ──────────────────────────────────────────────
 
-    def _build_cache_key(self, profile, category=None, type_filter=None):
-        """Build deterministic cache key from profile"""
-        key_parts = []
-        for field in sorted(self.config.PROFILE_FIELDS.keys()):
-            val = profile.get(field, '')
-            key_parts.append(f"{field}={val}")
+    def _build_cache_key(self, profile, category=None, type_filter=None,
+                         min_score=None, max_results=None, include_reasons=False):
+        """
+        Build deterministic cache key from profile.
+        Profiles in the same equivalence class share a key; match reasons
+        quote the user's raw values, so with include_reasons they are keyed raw.
+        """
+        if include_reasons:
+            key_parts = ["raw"] + [
+                f"{field}={profile.get(field, '')!r}"
+                for field in ProfileCanonicalizer.KEY_FIELDS + ProfileCanonicalizer.FLAG_FIELDS
+            ]
+        else:
+            key_parts = [self._canonical.key(profile)]
         if category:
-            key_parts.append(f"cat={category}")
+            key_parts.append(f"cat={category.lower()}")
         if type_filter:
-            key_parts.append(f"type={type_filter}")
+            key_parts.append(f"type={type_filter.lower()}")
+        key_parts.append(f"min={min_score}|max={max_results}")
         return "|".join(key_parts)
 
+    def canonical_key(self, profile):
+        """Equivalence-class key: profiles sharing it get identical matches"""
+        return self._canonical.key(profile)
+
     def clear_cache(self):
         """Clear the results cache"""
-        self._cache.clear()
+        self._cache.invalidate()
         logger.info("💾 Matching cache cleared")
 
     def get_cache_stats(self):
         """Get cache performance stats"""
-        total = self._cache_hits + self._cache_misses
-        hit_rate = round(
-            (self._cache_hits / total * 100), 1
-        ) if total > 0 else 0
-
-        return {
-            "cached_profiles": len(self._cache),
-            "cache_hits": self._cache_hits,
-            "cache_misses": self._cache_misses,
-            "hit_rate": f"{hit_rate}%"
-        }
+        stats = self._cache.stats()
+        stats["equivalence_classes"] = self._canonical.stats()
+        return stats
 
     # ──────────────────────────────────────────────
     # ANALYTICS
@@ -1120,6 +3842,23 @@ class MatchingEngine:
 
         return stats
 
+    def get_index_stats(self):
+        """Bitmap index statistics plus how much each pruning index has dropped"""
+        screened = self._index_screened
+        return {
+            "attributes": self._index.stats(),
+            "candidates_screened": screened,
+            "pruned": dict(self._index_pruned),
+            "pruned_share": {
+                attribute: f"{(count / screened * 100):.1f}%"
+                for attribute, count in self._index_pruned.items()
+            } if screened else {}
+        }
+
+    def get_filter_order(self):
+        """Current adaptive hard-filter order with per-check rates and estimated savings"""
+        return self._filter_order.stats()
+
     def get_performance_stats(self):
         """Get matching performance statistics"""
         avg_time = round(
@@ -1132,6 +3871,18 @@ class MatchingEngine:
             "average_time_ms": avg_time,
             "cache": self.get_cache_stats(),
             "filter_stats": self.get_filter_stats(),
+            "index_pruning": {
+                "screened": self._index_screened,
+                "pruned": dict(self._index_pruned)
+            },
+            "topk": {
+                "enabled": self.config.TOPK_PRUNING,
+                "fully_scored": self._topk_scored,
+                "pruned": self._topk_pruned
+            },
+            "sessions": self.get_session_stats(),
+            "stages": self._stage_timings.stats(),
+            "filter_order": self.get_filter_order(),
             "recent_matches": self._match_history[-5:] if self._match_history else []
         }
 
@@ -1149,6 +3900,12 @@ class MatchingEngine:
         except (ValueError, TypeError):
             return default
 
+    @staticmethod
+    def _catalog_version(signatures):
+        """Content hash of the catalog (changes whenever any scheme or the order does)"""
+        payload = "|".join(f"{scheme_id}:{record}" for scheme_id, _, record in signatures)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
     @staticmethod
     def _summarize_profile(profile):
         """Create a short summary string of user profile"""
@@ -1178,17 +3935,24 @@ class MatchingEngine:
 # ──────────────────────────────────────────────
 
 if __name__ == '__main__':
+    import os
     import json
 
     print("=" * 55)
     print("🧪 Matching Engine Test Mode")
     print("=" * 55)
 
-    # Load schemes
-    schemes_path = os.path.join(os.path.dirname(__file__), 'schemes.json') \
-        if '__file__' in dir() else 'schemes.json'
+    # Parity / property checks record failures; the run exits 1 if any failed
+    # (❌ lines from the near-miss and rejection demos are sample output)
+    failed_checks = []
 
-    import os
+    def verify(ok, message, indent="   "):
+        print(f"{indent}{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failed_checks.append(message)
+        return ok
+
+    # Load schemes
     file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
 
     try:
@@ -1257,6 +4021,528 @@ if __name__ == '__main__':
             for nm in near_misses:
                 print(f"      {nm['name']}: {nm['failure_reasons']}")
 
+    # Eligibility matrix parity with the scalar hard filters
+    print(f"\n{'═' * 55}")
+    print("🧮 Eligibility Matrix Parity:")
+    mismatches = 0
+    for test in test_profiles:
+        passed, reasons = engine._eligibility.screen(test['profile'])
+        for i, scheme in enumerate(schemes):
+            expected = engine._pass_hard_filters(test['profile'], scheme.get('eligibility', {}))
+            if expected != (bool(passed[i]), reasons[i]):
+                mismatches += 1
+                print(f"   ❌ {scheme.get('id')}: expected {expected}, got {(passed[i], reasons[i])}")
+    print(f"   {repr(engine._eligibility)}")
+    verify(mismatches == 0, f"Checked {len(test_profiles) * len(schemes)} pairs, {mismatches} mismatches")
+
+    # Near misses read the screening pass with the original per-check recount
+    print(f"\n{'═' * 55}")
+    print("🎯 Single-pass Near Misses:")
+    import random
+
+    def recount_near_misses(check_engine, profile):
+        """find_near_misses as it used to be: a scalar recount of every failing scheme"""
+        found = []
+        for scheme in check_engine.schemes:
+            eligibility = scheme.get('eligibility', {})
+            if check_engine._pass_hard_filters(profile, eligibility)[0]:
+                continue
+            reasons = []
+            states = eligibility.get('states', 'all')
+            if states != 'all' and profile.get('state', '') not in (
+                states if isinstance(states, list) else [states]
+            ):
+                reasons.append(f"State: need {states}")
+            gender_req = eligibility.get('gender', 'all')
+            if gender_req != 'all' and profile.get('gender', '').lower() != gender_req.lower():
+                reasons.append(f"Gender: need {gender_req}")
+            user_age = check_engine._safe_int(profile.get('age', 0))
+            min_age, max_age = eligibility.get('min_age'), eligibility.get('max_age')
+            if min_age and user_age < min_age:
+                reasons.append(f"Age: need ≥{min_age} (you: {user_age})")
+            if max_age and user_age > max_age:
+                reasons.append(f"Age: need ≤{max_age} (you: {user_age})")
+            max_income = eligibility.get('max_income')
+            if max_income:
+                user_income = check_engine._safe_int(profile.get('annual_income', 0))
+                if user_income > max_income:
+                    reasons.append(f"Income: need ≤₹{max_income:,} (you: ₹{user_income:,})")
+            if len(reasons) == 1:
+                found.append((scheme.get('id'), reasons))
+        return found
+
+    near_rng = random.Random(11)
+    near_states = sorted({
+        state for scheme in schemes
+        for state in (scheme.get('eligibility', {}).get('states') or [])
+        if scheme.get('eligibility', {}).get('states') != 'all'
+    }) + ['Delhi', '']
+    near_profiles = [t['profile'] for t in test_profiles] + [
+        {
+            "age": near_rng.choice([0, 17, 18, 60, near_rng.randint(-2, 95)]),
+            "gender": near_rng.choice(["male", "female", "other", ""]),
+            "state": near_rng.choice(near_states),
+            "annual_income": near_rng.choice([0, 150000, near_rng.randint(-10, 1500000)]),
+            "is_bpl": near_rng.choice([True, False, "true", "no"]),
+        }
+        for _ in range(1500)
+    ]
+    # Limits the cast columns can't recount (zero, fractional, negative caps, tuple states)
+    irregular = [
+        {**scheme, 'id': f"{scheme.get('id')}-x", 'eligibility': {
+            **scheme.get('eligibility', {}),
+            **near_rng.choice([{'min_age': 17.5}, {'max_age': 0}, {'max_income': 0},
+                               {'max_income': -5}, {'states': ('Bihar',)}, {'min_age': 0}])
+        }}
+        for scheme in schemes[:20]
+    ]
+    for label, check_engine in (("catalog", engine),
+                                ("irregular limits", MatchingEngine(schemes + irregular))):
+        mismatches = 0
+        for profile in near_profiles:
+            got = [
+                (nm['id'], list(nm['failure_reasons']))
+                for nm in check_engine.find_near_misses(profile, max_results=len(check_engine.schemes))
+            ]
+            expected = recount_near_misses(check_engine, profile)
+            mismatches += got != expected
+            mismatches += [nm['id'] for nm in check_engine.find_near_misses(profile)] != \
+                [scheme_id for scheme_id, _ in expected[:5]]
+        verify(mismatches == 0, f"{label}: {len(near_profiles)} profiles vs "
+              f"the scalar recount, {mismatches} mismatches")
+
+    profile = test_profiles[0]['profile']
+    timings = {}
+    for label, call in (
+        ("near misses (screening pass)", lambda: engine.find_near_misses(profile)),
+        ("scalar recount", lambda: recount_near_misses(engine, profile)),
+    ):
+        start = time.time()
+        for _ in range(200):
+            call()
+        timings[label] = (time.time() - start) * 1000 / 200
+    print("   " + ", ".join(f"{label}: {ms:.3f}ms" for label, ms in timings.items()))
+
+    # Deferred explanations: tokens on the hot path, reasons rebuilt on demand
+    print(f"\n{'═' * 55}")
+    print("💬 Deferred Explanations:")
+    mismatches = checked = 0
+    for test in test_profiles:
+        eager = engine.find_matches(test['profile'], include_reasons=True)
+        for eager_result, result in zip(eager, engine.find_matches(test['profile'])):
+            explanation = engine.explain_match(result['explanation_token'])
+            checked += 1
+            mismatches += (explanation['match_score'], explanation['match_reasons']) \
+                != (eager_result['match_score'], list(eager_result['match_reasons']))
+    verify(mismatches == 0, f"{checked} explanations vs include_reasons: "
+          f"{mismatches} mismatches")
+    print(f"   Token: {result['explanation_token']}")
+    timings = {}
+    for label, include_reasons in (("default", False), ("include_reasons", True)):
+        start = time.time()
+        for _ in range(200):
+            engine.clear_cache()
+            engine.find_matches(profile, include_reasons=include_reasons)
+        timings[label] = (time.time() - start) * 1000 / 200
+    print("   find_matches " + ", ".join(f"{label}: {ms:.3f}ms" for label, ms in timings.items()))
+
+    # TIER 3 on the default path: one numeric row vs per-scheme boost/penalty text
+    timings = {}
+    start = time.time()
+    for _ in range(200):
+        engine._adjustment_row(profile)
+    timings["adjustment row"] = (time.time() - start) * 1000 / 200
+    start = time.time()
+    for _ in range(200):
+        for scheme in engine.schemes:
+            engine._apply_adjustments(0, profile, scheme, scheme.get('eligibility', {}))
+    timings["text per scheme"] = (time.time() - start) * 1000 / 200
+    row = engine._adjustment_row(profile)
+    mismatches = sum(
+        int(row[position]) != engine._apply_adjustments(
+            0, profile, scheme, scheme.get('eligibility', {})
+        )[0]
+        for position, scheme in enumerate(engine.schemes)
+    )
+    verify(mismatches == 0, f"adjustment row vs _apply_adjustments: {mismatches} mismatches")
+    print(f"   adjustments over {len(engine.schemes)} schemes " + ", ".join(
+        f"{label}: {ms:.3f}ms" for label, ms in timings.items()))
+
+    # Vectorized batch mode: parity with find_matches + throughput
+    import random
+    rng = random.Random(42)
+    states = sorted({s for sc in schemes for s in (sc.get('eligibility', {}).get('states') or [])
+                     if sc.get('eligibility', {}).get('states') != 'all'}) + ['Delhi', '']
+    synthetic = [
+        {
+            "age": rng.randint(0, 90),
+            "gender": rng.choice(["male", "female", ""]),
+            "state": rng.choice(states),
+            "category": rng.choice(["general", "obc", "sc", "st", "minority", ""]),
+            "annual_income": rng.choice([0, rng.randint(10000, 1200000)]),
+            "occupation": rng.choice(["farmer", "student", "labour", "business", "artisan", ""]),
+            "is_bpl": rng.random() < 0.3,
+            "is_farmer": rng.random() < 0.3,
+            "is_student": rng.random() < 0.2,
+            "disability": rng.random() < 0.1,
+        }
+        for _ in range(20000)
+    ]
+
+    print(f"\n{'═' * 55}")
+    print("🧮 Batch Parity (batch_match_compact vs find_matches):")
+    parity_set = [t['profile'] for t in test_profiles] + synthetic[:500]
+    for options in ({}, {"max_results_each": 100, "min_score": 1}):
+        report = engine.verify_batch_parity(parity_set, **options)
+        verify(report['mismatches'] == 0, f"{options or 'defaults'}: "
+              f"{report['profiles_checked']} profiles, {report['mismatches']} mismatches")
+    stored = len(engine._explain_profiles)
+    batch = engine.batch_match(synthetic[500:600])
+    verify(len(engine._explain_profiles) == stored
+           and not any('explanation_token' in scheme for entry in batch for scheme in entry['schemes']),
+           f"batch_match: no tokens, recent-profile store unchanged ({stored} profiles)")
+
+    print(f"\n{'═' * 55}")
+    print("⚡ Batch Throughput:")
+    start = time.time()
+    compact = engine.batch_match_compact(synthetic)
+    vectorized_s = time.time() - start
+    start = time.time()
+    for profile in synthetic[:1000]:
+        engine.find_matches(profile, max_results=10)
+    looped_s = (time.time() - start) * len(synthetic) / 1000
+    print(f"   Vectorized: {len(synthetic)} profiles in {vectorized_s:.2f}s "
+          f"({len(synthetic) / vectorized_s:,.0f} profiles/s, {len(compact)} results)")
+    print(f"   Per-profile (extrapolated from 1000): {looped_s:.2f}s "
+          f"({len(synthetic) / looped_s:,.0f} profiles/s)")
+    print(f"   Speedup: {looped_s / vectorized_s:.1f}x")
+
+    # Bulk eligibility: one vectorized pass vs the scalar per-scheme path
+    print(f"\n{'═' * 55}")
+    print("📋 Bulk Eligibility (check_eligibility_many):")
+    scheme_ids = [scheme.get('id') for scheme in schemes] + ['NO-SUCH-SCHEME']
+    mismatches = 0
+    for profile in [t['profile'] for t in test_profiles] + synthetic[:200]:
+        for result in engine.check_eligibility_many(profile, scheme_ids):
+            scheme = engine.get_scheme_detail(result['scheme_id'])
+            if scheme is None:
+                mismatches += result['found']
+                continue
+            eligibility = scheme.get('eligibility', {})
+            passed, reason = engine._pass_hard_filters(profile, eligibility)
+            base = final = 0
+            if passed:
+                base = engine.scorer.calculate_score(profile, eligibility)
+                adjusted, _ = engine._apply_adjustments(base, profile, scheme, eligibility)
+                final = max(0, min(adjusted, 100))
+            mismatches += (result['eligible'], result['rejection_reason'],
+                           result['match_score'], result['final_score']) \
+                != (passed, reason, base, final)
+    verify(mismatches == 0, f"Scalar recount: {mismatches} mismatches")
+    large_engine = MatchingEngine(
+        [dict(s, id=f"{s.get('id')}_{copy_no}") for copy_no in range(10) for s in schemes]
+    )
+    scheme_ids = [scheme.get('id') for scheme in large_engine.schemes][:MatchConfig.MAX_ELIGIBILITY_IDS]
+    start = time.time()
+    for profile in synthetic[:200]:
+        large_engine.check_eligibility_many(profile, scheme_ids)
+    bulk_ms = (time.time() - start) * 1000 / 200
+    start = time.time()
+    for profile in synthetic[:200]:
+        for scheme_id in scheme_ids:
+            scheme = large_engine.get_scheme_detail(scheme_id)
+            eligibility = scheme.get('eligibility', {})
+            if large_engine._pass_hard_filters(profile, eligibility)[0]:
+                adjusted, _ = large_engine._apply_adjustments(
+                    large_engine.scorer.calculate_score(profile, eligibility), profile, scheme, eligibility
+                )
+    scalar_ms = (time.time() - start) * 1000 / 200
+    print(f"   {len(scheme_ids)} ids (catalog x10): bulk {bulk_ms:.2f}ms "
+          f"vs per-id {scalar_ms:.2f}ms per profile")
+
+    # Bitmap index statistics
+    print(f"\n{'═' * 55}")
+    print("🗂️ Bitmap Index Stats:")
+    index_stats = engine.get_index_stats()
+    for attribute, stats in index_stats['attributes'].items():
+        print(f"   {attribute:16} keys:{stats['cardinality']:3}  open:{stats['unconstrained']:3}  "
+              f"selectivity:{stats['avg_selectivity']:.3f}"
+              f"{'  (prunes)' if stats['prunes_candidates'] else ''}")
+    print(f"   Screened {index_stats['candidates_screened']}, pruned {index_stats['pruned_share']}")
+
+    # Top-k pruning: identical results, far fewer full scores on a larger catalog
+    print(f"\n{'═' * 55}")
+    print("✂️ Top-k Pruning (catalog x10, max_results=10):")
+    large = [dict(s, id=f"{s.get('id')}_{copy_no}") for copy_no in range(10) for s in schemes]
+    pruned_engine = MatchingEngine(large)
+    full_config = MatchConfig()
+    full_config.TOPK_PRUNING = False
+    full_engine = MatchingEngine(large, config=full_config)
+    timings, outputs = {}, {}
+    for name, eng in (("full", full_engine), ("top-k", pruned_engine)):
+        start = time.time()
+        outputs[name] = [
+            [(s['id'], s['match_score']) for s in eng.find_matches(p, max_results=10)]
+            for p in synthetic[:300]
+        ]
+        timings[name] = (time.time() - start) * 1000 / 300
+    same = outputs["full"] == outputs["top-k"]
+    topk_stats = pruned_engine.get_performance_stats()['topk']
+    verify(same, f"Results identical: {same}")
+    print(f"   Full: {timings['full']:.2f}ms/profile, top-k: {timings['top-k']:.2f}ms/profile")
+    print(f"   Fully scored: {topk_stats['fully_scored']}, pruned: {topk_stats['pruned']}")
+
+    # Zero-copy results: overlay on the shared record, catalog stays read-only
+    print(f"\n{'═' * 55}")
+    print("🔒 Zero-copy Results:")
+    result = engine.find_matches(test_profiles[0]['profile'])[0]
+    try:
+        result['documents'].append("tampered")
+        verify(False, "Nested catalog list was mutable through a result")
+    except AttributeError:
+        verify(True, f"{result['id']}: nested values are read-only, "
+              f"record shared with catalog: {any(result.scheme is s for s in schemes)}")
+    print(f"   JSON: {len(json.dumps(result.for_json()))} bytes, copy() → {type(result.copy()).__name__}")
+
+    # Canonical cache keys: same class → same key → cache hit, identical results
+    print(f"\n{'═' * 55}")
+    print("🔑 Canonical Cache Keys:")
+    canon_engine = MatchingEngine(schemes)
+    segments = synthetic[:300]
+    for i in range(3000):
+        profile = dict(segments[i % len(segments)])
+        if profile['annual_income']:
+            profile['annual_income'] = int(profile['annual_income'] * rng.uniform(0.95, 1.05))
+        canon_engine.find_matches(profile)
+    classes = canon_engine.get_cache_stats()
+    print(f"   Classes: {classes['equivalence_classes']}")
+    print(f"   Hit rate over 3000 jittered-income requests: {classes['hit_rate']}")
+    probe = dict(synthetic[0], annual_income=140000)
+    same_class = dict(probe, annual_income=140001, gender=probe['gender'].upper())
+    shared_key = canon_engine.canonical_key(probe) == canon_engine.canonical_key(same_class)
+    verify(shared_key, f"140000 vs 140001 (+gender case) share a key: {shared_key}")
+
+    # Bounded cache: entry cap, LRU eviction and invalidation on catalog swap
+    print(f"\n{'═' * 55}")
+    print("💾 Cache Bounds:")
+    bounded = MatchingEngine(schemes, cache=MatchCache(max_entries=50, max_bytes=4 * 1024 * 1024))
+    for profile in synthetic[:500]:
+        bounded.find_matches(profile)
+    stats = bounded.get_cache_stats()
+    print(f"   After 500 profiles: {stats['cached_profiles']} entries, "
+          f"{stats['bytes_used']:,} bytes, {stats['evictions']} evictions")
+    bounded.update_schemes(schemes)
+    stats = bounded.get_cache_stats()
+    print(f"   After update_schemes: {stats['cached_profiles']} entries "
+          f"(generation {stats['generation']})")
+
+    # Incremental catalog updates: only entries that could surface a changed scheme go
+    print(f"\n{'═' * 55}")
+    print("🔁 Incremental Catalog Update:")
+    import copy
+    incremental = MatchingEngine(copy.deepcopy(schemes))
+    regional = next(
+        i for i, scheme in enumerate(schemes)
+        if scheme.get('eligibility', {}).get('states') not in (None, 'all', [])
+    )
+    edits = (
+        ("payload edit", lambda catalog: catalog[0].update(
+            description=catalog[0].get('description', '') + ' (updated)')),
+        ("state scheme edit", lambda catalog: catalog[regional]['eligibility'].update(max_age=99)),
+        ("appended state scheme", lambda catalog: catalog.append(
+            {**copy.deepcopy(catalog[regional]), 'id': 'demo-appended-scheme'})),
+    )
+    for label, edit in edits:
+        for profile in synthetic[:300]:
+            incremental.find_matches(profile)
+        before = incremental.get_cache_stats()['cached_profiles']
+        catalog = copy.deepcopy(incremental.schemes)
+        edit(catalog)
+        start = time.time()
+        diff = incremental.update_schemes(catalog)
+        elapsed = (time.time() - start) * 1000
+        after = incremental.get_cache_stats()['cached_profiles']
+        fresh = MatchingEngine(catalog)
+        parity = all(
+            incremental.find_matches(profile) == fresh.find_matches(profile)
+            for profile in synthetic[:300]
+        )
+        verify(parity, f"{label}: {diff} in {elapsed:.1f}ms, "
+              f"kept {after}/{before} cached entries")
+
+    # Adaptive filter order: same results and rejection stats as the fixed order
+    print(f"\n{'═' * 55}")
+    print("🔀 Adaptive Hard-filter Order (1000 uncached matches):")
+    engines = {}
+    for adaptive in (False, True):
+        adaptive_config = MatchConfig()
+        adaptive_config.ADAPTIVE_FILTER_ORDER = adaptive
+        engines[adaptive] = MatchingEngine(schemes, config=adaptive_config,
+                                           cache=MatchCache(max_entries=1))
+    same = all(
+        engines[True].find_matches(profile) == engines[False].find_matches(profile)
+        for profile in synthetic[:1000]
+    )
+    same_stats = engines[True].get_filter_stats() == engines[False].get_filter_stats()
+    verify(same and same_stats, f"Results identical: {same}, "
+          f"rejection stats identical: {same_stats}")
+    order = engines[True].get_filter_order()
+    print(f"   Order: {' → '.join(order['order'])} ({order['replans']} replans)")
+    for reason, check in order['checks'].items():
+        print(f"   {reason:16} reject {check['reject_rate']}  {check['ns_per_scheme']}ns/scheme")
+    print(f"   Estimated work saved vs fixed order: {order['estimated_work_saved']}")
+    for adaptive, label in ((False, "full mask"), (True, "short-circuit")):
+        stage = engines[adaptive].get_performance_stats()['stages']['hard_filters']
+        print(f"   Hard-filter stage ({label}): mean {stage['mean_ms']}ms, p95 {stage['p95_ms']}ms")
+
+    # Compiled predicates and score programs vs the generic scalar path
+    print(f"\n{'═' * 55}")
+    print("🧩 Compiled Scheme Programs (1000 uncached matches):")
+    engines = {}
+    for compiled_scoring in (False, True):
+        compiled_config = MatchConfig()
+        compiled_config.COMPILED_SCORING = compiled_scoring
+        engines[compiled_scoring] = MatchingEngine(schemes, config=compiled_config,
+                                                   cache=MatchCache(max_entries=1))
+    same = all(
+        engines[True].find_matches(profile) == engines[False].find_matches(profile)
+        for profile in synthetic[:1000]
+    )
+    same_analytics = all(
+        engines[True].scorer.get_analytics()[key] == engines[False].scorer.get_analytics()[key]
+        for key in ('total_scores_calculated', 'score_distribution', 'field_match_rates')
+    )
+    verify(same and same_analytics, f"Results identical: {same}, "
+          f"scoring analytics identical: {same_analytics}")
+    predicate_mismatches = 0
+    for profile in synthetic[:200]:
+        check = engine._hard_filter_checker(profile)
+        for position, scheme in enumerate(schemes):
+            eligibility = scheme.get('eligibility', {})
+            if check(position, eligibility) != engine._pass_hard_filters(profile, eligibility):
+                predicate_mismatches += 1
+    verify(not predicate_mismatches, f"Predicates vs _pass_hard_filters: "
+          f"{predicate_mismatches} mismatches over {200 * len(schemes)} checks")
+    for compiled_scoring, label in ((False, "generic"), (True, "compiled")):
+        stage = engines[compiled_scoring].get_performance_stats()['stages']['scoring']
+        print(f"   Scoring stage ({label}): mean {stage['mean_ms']}ms, p95 {stage['p95_ms']}ms")
+
+    # Cursor pagination: every page concatenated equals the full ranking
+    print(f"\n{'═' * 55}")
+    print("📄 Cursor Pagination:")
+    page_mismatches, pages = 0, 0
+    for profile in synthetic[:200]:
+        expected = [(r['id'], r['match_score']) for r in engine.find_matches(profile, max_results=100)]
+        paged, cursor = [], None
+        page = engine.find_matches_page(profile, page_size=7)
+        while True:
+            pages += 1
+            paged += [(r['id'], r['match_score']) for r in page['matches']]
+            if not page['next_cursor']:
+                break
+            page = engine.find_matches_page(cursor=page['next_cursor'])
+        page_mismatches += paged != expected
+    verify(not page_mismatches, f"{pages} pages over 200 profiles, "
+          f"{page_mismatches} rankings differ from find_matches")
+    first = engine.find_matches_page(synthetic[0], page_size=5)
+    if first['next_cursor']:
+        start = time.perf_counter()
+        for _ in range(1000):
+            engine.find_matches_page(cursor=first['next_cursor'])
+        page_ms = (time.perf_counter() - start) * 1000 / 1000
+        print(f"   Next page from cached ranking: {page_ms:.3f}ms/page "
+              f"({first['total_matches']} ranked, page size 5)")
+
+        # Another worker: own profile store, same (shared) digest key
+        worker = MatchingEngine(schemes)
+        without = worker.find_matches_page(cursor=first['next_cursor']).get('reason')
+        resent = worker.find_matches_page(synthetic[0], cursor=first['next_cursor'])
+        tampered = worker.find_matches_page({**synthetic[0], 'age': 99}, cursor=first['next_cursor'])
+        cross_ok = (
+            without == 'profile_unavailable'
+            and [r['id'] for r in resent.get('matches', [])]
+            == [r['id'] for r in engine.find_matches_page(cursor=first['next_cursor'])['matches']]
+            and tampered.get('reason') == 'profile_mismatch'
+        )
+        verify(cross_ok, f"Other worker: 410 without the profile, "
+              f"next page with it resent; wrong profile rejected")
+
+        # A worker with another digest key can't check the resent profile
+        version, profile_hash, *rest = worker._decode_cursor(first['next_cursor'])
+        foreign = worker._encode_cursor((version, "000000." + profile_hash.partition('.')[2], *rest))
+        foreign_reasons = {
+            worker.find_matches_page(cursor=foreign).get('reason'),
+            worker.find_matches_page({**synthetic[0], 'age': 99}, cursor=foreign).get('reason'),
+            worker.explain_match(f"{version}:000000.{profile_hash.partition('.')[2]}:x",
+                                 synthetic[0]).get('reason')
+        }
+        verify(foreign_reasons == {'invalid_cursor', 'invalid_token'},
+               f"Foreign digest key rejected: {sorted(foreign_reasons)}")
+        digest_hidden = profile_hash.partition('.')[2] != hashlib.blake2b(
+            json.dumps(synthetic[0], sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+        verify(digest_hidden, f"Cursor digest is keyed "
+              f"(not the plain blake2b of the profile)")
+
+    # Chat sessions: one field changes per turn, only it is recomputed
+    print(f"\n{'═' * 55}")
+    print("💬 Session Delta Re-matching:")
+    session_engine = MatchingEngine(schemes)
+    refinements = [
+        ('state', 'Bihar'), ('age', 34), ('gender', 'female'), ('occupation', 'farmer'),
+        ('annual_income', 90000), ('category', 'sc'), ('is_bpl', True), ('annual_income', 240000),
+        ('age', 61), ('disability', True), ('state', 'Kerala'), ('occupation', 'labour'),
+    ]
+    session_mismatches, delta_ms, full_ms = 0, 0.0, 0.0
+    for round_number in range(50):
+        conversation = {}
+        for field, value in refinements:
+            conversation[field] = value
+            start = time.perf_counter()
+            delta = session_engine.find_session_matches(f"chat-{round_number}", conversation)
+            delta_ms += (time.perf_counter() - start) * 1000
+            session_engine.clear_cache()
+            start = time.perf_counter()
+            full = session_engine.find_matches(conversation)
+            full_ms += (time.perf_counter() - start) * 1000
+            session_mismatches += (
+                [(r['id'], r['match_score']) for r in delta] != [(r['id'], r['match_score']) for r in full]
+            )
+    turns = 50 * len(refinements)
+    verify(not session_mismatches, f"{turns} turns, "
+          f"{session_mismatches} differ from find_matches")
+    print(f"   Per turn: delta {delta_ms / turns:.3f}ms vs full match {full_ms / turns:.3f}ms")
+    print(f"   {session_engine.get_session_stats()}")
+
+    # Per-stage timings: histograms shared by threads, exact call counts
+    print(f"\n{'═' * 55}")
+    print("⏱️ Stage Timings (4 threads x 250 uncached matches):")
+    timed = MatchingEngine(schemes, cache=MatchCache(max_entries=1))
+
+    def match_slice(profiles):
+        for profile in profiles:
+            timed.find_matches(profile)
+
+    threads = [
+        threading.Thread(target=match_slice, args=(synthetic[i * 250:(i + 1) * 250],))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stages = timed.get_performance_stats()['stages']
+    verify(stages['total']['calls'] == 1000, f"{stages['total']['calls']} calls recorded")
+    for stage, stats in stages.items():
+        print(f"   {stage:18} p50 {stats['p50_ms']:.4f}ms  p95 {stats['p95_ms']:.4f}ms  "
+              f"p99 {stats['p99_ms']:.4f}ms  mean {stats['mean_ms']:.4f}ms")
+    overhead_start = time.perf_counter_ns()
+    for _ in range(10000):
+        timed._stage_timings.stopwatch().finish('total')
+    overhead_us = (time.perf_counter_ns() - overhead_start) / 10000 / 1000
+    print(f"   Recording overhead: ~{overhead_us:.1f}µs per call")
+
     # Performance stats
     print(f"\n{'═' * 55}")
     print("📈 Performance Stats:")
@@ -1267,4 +4553,9 @@ if __name__ == '__main__':
     print(f"   Cache: {perf['cache']}")
     print(f"   Filter stats: {perf['filter_stats']}")
     print(f"\n{repr(engine)}")
+    if failed_checks:
+        print(f"\n❌ {len(failed_checks)} check(s) failed:")
+        for message in failed_checks:
+            print(f"   - {message}")
+        sys.exit(1)
     print("\n✅ All tests complete!")
\ No newline at end of file
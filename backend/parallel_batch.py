@@ -0,0 +1,517 @@
+"""
+Parallel Batch Matching - Process Pool over a Shared-Memory Catalog
+===================================================================
+Features:
+  - Shards profile streams across a ProcessPoolExecutor (one core per worker)
+  - Compiled catalog (eligibility matrix, bitmap index, scoring columns)
+    published once through multiprocessing.shared_memory
+  - NumPy arrays are mapped read-only in workers (zero-copy); tasks carry
+    only their profile shard
+  - Results stream back in input order with a bounded in-flight window
+    (constant memory for arbitrarily long inputs)
+  - Worker filter statistics merged back into the parent engine
+  - Result scheme positions sized to the catalog (uint16 up to 65,536
+    schemes, wider beyond); workers attach without resource tracking
+  - Parity check against the single-process vectorized batch
+"""
+
+import io
+import os
+import sys
+import time
+import pickle
+import logging
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from matching_engine import MatchingEngine, MatchResult, BatchMatch
+
+logger = logging.getLogger('GovSchemeAI.ParallelBatch')
+
+
+class ParallelConfig:
+    """Defaults for the parallel executor"""
+
+    # None = usable_cores()
+    WORKERS = None
+
+    # Profiles per task (large enough to amortize IPC, small enough to balance)
+    SHARD_SIZE = 4096
+
+    # Shards queued per worker before the parent waits for results
+    IN_FLIGHT_PER_WORKER = 2
+
+    # Worker start method: spawn workers share nothing but the published segment
+    START_METHOD = 'spawn'
+
+    # Array alignment inside the shared segment
+    ALIGNMENT = 64
+
+
+# ──────────────────────────────────────────────
+# SHARED CATALOG
+# ──────────────────────────────────────────────
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler that moves NumPy arrays out of the stream into a side list"""
+
+    def __init__(self, file, arrays):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = arrays
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray and not obj.dtype.hasobject:
+            self.arrays.append(np.ascontiguousarray(obj))
+            return len(self.arrays) - 1
+        return None
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """Unpickler that resolves array references to views of the shared segment"""
+
+    def __init__(self, file, views):
+        super().__init__(file)
+        self.views = views
+
+    def persistent_load(self, pid):
+        return self.views[pid]
+
+
+class SharedCatalog:
+    """
+    A compiled catalog published in one shared-memory segment.
+
+    Layout: [pickled skeleton][aligned array 0][aligned array 1]...
+    The skeleton is the schemes, scorer, config and CompiledCatalog with
+    every NumPy array replaced by a reference to its slice of the segment,
+    so attaching costs one small unpickle and no array copies.
+    """
+
+    def __init__(self, engine):
+        arrays = []
+        buffer = io.BytesIO()
+        _ArrayPickler(buffer, arrays).dump({
+            'schemes': engine.schemes,
+            'config': engine.config,
+            'scorer': engine.scorer,
+            'compiled': engine.get_compiled_catalog(),
+        })
+        skeleton = buffer.getvalue()
+
+        layout, offset = [], self._align(len(skeleton))
+        for array in arrays:
+            layout.append((offset, array.dtype.str, array.shape))
+            offset = self._align(offset + array.nbytes)
+
+        self.size = max(offset, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.size)
+        self.shm.buf[:len(skeleton)] = skeleton
+        for (start, _, _), array in zip(layout, arrays):
+            self.shm.buf[start:start + array.nbytes] = array.reshape(-1).view(np.uint8)
+
+        self.handle = (self.shm.name, len(skeleton), layout)
+        self.catalog_version = engine.catalog_version
+        logger.info(
+            f"📤 Published catalog {self.catalog_version}: {len(arrays)} arrays, "
+            f"{self.size:,} bytes in shared memory '{self.shm.name}'"
+        )
+
+    @staticmethod
+    def _align(offset):
+        alignment = ParallelConfig.ALIGNMENT
+        return (offset + alignment - 1) // alignment * alignment
+
+    @staticmethod
+    def attach(handle):
+        """
+        Rebuild a MatchingEngine over the shared segment (worker side).
+        Returns: (engine, shm) — keep shm referenced while the engine is used
+        """
+        name, skeleton_size, layout = handle
+        shm = SharedCatalog._open_untracked(name)
+
+        views = []
+        for offset, dtype, shape in layout:
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            view.flags.writeable = False
+            views.append(view)
+        state = _ArrayUnpickler(io.BytesIO(bytes(shm.buf[:skeleton_size])), views).load()
+
+        engine = MatchingEngine(
+            state['schemes'], config=state['config'],
+            compiled=state['compiled'], scorer=state['scorer']
+        )
+        return engine, shm
+
+    @staticmethod
+    def _open_untracked(name):
+        """
+        Attach to the parent's segment without leaving it registered with
+        the resource tracker: only the parent (which unlinks it) owns it
+        """
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        # Python < 3.13 registers every attach
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+    def close(self):
+        """Release and unlink the segment (parent side)"""
+        if self.shm is not None:
+            self.shm.close()
+            if sys.version_info < (3, 13):
+                # Workers share this tracker and unregistered the name on
+                # attach; register it again so unlink's unregister matches
+                resource_tracker.register(self.shm._name, 'shared_memory')
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ──────────────────────────────────────────────
+# WORKER SIDE
+# ──────────────────────────────────────────────
+
+_worker_engine = None
+_worker_shm = None
+
+
+def _init_worker(handle):
+    """
+    Process-pool initializer: attach to the published catalog once
+    (untracked, so a worker exiting never unlinks or reports the segment)
+    """
+    global _worker_engine, _worker_shm
+    logging.getLogger('GovSchemeAI').setLevel(logging.WARNING)
+    _worker_engine, _worker_shm = SharedCatalog.attach(handle)
+
+
+def usable_cores():
+    """CPUs this process may run on (affinity / container limits), not the host total"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def position_dtype(scheme_count):
+    """Smallest unsigned dtype that holds every scheme position of the catalog"""
+    if scheme_count <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    if scheme_count <= np.iinfo(np.uint32).max + 1:
+        return np.uint32
+    return np.uint64
+
+
+def _match_shard(profiles, max_results, min_score, category_filter, type_filter):
+    """
+    Match one shard in a worker.
+    Returns: (profile indexes, scheme positions, scores, filter stats delta)
+    """
+    engine = _worker_engine
+    engine._filter_stats.clear()
+
+    position_of = {scheme.get('id'): i for i, scheme in enumerate(engine.schemes)}
+    indexes, positions, scores = [], [], []
+    for match in engine.iter_batch_matches(
+        profiles, max_results, min_score, category_filter, type_filter
+    ):
+        indexes.append(match.profile_index)
+        positions.append(position_of[match.scheme_id])
+        scores.append(match.score)
+
+    return (
+        np.array(indexes, dtype=np.int32),
+        np.array(positions, dtype=position_dtype(len(engine.schemes))),
+        np.array(scores, dtype=np.uint8),
+        dict(engine._filter_stats)
+    )
+
+
+# ──────────────────────────────────────────────
+# PARENT SIDE
+# ──────────────────────────────────────────────
+
+class ParallelBatchMatcher:
+    """
+    Multi-process counterpart of MatchingEngine.iter_batch_matches().
+
+    Usage:
+        with ParallelBatchMatcher(engine, workers=16) as pool:
+            for match in pool.iter_matches(profiles):
+                ...
+
+    The engine's catalog is published when the pool starts; if the engine's
+    catalog changes later, the next call republishes it and restarts workers.
+    """
+
+    def __init__(self, engine, workers=None, shard_size=None, start_method=None):
+        self.engine = engine
+        self.workers = workers or ParallelConfig.WORKERS or usable_cores()
+        self.shard_size = shard_size or ParallelConfig.SHARD_SIZE
+        self.start_method = start_method or ParallelConfig.START_METHOD
+        self._catalog = None
+        self._executor = None
+
+        # Stats
+        self._profiles_matched = 0
+        self._shards_run = 0
+        self._total_time_ms = 0
+
+    # ──────────────────────────────────────────────
+    # POOL LIFECYCLE
+    # ──────────────────────────────────────────────
+
+    def start(self):
+        """Publish the catalog and start workers (no-op when already current or single-worker)"""
+        if self.workers == 1:
+            return self
+        if self._catalog is not None and self._catalog.catalog_version == self.engine.catalog_version:
+            return self
+        self.shutdown()
+        self._catalog = SharedCatalog(self.engine)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self._catalog.handle,)
+        )
+        logger.info(f"🚀 Parallel batch pool started: {self.workers} workers")
+        return self
+
+    def shutdown(self):
+        """Stop workers and release the shared segment"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    # ──────────────────────────────────────────────
+    # MATCHING
+    # ──────────────────────────────────────────────
+
+    def iter_matches(self, user_profiles, max_results_each=10, min_score=None,
+                     category_filter=None, type_filter=None):
+        """
+        Stream BatchMatch rows in input order (same rows as
+        engine.iter_batch_matches). user_profiles may be any iterable,
+        including a generator; at most workers × IN_FLIGHT_PER_WORKER
+        shards are held in memory at once.
+
+        With one worker the shards are matched in this process: a single
+        pool worker only adds IPC (measured 0.64x of in-process throughput).
+        """
+        if self.workers == 1:
+            yield from self._iter_in_process(
+                user_profiles, max_results_each, min_score, category_filter, type_filter
+            )
+            return
+
+        self.start()
+        start_time = time.time()
+        scheme_ids = [scheme.get('id') for scheme in self.engine.schemes]
+        tiers = [MatchResult({}, score).tier for score in range(101)]
+        window = self.workers * ParallelConfig.IN_FLIGHT_PER_WORKER
+
+        profiles = iter(user_profiles)
+        pending = deque()
+        offset = 0
+        total = 0
+
+        def submit():
+            nonlocal offset
+            shard = list(itertools.islice(profiles, self.shard_size))
+            if not shard:
+                return False
+            future = self._executor.submit(
+                _match_shard, shard, max_results_each, min_score,
+                category_filter, type_filter
+            )
+            pending.append((offset, future))
+            offset += len(shard)
+            return True
+
+        while len(pending) < window and submit():
+            pass
+
+        while pending:
+            shard_offset, future = pending.popleft()
+            indexes, positions, scores, filter_stats = future.result()
+            submit()
+
+            for reason, count in filter_stats.items():
+                self.engine._filter_stats[reason] += count
+            self._shards_run += 1
+            total += len(scores)
+
+            for index, position, score in zip(indexes.tolist(), positions.tolist(), scores.tolist()):
+                yield BatchMatch(shard_offset + index, scheme_ids[position], score, tiers[score])
+
+        elapsed = round((time.time() - start_time) * 1000, 2)
+        self._profiles_matched += offset
+        self._total_time_ms += elapsed
+        logger.info(
+            f"Parallel batch matched {offset} profiles ({total} results) "
+            f"on {self.workers} workers in {elapsed}ms"
+        )
+
+    def _iter_in_process(self, user_profiles, max_results_each, min_score,
+                         category_filter, type_filter):
+        """iter_matches on the parent engine, shard by shard (same rows, same stats)"""
+        start_time = time.time()
+        profiles = iter(user_profiles)
+        offset = 0
+        while True:
+            shard = list(itertools.islice(profiles, self.shard_size))
+            if not shard:
+                break
+            yield from self.engine.iter_batch_matches(
+                shard, max_results_each, min_score, category_filter, type_filter,
+                first_index=offset
+            )
+            offset += len(shard)
+            self._shards_run += 1
+
+        self._profiles_matched += offset
+        self._total_time_ms += round((time.time() - start_time) * 1000, 2)
+
+    def batch_match_compact(self, user_profiles, max_results_each=10, min_score=None,
+                            category_filter=None, type_filter=None):
+        """List form of iter_matches (same contract as MatchingEngine.batch_match_compact)"""
+        return list(self.iter_matches(
+            user_profiles, max_results_each, min_score, category_filter, type_filter
+        ))
+
+    def verify_parity(self, user_profiles, max_results_each=10, min_score=None,
+                      category_filter=None, type_filter=None):
+        """
+        Compare against the single-process vectorized batch.
+        Returns: dict with row counts and whether they're identical
+        """
+        expected = self.engine.batch_match_compact(
+            user_profiles, max_results_each, min_score,
+            category_filter, type_filter, track_stats=False
+        )
+        parallel = self.batch_match_compact(
+            user_profiles, max_results_each, min_score, category_filter, type_filter
+        )
+        return {
+            'profiles_checked': len(user_profiles),
+            'rows': len(parallel),
+            'expected_rows': len(expected),
+            'identical': parallel == expected
+        }
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'shard_size': self.shard_size,
+            'start_method': self.start_method,
+            'running': self._executor is not None,
+            'shared_bytes': self._catalog.size if self._catalog else 0,
+            'profiles_matched': self._profiles_matched,
+            'shards_run': self._shards_run,
+            'profiles_per_second': round(
+                self._profiles_matched / max(self._total_time_ms / 1000, 1e-9)
+            ) if self._total_time_ms else 0
+        }
+
+    def __repr__(self):
+        return (
+            f"<ParallelBatchMatcher: {self.workers} workers, "
+            f"{self._profiles_matched} profiles matched>"
+        )
+
+
+# ──────────────────────────────────────────────
+# STANDALONE TESTING
+# ──────────────────────────────────────────────
+
+if __name__ == '__main__':
+    import json
+    import random
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print("=" * 55)
+    print("🧪 Parallel Batch Test Mode")
+    print("=" * 55)
+
+    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            schemes = json.load(f).get('schemes', [])
+    except Exception as e:
+        print(f"❌ Could not load schemes: {e}")
+        exit(1)
+
+    engine = MatchingEngine(schemes)
+
+    rng = random.Random(3)
+    states = ['Bihar', 'Uttar Pradesh', 'Tamil Nadu', 'Kerala', 'Delhi', 'Maharashtra', '']
+    profiles = [
+        {
+            'age': rng.randint(0, 90),
+            'gender': rng.choice(['male', 'female', '']),
+            'state': rng.choice(states),
+            'category': rng.choice(['general', 'obc', 'sc', 'st', '']),
+            'annual_income': rng.choice([0, rng.randint(1, 1000000)]),
+            'occupation': rng.choice(['farmer', 'student', 'daily_wage', 'unemployed', '']),
+            'is_bpl': rng.random() < 0.3,
+            'disability': rng.random() < 0.05,
+        }
+        for _ in range(40000)
+    ]
+
+    print(f"\n{'═' * 55}")
+    print("🔢 Result Position Width:")
+    widths = {count: np.dtype(position_dtype(count)).name for count in (len(schemes), 65536, 65537, 70000)}
+    wide_ok = widths[65536] == 'uint16' and widths[65537] == 'uint32' and widths[70000] == 'uint32'
+    positions = np.array([0, 65535, 65536, 69999], dtype=position_dtype(70000))
+    print(f"   {'✅' if wide_ok and positions.tolist() == [0, 65535, 65536, 69999] else '❌'} "
+          f"{', '.join(f'{count:,} schemes → {name}' for count, name in widths.items())}")
+
+    cores = usable_cores()
+    with ParallelBatchMatcher(engine, workers=max(cores, 2)) as pool:
+        print(f"\n{'═' * 55}")
+        print(f"🔍 Parity with single-process batch ({pool.workers} workers):")
+        report = pool.verify_parity(profiles[:5000], max_results_each=20)
+        print(f"   {'✅' if report['identical'] else '❌'} {report['rows']} rows, "
+              f"identical: {report['identical']}")
+
+        print(f"\n{'═' * 55}")
+        print(f"⚡ Throughput ({len(profiles)} profiles, {cores} usable cores):")
+        start = time.time()
+        single = sum(1 for _ in engine.iter_batch_matches(profiles, 20, track_stats=False))
+        single_s = time.time() - start
+        print(f"   1 process:   {len(profiles) / single_s:,.0f} profiles/s")
+
+        for workers in sorted({1, 2, max(cores // 2, 1), cores}):
+            with ParallelBatchMatcher(engine, workers=workers) as sized:
+                sized.batch_match_compact(profiles[:1000], 20)  # warm-up
+                start = time.time()
+                rows = sum(1 for _ in sized.iter_matches(iter(profiles), 20))
+                parallel_s = time.time() - start
+            print(f"   {workers:2d} workers:  {len(profiles) / parallel_s:,.0f} profiles/s "
+                  f"(speedup {single_s / parallel_s:.2f}x, rows match: {rows == single})")
+
+        print(f"\n📊 Stats: {pool.stats()}")
+    print("\n✅ All tests complete!")
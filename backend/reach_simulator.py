@@ -0,0 +1,535 @@
+"""
+Reach Simulator - Population What-ifs for Scheme Eligibility
+============================================================
+Features:
+  - Columnar population (NumPy arrays + factorized categoricals): synthetic,
+    built from arrays, or from uploaded (sanitized) profiles
+  - Vectorized sweep of every scheme's hard filters and scores through
+    MatchingEngine.score_population (same results as find_matches)
+  - Reach per scheme: eligible, recommended (score ≥ min score), mean score,
+    rejection reasons, and counts by state / gender / category / occupation
+  - What-ifs: eligibility overrides for one scheme (e.g. max_income) are
+    compiled alone and evaluated against the unchanged population, so
+    profiles are never re-read and baselines are reused
+  - Parameter sweeps: every candidate value evaluated in one pass
+  - Chunked evaluation (bounded memory for millions of people)
+"""
+
+import os
+import json
+import time
+import logging
+
+import numpy as np
+
+from matching_engine import MatchingEngine, EligibilityMatrix
+from scoring import ScoringEngine, CategoricalColumn
+
+logger = logging.getLogger('GovSchemeAI.ReachSimulator')
+
+
+class SimulatorConfig:
+    """Simulation defaults"""
+
+    # People × schemes cells evaluated per chunk (bounds peak memory)
+    CHUNK_CELLS = 1 << 20
+
+    # Fields reach can be broken down by
+    GROUP_FIELDS = ('state', 'gender', 'category', 'occupation')
+
+    # Synthetic population mix (values as the profile form sends them)
+    GENDERS = (('male', 0.49), ('female', 0.49), ('transgender', 0.02))
+    CATEGORIES = (('general', 0.30), ('obc', 0.40), ('sc', 0.17), ('st', 0.09), ('ews', 0.04))
+    WORKING_OCCUPATIONS = (
+        ('farmer', 0.30), ('labour', 0.20), ('private', 0.12), ('self-employed', 0.10),
+        ('housewife', 0.10), ('unemployed', 0.08), ('business', 0.05), ('government', 0.03),
+        ('teacher', 0.01), ('artisan', 0.01)
+    )
+    MEDIAN_INCOME = 150000
+    BPL_INCOME = 100000             # below this, most households hold a BPL card
+    DISABILITY_RATE = 0.02
+
+
+# ──────────────────────────────────────────────
+# POPULATION
+# ──────────────────────────────────────────────
+
+class Population:
+    """
+    People as columns, with sanitized-profile semantics: ages and incomes
+    are ints (0 = not given), categorical fields strings ('' = not given),
+    flags booleans. Categorical columns are factorized, so per-value work
+    runs once per distinct value however many people share it.
+    """
+
+    NUMERIC = ('age', 'annual_income')
+    CATEGORICAL = ('gender', 'state', 'category', 'occupation')
+    FLAGS = ('is_bpl', 'is_farmer', 'is_student', 'disability')
+
+    def __init__(self, age, annual_income, gender=None, state=None, category=None,
+                 occupation=None, is_bpl=None, is_farmer=None, is_student=None,
+                 disability=None):
+        """
+        Args:
+            age, annual_income: int arrays (one entry per person)
+            gender, state, category, occupation: sequences of strings or
+                CategoricalColumn (None = not given for anyone)
+            is_bpl, is_farmer, is_student, disability: bool arrays (None = all False)
+        """
+        self.size = len(age)
+        self.columns = {
+            'age': np.asarray(age, dtype=np.int64),
+            'annual_income': np.asarray(annual_income, dtype=np.int64),
+        }
+        if len(self.columns['annual_income']) != self.size:
+            raise ValueError("Every column must have one entry per person")
+
+        for field, values in zip(self.CATEGORICAL, (gender, state, category, occupation)):
+            self.columns[field] = self._categorical(field, values)
+        for field, values in zip(self.FLAGS, (is_bpl, is_farmer, is_student, disability)):
+            flags = np.zeros(self.size, dtype=bool) if values is None else np.asarray(values, dtype=bool)
+            if len(flags) != self.size:
+                raise ValueError(f"'{field}' must have one entry per person")
+            self.columns[field] = flags
+
+        # Key fields given (drives the sparse-profile penalty)
+        provided = (self.columns['age'] != 0).astype(np.int64)
+        provided += self.columns['annual_income'] != 0
+        for field in self.CATEGORICAL:
+            column = self.columns[field]
+            provided += column.take(np.array([value != '' for value in column.values], dtype=bool))
+        self.columns['provided'] = provided
+
+    def _categorical(self, field, values):
+        if values is None:
+            return CategoricalColumn(('',), np.zeros(self.size, dtype=np.intp))
+        column = values if isinstance(values, CategoricalColumn) else CategoricalColumn.factorize(values)
+        if len(column.codes) != self.size:
+            raise ValueError(f"'{field}' must have one entry per person")
+        if not all(isinstance(value, str) for value in column.values):
+            raise ValueError(f"'{field}' values must be strings ('' = not given)")
+        return column
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """
+        Population from profile dicts, read the way the matcher reads
+        sanitized input (validate_user_input_detailed output)
+        """
+        profiles = list(profiles)
+        return cls(
+            age=[ScoringEngine._safe_int(p.get('age', 0)) for p in profiles],
+            annual_income=[ScoringEngine._safe_int(p.get('annual_income', 0)) for p in profiles],
+            **{field: [p.get(field, '') for p in profiles] for field in cls.CATEGORICAL},
+            **{field: [ScoringEngine._parse_bool(p.get(field, False)) for p in profiles]
+               for field in cls.FLAGS}
+        )
+
+    @classmethod
+    def synthetic(cls, size, seed=None, states=None, config=SimulatorConfig):
+        """
+        Random population with a plausible demographic mix.
+
+        Args:
+            size: number of people
+            seed: RNG seed (same seed → same population)
+            states: list of states, or dict state → population weight
+                (default: utils.INDIAN_STATES, equal weights)
+        """
+        rng = np.random.default_rng(seed)
+        if states is None:
+            from utils import INDIAN_STATES
+            states = INDIAN_STATES
+        if isinstance(states, dict):
+            names, weights = list(states), np.array(list(states.values()), dtype=float)
+        else:
+            names, weights = list(states), np.ones(len(states))
+
+        def draw(choices):
+            values, p = zip(*choices)
+            p = np.array(p) / np.sum(p)
+            return CategoricalColumn(tuple(values), rng.choice(len(values), size=size, p=p))
+
+        # Ages: children, working age, seniors
+        band = rng.choice(3, size=size, p=[0.26, 0.62, 0.12])
+        age = np.select(
+            [band == 0, band == 1],
+            [rng.integers(1, 18, size), rng.integers(18, 60, size)],
+            rng.integers(60, 96, size)
+        )
+        income = np.maximum(
+            rng.lognormal(np.log(config.MEDIAN_INCOME), 0.9, size), 1000
+        ).astype(np.int64)
+
+        # Occupation follows age: students under 18, mostly retired over 65
+        occupation = draw(config.WORKING_OCCUPATIONS)
+        values = occupation.values + ('student', 'retired')
+        codes = np.where(age < 18, len(values) - 2, occupation.codes)
+        codes = np.where((age >= 65) & (rng.random(size) < 0.6), len(values) - 1, codes)
+        occupation = CategoricalColumn(values, codes)
+        occupation_names = np.array(values)[codes]
+
+        bpl_rate = np.where(income < config.BPL_INCOME, 0.6, 0.05)
+        return cls(
+            age=age,
+            annual_income=income,
+            gender=draw(config.GENDERS),
+            state=CategoricalColumn(tuple(names), rng.choice(len(names), size=size, p=weights / weights.sum())),
+            category=draw(config.CATEGORIES),
+            occupation=occupation,
+            is_bpl=rng.random(size) < bpl_rate,
+            is_farmer=occupation_names == 'farmer',
+            is_student=occupation_names == 'student',
+            disability=rng.random(size) < config.DISABILITY_RATE
+        )
+
+    def chunk(self, start, stop):
+        """Engine columns (see ScoringEngine.encode_columns) for people [start, stop)"""
+        return {
+            field: column.subset(slice(start, stop)) if isinstance(column, CategoricalColumn)
+            else column[start:stop]
+            for field, column in self.columns.items()
+        }
+
+    def mask(self, **criteria):
+        """
+        Boolean array of the people matching every criterion, e.g.
+        mask(state='Bihar', gender=('female', 'transgender'))
+        """
+        selected = np.ones(self.size, dtype=bool)
+        for field, wanted in criteria.items():
+            column = self.columns[field]
+            if isinstance(column, CategoricalColumn):
+                wanted = {wanted} if isinstance(wanted, str) else set(wanted)
+                selected &= column.take(np.array([value in wanted for value in column.values], dtype=bool))
+            else:
+                selected &= np.isin(column, np.atleast_1d(wanted))
+        return selected
+
+    def profile(self, i):
+        """Person i as a profile dict (for spot checks against find_matches)"""
+        profile = {}
+        for field, column in self.columns.items():
+            if field == 'provided':
+                continue
+            if isinstance(column, CategoricalColumn):
+                value = column.values[column.codes[i]]
+                if value:
+                    profile[field] = value
+            elif field in self.FLAGS:
+                profile[field] = bool(column[i])
+            elif column[i]:
+                profile[field] = int(column[i])
+        return profile
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<Population: {self.size:,} people>"
+
+
+# ──────────────────────────────────────────────
+# SIMULATOR
+# ──────────────────────────────────────────────
+
+class ReachSimulator:
+    """
+    How many people each scheme reaches, and how that moves under what-ifs.
+
+    "Eligible" people pass every hard filter; "reached" people are also at
+    or above the minimum match score, i.e. find_matches would list the
+    scheme for them (before the max_results cut). Catalog baselines are
+    computed once and reused by every what-if on the same population.
+    """
+
+    def __init__(self, engine, population, min_score=None, config=SimulatorConfig):
+        self.engine = engine
+        self.population = population
+        self.min_score = min_score or engine.config.MIN_MATCH_SCORE
+        self.config = config
+        self._baseline = {}         # (catalog version, group_by, where digest) → reach by scheme id
+
+    # ──────────────────────────────────────────────
+    # EVALUATION
+    # ──────────────────────────────────────────────
+
+    def _evaluate(self, schemes=None, group_by=None, where=None):
+        """
+        Accumulate reach for the catalog (schemes=None) or for scheme variants
+        over the whole population, chunk by chunk.
+        Returns: list of per-column tallies (one per scheme / variant)
+        """
+        width = len(self.engine.schemes) if schemes is None else len(schemes)
+        groups = None
+        if group_by is not None:
+            if group_by not in self.config.GROUP_FIELDS:
+                raise ValueError(f"group_by must be one of {self.config.GROUP_FIELDS}")
+            groups = self.population.columns[group_by]
+
+        eligible = np.zeros(width, dtype=np.int64)
+        reached = np.zeros(width, dtype=np.int64)
+        score_sum = np.zeros(width, dtype=np.int64)
+        reasons = np.zeros((width, len(EligibilityMatrix.REASONS)), dtype=np.int64)
+        by_group = np.zeros((width, len(groups.values) if groups else 0), dtype=np.int64)
+        counted = 0
+
+        rows = max(1, self.config.CHUNK_CELLS // max(width, 1))
+        for start in range(0, self.population.size, rows):
+            stop = min(start + rows, self.population.size)
+            codes, scores = self.engine.score_population(self.population.chunk(start, stop), schemes)
+            if where is not None:
+                keep = where[start:stop]
+                codes, scores = codes[keep], scores[keep]
+            counted += len(codes)
+
+            passed = codes == EligibilityMatrix.PASSED
+            hit = passed & (scores >= self.min_score)
+            eligible += passed.sum(axis=0)
+            reached += hit.sum(axis=0)
+            score_sum += np.where(hit, scores, 0).sum(axis=0)
+            for code in range(1, len(EligibilityMatrix.REASONS)):
+                reasons[:, code] += (codes == code).sum(axis=0)
+            if groups is not None:
+                group_codes = groups.codes[start:stop]
+                if where is not None:
+                    group_codes = group_codes[keep]
+                for column in range(width):
+                    by_group[column] += np.bincount(
+                        group_codes[hit[:, column]], minlength=len(groups.values)
+                    )
+
+        tallies = []
+        for column in range(width):
+            tally = {
+                'population': counted,
+                'eligible': int(eligible[column]),
+                'reached': int(reached[column]),
+                'reach_rate': f"{(reached[column] / counted * 100) if counted else 0:.1f}%",
+                'mean_score': round(float(score_sum[column] / reached[column]), 1) if reached[column] else 0,
+                'rejections': {
+                    EligibilityMatrix.REASONS[code]: int(reasons[column, code])
+                    for code in range(1, len(EligibilityMatrix.REASONS)) if reasons[column, code]
+                },
+            }
+            if groups is not None:
+                tally[f'by_{group_by}'] = self._merge_groups(groups.values, by_group[column])
+            tallies.append(tally)
+        return tallies
+
+    @staticmethod
+    def _merge_groups(values, counts):
+        """Group counts keyed by value (values repeated after mapping are summed)"""
+        merged = {}
+        for value, count in zip(values, counts.tolist()):
+            if count:
+                merged[value or 'not given'] = merged.get(value or 'not given', 0) + count
+        return dict(sorted(merged.items(), key=lambda item: -item[1]))
+
+    def _where_mask(self, where):
+        return None if not where else self.population.mask(**where)
+
+    # ──────────────────────────────────────────────
+    # QUERIES
+    # ──────────────────────────────────────────────
+
+    def reach(self, scheme_ids=None, group_by=None, where=None):
+        """
+        Reach of every scheme (or `scheme_ids`) across the population.
+
+        Args:
+            scheme_ids: optional list of scheme ids to report
+            group_by: optional breakdown field ('state', 'gender', ...)
+            where: optional criteria restricting the population, e.g. {'state': 'Bihar'}
+
+        Returns: dict scheme id → reach (eligible, reached, rates, rejections, ...)
+        """
+        key = (self.engine.catalog_version, group_by, repr(sorted((where or {}).items())))
+        baseline = self._baseline.get(key)
+        if baseline is None:
+            start_time = time.time()
+            tallies = self._evaluate(group_by=group_by, where=self._where_mask(where))
+            baseline = {}
+            for scheme, tally in zip(self.engine.schemes, tallies):
+                baseline.setdefault(scheme.get('id'), {'scheme_name': scheme.get('name', ''), **tally})
+            self._baseline[key] = baseline
+            logger.info(
+                f"📊 Reach of {len(tallies)} schemes over {self.population.size:,} people "
+                f"in {round((time.time() - start_time) * 1000, 1)}ms"
+            )
+        if scheme_ids is None:
+            return dict(baseline)
+        return {scheme_id: baseline[scheme_id] for scheme_id in scheme_ids if scheme_id in baseline}
+
+    def what_if(self, scheme_id, changes, group_by=None, where=None):
+        """
+        Reach of one scheme with its eligibility changed, against its baseline.
+
+        Args:
+            scheme_id: scheme to modify
+            changes: eligibility overrides, e.g. {'max_income': 300000};
+                a None value removes the criterion
+
+        Returns: dict with baseline, scenario and delta (or error)
+        """
+        scheme = self.engine._find_scheme(scheme_id)
+        if scheme is None:
+            return {"scheme_id": scheme_id, "error": "Scheme not found"}
+
+        baseline = self.reach([scheme_id], group_by=group_by, where=where)[scheme_id]
+        start_time = time.time()
+        scenario = self._evaluate(
+            [self._variant(scheme, changes)], group_by=group_by, where=self._where_mask(where)
+        )[0]
+        elapsed_ms = round((time.time() - start_time) * 1000, 1)
+
+        delta = {
+            'eligible': scenario['eligible'] - baseline['eligible'],
+            'reached': scenario['reached'] - baseline['reached'],
+        }
+        if group_by is not None:
+            field = f'by_{group_by}'
+            delta[field] = {
+                value: scenario[field].get(value, 0) - baseline[field].get(value, 0)
+                for value in set(scenario[field]) | set(baseline[field])
+                if scenario[field].get(value, 0) != baseline[field].get(value, 0)
+            }
+        return {
+            "scheme_id": scheme_id,
+            "scheme_name": scheme.get('name', ''),
+            "changes": changes,
+            "baseline": baseline,
+            "scenario": scenario,
+            "delta": delta,
+            "elapsed_ms": elapsed_ms
+        }
+
+    def sweep(self, scheme_id, field, values, where=None):
+        """
+        Reach of one scheme for every candidate value of one eligibility
+        field, evaluated in a single pass (one variant column per value).
+
+        Returns: list of {value, eligible, reached, reach_rate, mean_score}
+        """
+        scheme = self.engine._find_scheme(scheme_id)
+        if scheme is None:
+            return []
+        values = list(values)
+        tallies = self._evaluate(
+            [self._variant(scheme, {field: value}) for value in values],
+            where=self._where_mask(where)
+        )
+        return [
+            {'value': value, **{k: tally[k] for k in ('eligible', 'reached', 'reach_rate', 'mean_score')}}
+            for value, tally in zip(values, tallies)
+        ]
+
+    @staticmethod
+    def _variant(scheme, changes):
+        """Scheme copy with eligibility overrides applied (None removes a criterion)"""
+        eligibility = dict(scheme.get('eligibility', {}))
+        for field, value in changes.items():
+            if value is None:
+                eligibility.pop(field, None)
+            else:
+                eligibility[field] = value
+        return {**scheme, 'eligibility': eligibility}
+
+    def verify_parity(self, sample=200, seed=0):
+        """
+        Spot-check simulated eligibility and scores against
+        check_eligibility_many for a random sample of people.
+        Returns: dict with people / schemes checked and mismatched pairs
+        """
+        rng = np.random.default_rng(seed)
+        people = rng.choice(self.population.size, size=min(sample, self.population.size), replace=False)
+        codes, scores = self.engine.score_population(self._gather(people))
+        scheme_ids = [scheme.get('id') for scheme in self.engine.schemes]
+
+        mismatched = 0
+        for row, person in enumerate(people.tolist()):
+            checks = self.engine.check_eligibility_many(self.population.profile(person), scheme_ids)
+            for column, check in enumerate(checks):
+                passed = codes[row, column] == EligibilityMatrix.PASSED
+                if check['eligible'] != passed or (passed and check['final_score'] != scores[row, column]):
+                    mismatched += 1
+        return {'people_checked': len(people), 'schemes': len(scheme_ids), 'mismatched': mismatched}
+
+    def _gather(self, people):
+        """Engine columns for an arbitrary set of people"""
+        return {
+            field: column.subset(people) if isinstance(column, CategoricalColumn) else column[people]
+            for field, column in self.population.columns.items()
+        }
+
+
+# ──────────────────────────────────────────────
+# STANDALONE TESTING
+# ──────────────────────────────────────────────
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+
+    print("=" * 55)
+    print("🧪 Reach Simulator Test Mode")
+    print("=" * 55)
+
+    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            schemes = json.load(f).get('schemes', [])
+    except Exception as e:
+        print(f"❌ Could not load schemes: {e}")
+        exit(1)
+
+    engine = MatchingEngine(schemes)
+
+    print(f"\n{'═' * 55}")
+    print("👥 Synthetic Population:")
+    start = time.time()
+    population = Population.synthetic(1_000_000, seed=7)
+    print(f"   {population} in {(time.time() - start) * 1000:.0f}ms")
+    simulator = ReachSimulator(engine, population)
+
+    # Simulated results must equal the per-profile matcher
+    print(f"\n{'═' * 55}")
+    print("🔍 Parity with check_eligibility_many:")
+    report = simulator.verify_parity(sample=300)
+    print(f"   {'✅' if report['mismatched'] == 0 else '❌'} "
+          f"{report['people_checked']} people × {report['schemes']} schemes, "
+          f"{report['mismatched']} mismatched")
+
+    print(f"\n{'═' * 55}")
+    print("📊 Catalog Reach:")
+    start = time.time()
+    reach = simulator.reach()
+    print(f"   {len(reach)} schemes × {population.size:,} people "
+          f"in {time.time() - start:.2f}s")
+    top = sorted(reach.items(), key=lambda item: -item[1]['reached'])[:5]
+    for scheme_id, tally in top:
+        print(f"   {scheme_id}: {tally['reached']:,} reached ({tally['reach_rate']}), "
+              f"mean score {tally['mean_score']}")
+
+    # What-ifs on the widest income-capped scheme
+    capped = [s for s in schemes if s.get('eligibility', {}).get('max_income')]
+    if capped:
+        scheme = max(capped, key=lambda s: reach[s['id']]['eligible'])
+        limit = scheme['eligibility']['max_income']
+
+        print(f"\n{'═' * 55}")
+        print(f"🔀 What-if: {scheme['id']} max_income {limit:,} → {int(limit * 1.5):,}")
+        result = simulator.what_if(scheme['id'], {'max_income': int(limit * 1.5)}, group_by='state')
+        print(f"   Eligible {result['baseline']['eligible']:,} → {result['scenario']['eligible']:,} "
+              f"({result['delta']['eligible']:+,}) in {result['elapsed_ms']}ms")
+        gains = sorted(result['delta']['by_state'].items(), key=lambda item: -item[1])[:3]
+        print(f"   Largest gains: {', '.join(f'{state} {gain:+,}' for state, gain in gains)}")
+
+        print(f"\n{'═' * 55}")
+        print("📈 Sweep:")
+        values = [int(limit * factor) for factor in (0.5, 1.0, 1.5, 2.0)]
+        start = time.time()
+        for row in simulator.sweep(scheme['id'], 'max_income', values):
+            print(f"   max_income {row['value']:>9,}: {row['reached']:>9,} reached ({row['reach_rate']})")
+        print(f"   {len(values)} values in {time.time() - start:.2f}s")
+
+    print("\n✅ All tests complete!")
@@ -0,0 +1,531 @@
+"""
+Recommendation Cube - Precomputed Matches for Common Profile Segments
+=====================================================================
+Features:
+  - Segment grid (state, gender, category, occupation, age, income, BPL)
+    materialized through the vectorized batch matcher
+  - Segments keyed by MatchingEngine canonical keys, so any profile in the
+    same equivalence class is an exact hit (results identical to find_matches)
+  - Compact on-disk file (NumPy .npz: hashed keys + ranked scheme positions)
+    written atomically and shared by every worker; built offline at deploy
+    time (python recommendation_cube.py --build), workers only load it
+  - Catalog version + engine fingerprint: stale cubes are rebuilt on load
+    and never answer lookups
+  - Hit / miss / stale counters and a parity check against live matching
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import itertools
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from matching_engine import MatchingEngine, MatchConfig, MatchResult
+
+logger = logging.getLogger('GovSchemeAI.RecommendationCube')
+
+
+class CubeConfig:
+    """Segments materialized by default (values as the profile form sends them)"""
+
+    # None = every state in utils.INDIAN_STATES, one representative per
+    # equivalence class (states the catalog never names mostly collapse)
+    STATES = None
+    GENDERS = ('male', 'female')
+    CATEGORIES = ('general', 'obc', 'sc', 'st')
+    OCCUPATIONS = (
+        'farmer', 'student', 'employed', 'self_employed',
+        'unemployed', 'daily_wage', 'homemaker', 'retired'
+    )
+    AGES = (18, 25, 35, 45, 60, 65)
+    INCOMES = (50000, 100000, 200000, 300000, 500000, 800000)
+    BPL = (False, True)
+
+    # Stored ranking depth (lookups may ask for fewer results / a higher min score)
+    MAX_RESULTS = MatchConfig.DEFAULT_MAX_RESULTS
+
+    # Default file location, outside the source tree (override with the
+    # CUBE_PATH environment variable)
+    DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'saarthi-ai', 'recommendation_cube.npz')
+
+    # Bump when the file layout or canonical key format changes
+    FORMAT_VERSION = 2
+
+    # MatchConfig attributes that never change a ranking
+    NON_RANKING_PREFIXES = ('CACHE_', 'BATCH_', 'TOPK_')
+
+
+def cube_path(path=None, config=CubeConfig):
+    """Cube file location: explicit path, else CUBE_PATH, else the config default"""
+    return path or os.environ.get('CUBE_PATH') or config.DEFAULT_PATH
+
+
+def engine_fingerprint(engine):
+    """
+    Hash of everything a cached ranking depends on: catalog content,
+    scorer weights/gradient mode and the result-affecting MatchConfig values
+    """
+    config = {
+        name: getattr(engine.config, name)
+        for name in dir(engine.config)
+        if name.isupper() and not name.startswith(CubeConfig.NON_RANKING_PREFIXES)
+    }
+    payload = json.dumps({
+        'format': CubeConfig.FORMAT_VERSION,
+        'catalog': engine.catalog_version,
+        'weights': engine.scorer.WEIGHTS,
+        'gradient': engine.scorer.enable_gradient,
+        'config': config,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class RecommendationCube:
+    """
+    Ranked scheme lists for a fixed set of profile segments.
+
+    Each segment is stored under a 64-bit digest of its canonical key
+    (sorted, binary-searched), with its top MAX_RESULTS matches as
+    (catalog position, score) pairs. A lookup hits only when the profile's
+    canonical class was materialized, so every hit returns exactly what
+    find_matches() would; anything else returns None for live matching.
+    """
+
+    def __init__(self, keys, offsets, positions, scores, meta):
+        """
+        Args:
+            keys: sorted uint64 segment digests
+            offsets: int64 array (len(keys) + 1) into positions / scores
+            positions: uint16 catalog positions, ranked per segment
+            scores: uint8 final scores aligned with positions
+            meta: dict with fingerprint, catalog_version, scheme_ids, ...
+        """
+        self.keys = keys
+        self.offsets = offsets
+        self.positions = positions
+        self.scores = scores
+        self.meta = meta
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._verified_for = None
+
+    # ──────────────────────────────────────────────
+    # BUILD
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def segment_profiles(engine, config=CubeConfig):
+        """
+        Profiles for the segment grid, one per distinct canonical key.
+        Dimension values in the same equivalence class are collapsed first,
+        so the product stays small.
+        """
+        states = config.STATES
+        if states is None:
+            from utils import INDIAN_STATES
+            states = INDIAN_STATES
+
+        def representatives(field, values):
+            seen = {}
+            for value in values:
+                seen.setdefault(engine._canonical.value_class(field, value), value)
+            return list(seen.values())
+
+        grid = itertools.product(
+            representatives('state', states),
+            config.GENDERS,
+            representatives('category', config.CATEGORIES),
+            representatives('occupation', config.OCCUPATIONS),
+            config.AGES,
+            config.INCOMES,
+            config.BPL,
+        )
+        return [
+            {
+                'state': state, 'gender': gender, 'category': category,
+                'occupation': occupation, 'age': age,
+                'annual_income': income, 'is_bpl': bpl
+            }
+            for state, gender, category, occupation, age, income, bpl in grid
+        ]
+
+    @classmethod
+    def build(cls, engine, profiles=None, config=CubeConfig):
+        """
+        Materialize the segment grid (plus any extra profiles, e.g. sampled
+        from real traffic) with engine.iter_batch_matches().
+
+        Args:
+            engine: MatchingEngine the cube will answer for
+            profiles: optional extra profiles to materialize
+            config: CubeConfig (or subclass) describing the grid
+        """
+        start_time = time.time()
+        segments = cls.segment_profiles(engine, config) + list(profiles or [])
+
+        # One profile per canonical class
+        by_key = {}
+        for profile in segments:
+            by_key.setdefault(cls._digest(engine.canonical_key(profile)), profile)
+        keys = np.array(sorted(by_key), dtype=np.uint64)
+        unique = [by_key[int(key)] for key in keys]
+
+        scheme_ids = [scheme.get('id') for scheme in engine.schemes]
+        position_of = {scheme_id: i for i, scheme_id in enumerate(scheme_ids)}
+        counts = np.zeros(len(unique), dtype=np.int64)
+        positions, scores = [], []
+        for match in engine.iter_batch_matches(
+            unique, max_results_each=config.MAX_RESULTS, track_stats=False
+        ):
+            counts[match.profile_index] += 1
+            positions.append(position_of[match.scheme_id])
+            scores.append(match.score)
+
+        offsets = np.zeros(len(unique) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        meta = {
+            'format': config.FORMAT_VERSION,
+            'fingerprint': engine_fingerprint(engine),
+            'catalog_version': engine.catalog_version,
+            'scheme_ids': scheme_ids,
+            'max_results': config.MAX_RESULTS,
+            'min_score': engine.config.MIN_MATCH_SCORE,
+            'segments': len(unique),
+            'built_at': datetime.now().isoformat(),
+            'build_ms': round((time.time() - start_time) * 1000, 2),
+        }
+        cube = cls(
+            keys, offsets,
+            np.array(positions, dtype=np.uint16),
+            np.array(scores, dtype=np.uint8),
+            meta
+        )
+        logger.info(
+            f"🧊 Built recommendation cube: {len(unique)} segments, "
+            f"{len(positions)} ranked entries in {meta['build_ms']}ms"
+        )
+        return cube
+
+    @staticmethod
+    def _digest(canonical_key):
+        """64-bit digest of a canonical key"""
+        digest = hashlib.blake2b(canonical_key.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    # ──────────────────────────────────────────────
+    # STORAGE
+    # ──────────────────────────────────────────────
+
+    def save(self, path=None):
+        """Write the cube atomically (temp file + rename), so workers never read a partial file"""
+        path = cube_path(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                keys=self.keys,
+                offsets=self.offsets,
+                positions=self.positions,
+                scores=self.scores,
+                meta=np.array(json.dumps(self.meta))
+            )
+        os.replace(tmp_path, path)
+        logger.info(f"💾 Saved recommendation cube to {path} ({os.path.getsize(path):,} bytes)")
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a cube file; returns None if it's missing or unreadable"""
+        path = cube_path(path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data['keys'], data['offsets'], data['positions'], data['scores'],
+                    json.loads(str(data['meta']))
+                )
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load recommendation cube {path}: {e}")
+            return None
+
+    @classmethod
+    def load_current(cls, engine, path=None):
+        """
+        Load the shared cube file only if it was built for this engine's
+        catalog and settings; never builds (returns None otherwise)
+        """
+        path = cube_path(path)
+        cube = cls.load(path)
+        if cube is None:
+            logger.info(f"🧊 No recommendation cube at {path} (build it with: python recommendation_cube.py --build)")
+            return None
+        if not cube.is_current(engine):
+            logger.warning(
+                f"⚠️  Recommendation cube {path} is stale (catalog {cube.meta.get('catalog_version')} "
+                f"→ {engine.catalog_version}); rebuild it with: python recommendation_cube.py --build"
+            )
+            return None
+        logger.info(f"🧊 Loaded recommendation cube: {cube.meta['segments']} segments")
+        return cube
+
+    @classmethod
+    def load_or_build(cls, engine, path=None, profiles=None, config=CubeConfig):
+        """
+        Load the shared cube file, rebuilding (and rewriting) it when it's
+        missing or was built for another catalog version / engine setup.
+        Building takes seconds: run it at deploy time (--build), not per worker.
+        """
+        path = cube_path(path, config)
+        cube = cls.load(path)
+        if cube is not None and cube.is_current(engine):
+            logger.info(f"🧊 Loaded recommendation cube: {cube.meta['segments']} segments")
+            return cube
+
+        if cube is not None:
+            logger.info(
+                f"🔄 Recommendation cube is stale (catalog {cube.meta.get('catalog_version')} "
+                f"→ {engine.catalog_version}), rebuilding"
+            )
+        cube = cls.build(engine, profiles, config)
+        try:
+            cube.save(path)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not save recommendation cube {path}: {e}")
+        return cube
+
+    # ──────────────────────────────────────────────
+    # LOOKUP
+    # ──────────────────────────────────────────────
+
+    def is_current(self, engine):
+        """True if the cube was built for this engine's catalog and settings"""
+        return (
+            self.meta.get('format') == CubeConfig.FORMAT_VERSION
+            and self.meta.get('catalog_version') == engine.catalog_version
+            and self.meta.get('fingerprint') == engine_fingerprint(engine)
+            and self.meta.get('scheme_ids') == [s.get('id') for s in engine.schemes]
+        )
+
+    def lookup(self, engine, user_profile, max_results=None, min_score=None,
+               include_reasons=False, category_filter=None, type_filter=None):
+        """
+        Answer a find_matches() call from the cube.
+
+        Returns:
+            The same list of MatchedScheme results find_matches() would
+            return, or None when the call can't be answered exactly
+            (segment not materialized, reasons/filters requested, deeper
+            ranking than stored, or the cube is stale)
+        """
+        max_results = min(
+            max_results or engine.config.DEFAULT_MAX_RESULTS,
+            engine.config.ABSOLUTE_MAX_RESULTS
+        )
+        min_score = min_score or engine.config.MIN_MATCH_SCORE
+        if (include_reasons or category_filter or type_filter
+                or max_results > self.meta['max_results']
+                or min_score < self.meta['min_score']):
+            return None
+
+        # Fingerprint once per (engine, catalog version); a catalog swap re-checks
+        checked_for = (id(engine), engine.catalog_version)
+        if self._verified_for != checked_for:
+            if not self.is_current(engine):
+                with self._lock:
+                    self._stale += 1
+                return None
+            self._verified_for = checked_for
+
+        key = self._digest(engine.canonical_key(user_profile))
+        slot = int(np.searchsorted(self.keys, key))
+        if slot == len(self.keys) or int(self.keys[slot]) != key:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        start, end = int(self.offsets[slot]), int(self.offsets[slot + 1])
+        results = []
+        # Scores are ranked descending, so a higher min_score is a prefix
+        for position, score in zip(self.positions[start:end].tolist(),
+                                   self.scores[start:end].tolist()):
+            if score < min_score or len(results) == max_results:
+                break
+            results.append(MatchResult(engine.schemes[position], score).to_dict())
+
+        with self._lock:
+            self._hits += 1
+        return engine.with_explanation_tokens(results, user_profile)
+
+    # ──────────────────────────────────────────────
+    # DIAGNOSTICS
+    # ──────────────────────────────────────────────
+
+    def verify(self, engine, profiles):
+        """
+        Compare lookup() hits against live find_matches() (cache bypassed).
+        Returns: dict with hits, checked profiles and mismatches
+        """
+        hits, mismatches = 0, []
+        for i, profile in enumerate(profiles):
+            cached = self.lookup(engine, profile)
+            if cached is None:
+                continue
+            hits += 1
+            engine.clear_cache()
+            expected = engine.find_matches(profile)
+            if [r.for_json() for r in cached] != [r.for_json() for r in expected]:
+                mismatches.append(i)
+        return {
+            'profiles_checked': len(profiles),
+            'hits': hits,
+            'mismatches': len(mismatches),
+            'examples': mismatches[:5]
+        }
+
+    def stats(self):
+        """Lookup counters and cube size"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'segments': len(self.keys),
+                'ranked_entries': len(self.positions),
+                'catalog_version': self.meta.get('catalog_version'),
+                'built_at': self.meta.get('built_at'),
+                'hits': self._hits,
+                'misses': self._misses,
+                'stale': self._stale,
+                'hit_rate': f"{(self._hits / max(total, 1) * 100):.1f}%",
+                'memory_bytes': int(
+                    self.keys.nbytes + self.offsets.nbytes
+                    + self.positions.nbytes + self.scores.nbytes
+                )
+            }
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return (
+            f"<RecommendationCube: {len(self.keys)} segments, "
+            f"catalog {self.meta.get('catalog_version')}>"
+        )
+
+
+# ──────────────────────────────────────────────
+# STANDALONE TESTING
+# ──────────────────────────────────────────────
+
+if __name__ == '__main__':
+    import random
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recommendation cube: build for deployment, or run the self-test")
+    parser.add_argument('--build', action='store_true',
+                        help="build (or refresh) the shared cube file for the current catalog and exit")
+    parser.add_argument('--path', default=None,
+                        help=f"cube file for --build (default: CUBE_PATH or {CubeConfig.DEFAULT_PATH})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.build else logging.WARNING)
+
+    if args.build:
+        # Same catalog the API serves
+        from data_loader import DataLoader
+        engine = MatchingEngine(DataLoader().get_all_schemes())
+        cube = RecommendationCube.load_or_build(engine, args.path)
+        print(f"🧊 {cube} ready at {cube_path(args.path)} (catalog {cube.meta['catalog_version']})")
+        exit(0)
+
+    print("=" * 55)
+    print("🧪 Recommendation Cube Test Mode")
+    print("=" * 55)
+
+    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            schemes = json.load(f).get('schemes', [])
+    except Exception as e:
+        print(f"❌ Could not load schemes: {e}")
+        exit(1)
+
+    engine = MatchingEngine(schemes)
+    test_path = os.path.join(tempfile.mkdtemp(), 'recommendation_cube.npz')
+
+    # Build + save, then load as another worker would
+    print(f"\n{'═' * 55}")
+    print("🧊 Build:")
+    missing = RecommendationCube.load_current(engine, test_path)
+    cube = RecommendationCube.load_or_build(engine, test_path)
+    print(f"   {cube}: {cube.meta['build_ms']}ms, file {os.path.getsize(test_path):,} bytes")
+    start = time.time()
+    loaded = RecommendationCube.load_or_build(engine, test_path)
+    print(f"   Reloaded in {(time.time() - start) * 1000:.1f}ms "
+          f"(rebuilt: {loaded.meta['built_at'] != cube.meta['built_at']})")
+    start = time.time()
+    worker_cube = RecommendationCube.load_current(engine, test_path)
+    print(f"   {'✅' if missing is None and worker_cube is not None else '❌'} Worker load "
+          f"(no build): {(time.time() - start) * 1000:.1f}ms; missing file → no cube")
+
+    # Traffic-like profiles: half inside the grid, half arbitrary
+    rng = random.Random(11)
+    traffic = []
+    for _ in range(2000):
+        grid_like = rng.random() < 0.5
+        traffic.append({
+            'state': rng.choice(['Bihar', 'Uttar Pradesh', 'Tamil Nadu', 'Delhi', 'Kerala']),
+            'gender': rng.choice(CubeConfig.GENDERS),
+            'category': rng.choice(CubeConfig.CATEGORIES),
+            'occupation': rng.choice(CubeConfig.OCCUPATIONS),
+            'age': rng.choice(CubeConfig.AGES) if grid_like else rng.randint(18, 70),
+            'annual_income': (rng.choice(CubeConfig.INCOMES) if grid_like
+                              else rng.randint(1, 60) * 10000),
+            'is_bpl': rng.random() < 0.3,
+            'language': 'en'
+        })
+
+    # Every hit must equal live matching
+    print(f"\n{'═' * 55}")
+    print("🔍 Parity with find_matches:")
+    report = loaded.verify(engine, traffic)
+    print(f"   {'✅' if report['mismatches'] == 0 else '❌'} "
+          f"{report['hits']}/{report['profiles_checked']} hits, {report['mismatches']} mismatches")
+
+    # Lookup vs live latency
+    hits = [p for p in traffic if loaded.lookup(engine, p) is not None][:500]
+    start = time.time()
+    for profile in hits:
+        loaded.lookup(engine, profile)
+    cube_ms = (time.time() - start) * 1000 / max(len(hits), 1)
+    start = time.time()
+    for profile in hits:
+        engine.clear_cache()
+        engine.find_matches(profile)
+    live_ms = (time.time() - start) * 1000 / max(len(hits), 1)
+    print(f"   Lookup: {cube_ms:.3f}ms/profile vs live {live_ms:.3f}ms/profile")
+
+    # Catalog change → stale cube misses, load_or_build rebuilds
+    print(f"\n{'═' * 55}")
+    print("🔄 Catalog Version Change:")
+    changed = [dict(s) for s in schemes]
+    changed[0]['name'] = changed[0].get('name', '') + ' (revised)'
+    engine.update_schemes(changed)
+    print(f"   Stale lookup → {loaded.lookup(engine, hits[0]) if hits else None}")
+    print(f"   {'✅' if RecommendationCube.load_current(engine, test_path) is None else '❌'} "
+          f"Workers skip the stale file instead of rebuilding it")
+    rebuilt = RecommendationCube.load_or_build(engine, test_path)
+    print(f"   Rebuilt for catalog {rebuilt.meta['catalog_version']}: "
+          f"{rebuilt.lookup(engine, hits[0]) is not None if hits else False}")
+
+    print(f"\n📊 Stats: {loaded.stats()}")
+    print("\n✅ All tests complete!")
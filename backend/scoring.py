@@ -3,8 +3,11 @@ Scoring Engine v3.0 - Intelligent Relevance Calculator
 =======================================================
 Features:
   - Weighted scoring with configurable weights
-  - Gradient scoring (partial credit, not just pass/fail)
-  - Per-field score breakdown with explanations
+  - Gradient scoring (partial credit, not just pass/fail); neighbor and
+    relation credit from precomputed relation tables (frozensets per value
+    for one scheme, bitsets per scheme for the vectorized catalog path)
+  - Per-field score breakdown with explanations (slotted, numeric while
+    scoring; text rendered only when read)
   - Multiple scoring strategies (strict, lenient, balanced)
   - Confidence level calculation
   - Score normalization and capping
@@ -14,16 +17,146 @@ Features:
   - Score comparison between schemes
   - Custom weight profiles for different use cases
   - Full type safety with input sanitization
-  - Performance tracking
+  - Performance tracking (calculate_score runs the same field scorers into a
+    numbers-only ScoreTally; the full breakdown is built only for
+    calculate_detailed_score)
+  - Vectorized (NumPy) scoring of many profiles against a compiled catalog
+    (score_matrix: users × schemes int matrix, bit-identical to calculate_score)
+  - Compiled per-scheme score programs (closures over pre-lowered sets and
+    pre-resolved relation credit, cached with the catalog's columns); field
+    scorers are interned per eligibility fragment and memoized per profile
+    value, with hit counters in get_analytics()
 """
 
 import time
 import logging
 from copy import deepcopy
-from collections import defaultdict
+from functools import partial
+from types import MappingProxyType
+from collections import defaultdict, namedtuple
+
+import numpy as np
 
 logger = logging.getLogger('GovSchemeAI.ScoringEngine')
 
+# A profile normalized once per request for compiled score programs
+# (flags: parsed user values in ScoringColumns.FLAGS order; bonus / penalty:
+# the scheme-independent bonus and penalty points)
+ScoreFacts = namedtuple('ScoreFacts', [
+    'user', 'age', 'income', 'gender', 'state', 'category', 'occupation',
+    'flags', 'bonus_category', 'bonus', 'penalty'
+])
+
+
+class CategoricalColumn(namedtuple('CategoricalColumn', ['values', 'codes'])):
+    """
+    Factorized categorical column: the distinct `values` plus one index into
+    them per row, so per-value work (credit rows, normalization) is done
+    once per distinct value instead of once per row.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def factorize(cls, items):
+        """Column from a sequence of hashable values (first-seen order)"""
+        index = {}
+        codes = np.empty(len(items), dtype=np.intp)
+        for row, value in enumerate(items):
+            codes[row] = index.setdefault(value, len(index))
+        return cls(tuple(index), codes)
+
+    def map(self, transform):
+        """Same rows with every distinct value passed through transform()"""
+        return type(self)(tuple(transform(value) for value in self.values), self.codes)
+
+    def take(self, table):
+        """Per-row array from a per-value table (table[i] belongs to values[i])"""
+        return np.asarray(table)[self.codes]
+
+    def subset(self, rows):
+        """Column restricted to some rows (a slice, mask or index array)"""
+        return type(self)(self.values, self.codes[rows])
+
+
+class RelationTable:
+    """
+    Integer-id / bitset form of a static relation map (value → related values).
+
+    Every value the map names gets one bit. related(value) is the bitset of
+    the values it earns partial credit against, and mask(values) folds an
+    eligibility list into the same bits, so "is any relative eligible?" is
+    a single AND instead of nested list scans. Values outside the map have
+    no bit and no relatives. symmetric=True also relates each listed value
+    back to its key (the occupation check looks both ways).
+
+    The bitsets serve the vectorized ScoringColumns path; the scalar checks
+    test one eligibility list at a time against relative_sets (frozensets),
+    which is cheaper there than folding the list into a mask.
+    """
+
+    # Upper bound on cached eligibility-list masks before the cache resets
+    MAX_CACHED_MASKS = 4096
+
+    def __init__(self, relations, symmetric=False):
+        self.ids = {}
+        for value, relatives in relations.items():
+            for name in (value, *relatives):
+                self.ids.setdefault(name, len(self.ids))
+
+        self.relatives = dict.fromkeys(self.ids, 0)
+        for value, relatives in relations.items():
+            for relative in relatives:
+                self.relatives[value] |= 1 << self.ids[relative]
+                if symmetric:
+                    self.relatives[relative] |= 1 << self.ids[value]
+
+        names = list(self.ids)
+        self.relative_sets = {
+            value: frozenset(name for i, name in enumerate(names) if bits >> i & 1)
+            for value, bits in self.relatives.items() if bits
+        }
+
+        self._masks = {}
+
+    def related(self, value):
+        """Bitset of value's relatives (0 for values outside the map)"""
+        return self.relatives.get(value, 0)
+
+    def mask(self, values):
+        """Bitset of the mapped values in a sequence, cached by its contents"""
+        try:
+            key = tuple(values)
+            return self._masks[key]
+        except KeyError:
+            if len(self._masks) >= self.MAX_CACHED_MASKS:
+                self._masks.clear()
+            bits = self._masks[key] = self._fold(values)
+            return bits
+        except TypeError:
+            return self._fold(values)
+
+    def _fold(self, values):
+        # Unmapped (or unhashable) entries can't equal a mapped value: no bit
+        ids = self.ids
+        bits = 0
+        for value in values:
+            try:
+                bits |= 1 << ids[value]
+            except (KeyError, TypeError):
+                pass
+        return bits
+
+    def holders(self, bits):
+        """Values with at least one relative in bits (for set-based scorers)"""
+        return frozenset(value for value, relatives in self.relatives.items() if relatives & bits)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"<RelationTable: {len(self.ids)} values>"
+
 
 class WeightProfile:
     """
@@ -100,76 +233,251 @@ class WeightProfile:
 
 
 class ScoreBreakdown:
-    """Structured breakdown of a scoring result"""
+    """
+    Structured breakdown of a scoring result.
+
+    Only numbers and small message codes are recorded while scoring:
+    one (earned, applicable, gradient, detail, args) slot per field in
+    FIELDS order, and (name, points, reason, args) / (note, args) entries
+    for bonuses, penalties and notes. The readable text (field_scores,
+    bonuses, penalties, notes) is rendered on first read, e.g. by
+    to_dict(), so bulk scoring never formats it.
+
+    Those views are read-only (mappings and tuples): record changes with
+    add_field / add_bonus / add_penalty / add_note. to_dict() returns
+    plain, mutable dicts and lists.
+    """
+
+    __slots__ = (
+        '_fields', '_bonuses', '_penalties', '_notes', '_rendered',
+        'total_earned', 'total_applicable', 'final_score', 'confidence', 'strategy'
+    )
+
+    FIELDS = ('age', 'gender', 'state', 'category', 'income', 'occupation', 'special_flags')
+    FIELD_SLOTS = {field: slot for slot, field in enumerate(FIELDS)}
+
+    # Message codes (details, bonus / penalty reasons, notes)
+    AGE_NONE, AGE_MISSING, AGE_OPTIMAL, AGE_EXACT, AGE_WITHIN, AGE_NEAR, AGE_OUTSIDE = range(7)
+    GENDER_ALL, GENDER_MISSING, GENDER_MATCH, GENDER_MISMATCH = range(10, 14)
+    STATE_ALL, STATE_MISSING, STATE_MATCH, STATE_NEAR, STATE_MISMATCH = range(20, 25)
+    CATEGORY_NONE, CATEGORY_MISSING, CATEGORY_MATCH, CATEGORY_RELATED, CATEGORY_MISMATCH = range(30, 35)
+    INCOME_NONE, INCOME_MISSING, INCOME_GRADED, INCOME_WITHIN, INCOME_MARGINAL, INCOME_OVER = range(40, 46)
+    OCCUPATION_NONE, OCCUPATION_MISSING, OCCUPATION_MATCH, OCCUPATION_RELATED, OCCUPATION_MISMATCH = range(50, 55)
+    FLAGS_NONE, FLAGS_CHECKED = range(60, 62)
+    BONUS_ALIGNMENT, BONUS_VULNERABLE, BONUS_BPL, BONUS_SENIOR, BONUS_TARGETED = range(70, 75)
+    PENALTY_SPARSE, NOTE_SPARSE, NOTE_MIN_AGE, NOTE_MAX_AGE, NOTE_DEFAULT = range(80, 85)
+
+    FLAG_LABELS = {
+        'is_bpl': 'BPL Status',
+        'is_farmer': 'Farmer Status',
+        'is_student': 'Student Status',
+        'disability': 'Disability Status'
+    }
+    INCOME_NOTES = {1.0: "well within", 0.95: "comfortably within", 0.85: "close to"}
+
+    # code → render(*args)
+    MESSAGES = {
+        AGE_NONE: lambda: "No age requirement",
+        AGE_MISSING: lambda: "User age not provided",
+        AGE_OPTIMAL: lambda age, low, high, gradient: (
+            f"Age {age} in range {low}-{high} (optimality: {gradient:.0%})"),
+        AGE_EXACT: lambda age, low: f"Age {age} matches exact requirement {low}",
+        AGE_WITHIN: lambda age, low, high: f"Age {age} within range ({low or '?'}-{high or '?'})",
+        AGE_NEAR: lambda age, distance, gradient: (
+            f"Age {age} is {distance} years outside range (partial credit: {gradient:.0%})"),
+        AGE_OUTSIDE: lambda age, low, high: f"Age {age} outside range ({low or '?'}-{high or '?'})",
+
+        GENDER_ALL: lambda: "Open to all genders",
+        GENDER_MISSING: lambda: "User gender not provided",
+        GENDER_MATCH: lambda gender, required: f"Gender '{gender}' matches requirement '{required}'",
+        GENDER_MISMATCH: lambda gender, required: f"Gender '{gender}' doesn't match '{required}'",
+
+        STATE_ALL: lambda: "Available across all states",
+        STATE_MISSING: lambda: "User state not provided",
+        STATE_MATCH: lambda state: f"State '{state}' is eligible",
+        STATE_NEAR: lambda state, proximity: (
+            f"State '{state}' not listed but "
+            f"neighboring state is eligible (proximity: {proximity:.0%})"),
+        STATE_MISMATCH: lambda state, states: (
+            f"State '{state}' not in eligible list: {', '.join(states[:5])}"
+            f"{'...' if len(states) > 5 else ''}"),
+
+        CATEGORY_NONE: lambda: "No category restriction",
+        CATEGORY_MISSING: lambda: "User category not provided",
+        CATEGORY_MATCH: lambda category: f"Category '{category.upper()}' is eligible",
+        CATEGORY_RELATED: lambda category, relation: (
+            f"Category '{category.upper()}' not listed but "
+            f"related category is eligible (relation: {relation:.0%})"),
+        CATEGORY_MISMATCH: lambda category, categories: (
+            f"Category '{category.upper()}' not in {[c.upper() for c in categories]}"),
+
+        INCOME_NONE: lambda: "No income restriction",
+        INCOME_MISSING: lambda: "User income not provided",
+        INCOME_GRADED: lambda income, limit, ratio, gradient: (
+            f"Income ₹{income:,} is {ScoreBreakdown.INCOME_NOTES[gradient]} limit ₹{limit:,} "
+            f"({ratio:.0%} of max)"),
+        INCOME_WITHIN: lambda income, limit: f"Income ₹{income:,} within limit ₹{limit:,}",
+        INCOME_MARGINAL: lambda income, limit, overshoot: (
+            f"Income ₹{income:,} slightly exceeds limit "
+            f"₹{limit:,} by {overshoot:.0%} (marginal credit)"),
+        INCOME_OVER: lambda income, limit: f"Income ₹{income:,} exceeds limit ₹{limit:,}",
+
+        OCCUPATION_NONE: lambda: "No occupation restriction",
+        OCCUPATION_MISSING: lambda: "User occupation not provided",
+        OCCUPATION_MATCH: lambda occupation: f"Occupation '{occupation}' matches",
+        OCCUPATION_RELATED: lambda occupation, occupations, relation: (
+            f"Occupation '{occupation}' related to "
+            f"eligible: {[o.title() for o in occupations]} "
+            f"(relation: {relation:.0%})"),
+        OCCUPATION_MISMATCH: lambda occupation, occupations: (
+            f"Occupation '{occupation}' not in {[o.title() for o in occupations]}"),
+
+        FLAGS_NONE: lambda: "No special flag requirements",
+        FLAGS_CHECKED: lambda checks: " | ".join(
+            f"✅ {ScoreBreakdown.FLAG_LABELS[flag]}: matches (you: {user_value})" if matched else
+            f"❌ {ScoreBreakdown.FLAG_LABELS[flag]}: mismatch "
+            f"(you: {user_value}, required: {required})"
+            for flag, user_value, required, matched in checks
+        ),
+
+        BONUS_ALIGNMENT: lambda fields: f"All {fields} criteria matched perfectly",
+        BONUS_VULNERABLE: lambda: "BPL + disability: priority applicant",
+        BONUS_BPL: lambda: "BPL applicant priority",
+        BONUS_SENIOR: lambda age: f"Senior citizen (age {age})",
+        BONUS_TARGETED: lambda category: f"Scheme specifically targets {category.upper()} category",
+
+        PENALTY_SPARSE: lambda provided, fields: f"Only {provided}/{fields} key fields provided",
+        NOTE_SPARSE: lambda: "⚠️ Score accuracy limited due to incomplete profile",
+        NOTE_MIN_AGE: lambda age: (
+            f"📌 You are at the minimum age limit ({age}). "
+            f"Verify exact date of birth eligibility."),
+        NOTE_MAX_AGE: lambda age: (
+            f"📌 You are at the maximum age limit ({age}). "
+            f"Apply soon before age cutoff."),
+        NOTE_DEFAULT: lambda: "No applicable criteria found, default score assigned",
+    }
 
     def __init__(self):
-        self.field_scores = {}
+        self._fields = [None] * len(self.FIELDS)
+        self._bonuses = []
+        self._penalties = []
+        self._notes = []
+        self._rendered = None
         self.total_earned = 0
         self.total_applicable = 0
         self.final_score = 0
         self.confidence = 0
         self.strategy = 'balanced'
-        self.bonuses = []
-        self.penalties = []
-        self.notes = []
-
-    def add_field(self, field_name, earned, applicable, detail="", gradient=1.0):
-        """Add a field score to the breakdown"""
-        self.field_scores[field_name] = {
-            'earned': round(earned, 2),
-            'applicable': round(applicable, 2),
-            'percentage': round((earned / applicable * 100), 1) if applicable > 0 else 0,
-            'detail': detail,
-            'gradient': round(gradient, 2)
-        }
+
+    @classmethod
+    def render(cls, message, args=()):
+        """Text for a message code and its args (plain strings pass through)"""
+        if isinstance(message, str):
+            return message
+        return cls.MESSAGES[message](*args)
+
+    def add_field(self, field_name, earned, applicable, detail="", gradient=1.0, args=()):
+        """Add a field score to the breakdown (detail: text or a message code)"""
+        self._fields[self.FIELD_SLOTS[field_name]] = (earned, applicable, gradient, detail, args)
+        self._rendered = None
         self.total_earned += earned
         self.total_applicable += applicable
 
-    def add_bonus(self, name, points, reason):
-        self.bonuses.append({
-            'name': name,
-            'points': points,
-            'reason': reason
-        })
+    def add_bonus(self, name, points, reason, args=()):
+        self._bonuses.append((name, points, reason, args))
+
+    def add_penalty(self, name, points, reason, args=()):
+        self._penalties.append((name, points, reason, args))
+
+    def add_note(self, note, args=()):
+        self._notes.append((note, args))
+
+    # Counting straight from the slots (same rounding as the rendered dicts)
+
+    def fields_evaluated(self):
+        return sum(1 for entry in self._fields if entry is not None)
+
+    def fields_applicable(self):
+        return sum(1 for entry in self._fields if entry is not None and round(entry[1], 2) > 0)
 
-    def add_penalty(self, name, points, reason):
-        self.penalties.append({
-            'name': name,
-            'points': points,
-            'reason': reason
-        })
+    def fields_matched(self):
+        """Applicable fields with a (rounded) gradient of at least 0.8"""
+        return sum(
+            1 for entry in self._fields
+            if entry is not None and round(entry[1], 2) > 0 and round(entry[2], 2) >= 0.8
+        )
+
+    @property
+    def field_scores(self):
+        """Per-field dicts with rendered details (built on first read)"""
+        if self._rendered is None:
+            messages = self.MESSAGES
+            rendered = {}
+            for field, entry in zip(self.FIELDS, self._fields):
+                if entry is None:
+                    continue
+                earned, applicable, gradient, detail, args = entry
+                rendered[field] = MappingProxyType({
+                    'earned': round(earned, 2),
+                    'applicable': round(applicable, 2),
+                    'percentage': round((earned / applicable * 100), 1) if applicable > 0 else 0,
+                    'detail': detail if isinstance(detail, str) else messages[detail](*args),
+                    'gradient': round(gradient, 2)
+                })
+            self._rendered = MappingProxyType(rendered)
+        return self._rendered
+
+    @property
+    def bonuses(self):
+        return tuple(
+            MappingProxyType({'name': name, 'points': points, 'reason': self.render(reason, args)})
+            for name, points, reason, args in self._bonuses
+        )
 
-    def add_note(self, note):
-        self.notes.append(note)
+    @property
+    def penalties(self):
+        return tuple(
+            MappingProxyType({'name': name, 'points': points, 'reason': self.render(reason, args)})
+            for name, points, reason, args in self._penalties
+        )
+
+    @property
+    def notes(self):
+        return tuple(self.render(note, args) for note, args in self._notes)
 
     def calculate_final(self):
         """Calculate final score with bonuses and penalties"""
         if self.total_applicable == 0:
             self.final_score = 50
             self.confidence = 0
-            self.add_note("No applicable criteria found, default score assigned")
+            self.add_note(self.NOTE_DEFAULT)
             return self.final_score
 
         base = (self.total_earned / self.total_applicable) * 100
 
         # Apply bonuses
-        bonus_total = sum(b['points'] for b in self.bonuses)
-        penalty_total = sum(p['points'] for p in self.penalties)
+        bonus_total = sum(points for _, points, _, _ in self._bonuses)
+        penalty_total = sum(points for _, points, _, _ in self._penalties)
 
         adjusted = base + bonus_total - penalty_total
         self.final_score = max(0, min(int(adjusted), 100))
 
         # Calculate confidence
-        applicable_fields = sum(
-            1 for f in self.field_scores.values() if f['applicable'] > 0
-        )
-        total_fields = len(self.field_scores) if self.field_scores else 1
+        applicable_fields = self.fields_applicable()
+        total_fields = self.fields_evaluated() or 1
         self.confidence = round((applicable_fields / max(total_fields, 1)) * 100)
 
         return self.final_score
 
     def to_dict(self):
         """Convert to dictionary for API responses"""
+        field_scores = self.field_scores
+        bonus_total = 0
+        for _, points, _, _ in self._bonuses:
+            bonus_total += points
+        penalty_total = 0
+        for _, points, _, _ in self._penalties:
+            penalty_total += points
         return {
             'final_score': self.final_score,
             'confidence': self.confidence,
@@ -179,32 +487,283 @@ class ScoreBreakdown:
             'base_percentage': round(
                 (self.total_earned / self.total_applicable * 100), 1
             ) if self.total_applicable > 0 else 0,
-            'field_scores': self.field_scores,
-            'bonuses': self.bonuses,
-            'penalties': self.penalties,
-            'total_bonus': sum(b['points'] for b in self.bonuses),
-            'total_penalty': sum(p['points'] for p in self.penalties),
-            'notes': self.notes,
-            'fields_evaluated': len(self.field_scores),
-            'fields_applicable': sum(
-                1 for f in self.field_scores.values() if f['applicable'] > 0
-            )
+            'field_scores': {field: dict(scores) for field, scores in field_scores.items()},
+            'bonuses': [dict(bonus) for bonus in self.bonuses],
+            'penalties': [dict(penalty) for penalty in self.penalties],
+            'total_bonus': bonus_total,
+            'total_penalty': penalty_total,
+            'notes': list(self.notes),
+            'fields_evaluated': len(field_scores),
+            'fields_applicable': sum(1 for f in field_scores.values() if f['applicable'] > 0)
         }
 
     def summary(self):
         """One-line summary string"""
-        applicable = sum(
-            1 for f in self.field_scores.values() if f['applicable'] > 0
-        )
         return (
             f"Score: {self.final_score}% | "
             f"Confidence: {self.confidence}% | "
-            f"Fields: {applicable}/{len(self.field_scores)} | "
-            f"Bonuses: {len(self.bonuses)} | "
-            f"Penalties: {len(self.penalties)}"
+            f"Fields: {self.fields_applicable()}/{self.fields_evaluated()} | "
+            f"Bonuses: {len(self._bonuses)} | "
+            f"Penalties: {len(self._penalties)}"
         )
 
 
+class ScoreTally:
+    """
+    Numbers-only sink for the ScoringEngine field scorers.
+
+    Takes the same add_field / add_bonus / add_penalty / add_note calls as
+    ScoreBreakdown but keeps just the running totals, so calculate_score
+    runs the very same rules as calculate_detailed_score without storing
+    details, args or notes. Float sums happen in the same order, so the
+    final score is bit-identical to the breakdown's.
+    """
+
+    __slots__ = (
+        'total_earned', 'total_applicable', 'applicable_fields', 'matched_fields',
+        'bonus_total', 'penalty_total', 'final_score'
+    )
+
+    def __init__(self):
+        self.total_earned = 0
+        self.total_applicable = 0
+        self.applicable_fields = 0
+        self.matched_fields = 0
+        self.bonus_total = 0
+        self.penalty_total = 0
+        self.final_score = 0
+
+    def add_field(self, field_name, earned, applicable, detail="", gradient=1.0, args=()):
+        self.total_earned += earned
+        self.total_applicable += applicable
+        if round(applicable, 2) > 0:
+            self.applicable_fields += 1
+            self.matched_fields += round(gradient, 2) >= 0.8
+
+    def add_bonus(self, name, points, reason, args=()):
+        self.bonus_total += points
+
+    def add_penalty(self, name, points, reason, args=()):
+        self.penalty_total += points
+
+    def add_note(self, note, args=()):
+        pass
+
+    def fields_applicable(self):
+        return self.applicable_fields
+
+    def fields_matched(self):
+        return self.matched_fields
+
+    def calculate_final(self):
+        """ScoreBreakdown.calculate_final without the confidence"""
+        if self.total_applicable == 0:
+            self.final_score = 50
+            return self.final_score
+        base = (self.total_earned / self.total_applicable) * 100
+        adjusted = base + self.bonus_total - self.penalty_total
+        self.final_score = max(0, min(int(adjusted), 100))
+        return self.final_score
+
+
+class ScoringColumns:
+    """
+    Column-oriented copy of a catalog's eligibility for vectorized scoring.
+
+    Numeric limits live in float64 arrays (NaN = no limit) and flag
+    requirements in small int codes. Categorical criteria (state, category,
+    occupation, gender) keep their raw values; the per-value credit rows
+    for them are computed once with the scalar gradient helpers and
+    reused for every profile carrying that value. Relation fields also
+    keep per-scheme eligibility bitsets (see RelationTable), built once per
+    field, so their credit rows are vectorized ANDs.
+
+    Compiled score programs (one closure per scheme, see
+    ScoringEngine.compile_programs) are cached here too, per weight setup;
+    they are dropped when pickled and rebuilt on first use.
+    """
+
+    FIELDS = ('age', 'gender', 'state', 'category', 'income', 'occupation', 'special_flags')
+    FLAGS = ('is_bpl', 'is_farmer', 'is_student', 'disability')
+
+    # Flag requirement codes (user side uses the same 1/0, -1 = neither)
+    FLAG_NONE = -1
+    FLAG_OTHER = 2
+
+    # Upper bound on cached per-value credit rows before the cache resets
+    MAX_CACHED_ROWS = 4096
+
+    # Eligibility keys each field scorer reads: its "fragment" of the scheme
+    FRAGMENT_KEYS = {
+        'age': ('min_age', 'max_age'),
+        'gender': ('gender',),
+        'state': ('states',),
+        'category': ('category',),
+        'income': ('max_income',),
+        'occupation': ('occupation',),
+        'special_flags': FLAGS,
+    }
+
+    def __init__(self, schemes):
+        self.size = len(schemes)
+        self.eligibilities = [s.get('eligibility', {}) for s in schemes]
+
+        self.min_age = np.full(self.size, np.nan)
+        self.max_age = np.full(self.size, np.nan)
+        self.max_income = np.full(self.size, np.nan)
+        self.flag_required = np.full((len(self.FLAGS), self.size), self.FLAG_NONE, dtype=np.int8)
+
+        # Which fields count as "applicable" for each scheme (user-independent)
+        self.requires = {field: np.zeros(self.size, dtype=bool) for field in self.FIELDS}
+        self.flag_count = np.zeros(self.size, dtype=np.int64)
+
+        for i, elig in enumerate(self.eligibilities):
+            self._compile_row(i, elig)
+
+        self._credit_rows = {}
+        self._relation_masks = {}
+        self._programs = {}
+
+    def _compile_row(self, i, elig):
+        """(Re)write column row i from one eligibility dict"""
+        self.min_age[i] = self.max_age[i] = self.max_income[i] = np.nan
+        self.flag_required[:, i] = self.FLAG_NONE
+        self.flag_count[i] = 0
+
+        if elig.get('min_age') is not None:
+            self.min_age[i] = elig['min_age']
+        if elig.get('max_age') is not None:
+            self.max_age[i] = elig['max_age']
+        if elig.get('max_income') is not None:
+            self.max_income[i] = elig['max_income']
+
+        self.requires['age'][i] = (
+            elig.get('min_age') is not None or elig.get('max_age') is not None
+        )
+        self.requires['gender'][i] = elig.get('gender', 'all') != 'all'
+        self.requires['state'][i] = True
+        self.requires['category'][i] = bool(elig.get('category'))
+        self.requires['income'][i] = elig.get('max_income') is not None
+        self.requires['occupation'][i] = bool(elig.get('occupation'))
+        self.requires['special_flags'][i] = False
+
+        for f, flag_key in enumerate(self.FLAGS):
+            value = elig.get(flag_key)
+            if value is None:
+                continue
+            self.flag_count[i] += 1
+            if value is True or value is False or value in (0, 1):
+                self.flag_required[f, i] = int(value == True)  # noqa: E712
+            else:
+                self.flag_required[f, i] = self.FLAG_OTHER
+
+    def patched(self, schemes, positions):
+        """
+        Copy of these columns for an updated catalog in which only
+        `positions` changed (positions past the current size are appended).
+        Per-value credit rows span the whole catalog, so they start over;
+        score programs are reused for unchanged rows.
+        """
+        size = len(schemes)
+        extra = size - self.size
+
+        def grown(column, fill):
+            pad = np.full(column.shape[:-1] + (extra,), fill, dtype=column.dtype)
+            return np.concatenate([column, pad], axis=-1)
+
+        clone = object.__new__(type(self))
+        clone.size = size
+        clone.eligibilities = [s.get('eligibility', {}) for s in schemes]
+        clone.min_age = grown(self.min_age, np.nan)
+        clone.max_age = grown(self.max_age, np.nan)
+        clone.max_income = grown(self.max_income, np.nan)
+        clone.flag_required = grown(self.flag_required, self.FLAG_NONE)
+        clone.requires = {field: grown(column, False) for field, column in self.requires.items()}
+        clone.flag_count = grown(self.flag_count, 0)
+        for i in positions:
+            clone._compile_row(i, clone.eligibilities[i])
+        clone._credit_rows = {}
+        clone._relation_masks = {}
+        stale = set(positions)
+        clone._programs = {
+            key: (compile_one, [
+                compile_one(clone.eligibilities[i]) if program is None or i in stale else program
+                for i, program in enumerate(programs + [None] * extra)
+            ])
+            for key, (compile_one, programs) in self._programs.items()
+        }
+        return clone
+
+    def programs(self, key, compile_one):
+        """Per-scheme programs for one weight setup: compile_one(eligibility) on a miss"""
+        entry = self._programs.get(key)
+        if entry is None:
+            entry = (compile_one, [compile_one(elig) for elig in self.eligibilities])
+            self._programs[key] = entry
+        return entry[1]
+
+    @classmethod
+    def fragment(cls, field, elig):
+        """
+        Hashable signature of one field's fragment (values tagged with their
+        type, unset keys marked). Raises TypeError for unhashable criteria.
+        """
+        signature = (field,) + tuple(
+            cls._freeze(elig[key]) if key in elig else None
+            for key in cls.FRAGMENT_KEYS[field]
+        )
+        hash(signature)
+        return signature
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, (list, tuple)):
+            return (type(value).__name__, tuple(cls._freeze(item) for item in value))
+        return (type(value).__name__, value)
+
+    def fragment_counts(self):
+        """Distinct fragments per field across the catalog (shared criteria)"""
+        counts = {}
+        for field in self.FIELDS:
+            seen = set()
+            for elig in self.eligibilities:
+                try:
+                    seen.add(self.fragment(field, elig))
+                except TypeError:
+                    seen.add(id(elig))
+            counts[field] = len(seen)
+        return counts
+
+    def credit_row(self, key, compute):
+        """Cached per-value row: compute() is only called on a miss"""
+        row = self._credit_rows.get(key)
+        if row is None:
+            if len(self._credit_rows) >= self.MAX_CACHED_ROWS:
+                self._credit_rows.clear()
+            row = compute()
+            self._credit_rows[key] = row
+        return row
+
+    def relation_masks(self, field, build):
+        """Per-scheme relation bitsets for one field: build(eligibilities) on first use"""
+        masks = self._relation_masks.get(field)
+        if masks is None:
+            masks = self._relation_masks[field] = build(self.eligibilities)
+        return masks
+
+    def __getstate__(self):
+        """Picklable state (e.g. for shared batch catalogs): programs are closures"""
+        state = self.__dict__.copy()
+        state['_programs'] = {}
+        return state
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<ScoringColumns: {self.size} schemes, {len(self._credit_rows)} cached rows>"
+
+
 class ScoringEngine:
     """
     Enhanced Scoring Engine with gradient scoring,
@@ -229,6 +788,14 @@ class ScoringEngine:
         self._score_distribution = defaultdict(int)
         self._field_match_rates = defaultdict(lambda: {'matched': 0, 'total': 0})
 
+        # Compiled field scorer memo [hits, misses]
+        self._fragment_stats = [0, 0]
+
+        # Batched analytics from calculate_score (folded in by _flush_analytics)
+        self._pending_matched = [0] * len(self.RATE_FIELDS)
+        self._pending_total = [0] * len(self.RATE_FIELDS)
+        self._pending_scores = [0] * 101
+
         logger.info(
             f"✅ ScoringEngine initialized "
             f"(profile: {weight_profile}, gradient: {enable_gradient})"
@@ -242,9 +809,17 @@ class ScoringEngine:
         """
         Calculate match score (0-100) between user and scheme.
         Backward compatible - returns just the score integer.
+
+        Runs the same field scorers as calculate_detailed_score into a
+        ScoreTally, so no detail strings or notes are kept; the score is
+        identical to the breakdown's final_score.
         """
-        breakdown = self.calculate_detailed_score(user, eligibility)
-        return breakdown.final_score
+        start_time = time.time()
+        self._scores_calculated += 1
+        final = self._build_breakdown(user, eligibility, ScoreTally()).final_score
+        self._total_time_ms += (time.time() - start_time) * 1000
+        self._pending_scores[final] += 1
+        return final
 
     def calculate_detailed_score(self, user, eligibility):
         """
@@ -254,8 +829,26 @@ class ScoringEngine:
         start_time = time.time()
         self._scores_calculated += 1
 
-        breakdown = ScoreBreakdown()
-        breakdown.strategy = self.profile_name
+        breakdown = self._build_breakdown(user, eligibility)
+        final = breakdown.final_score
+
+        # Track analytics
+        elapsed = (time.time() - start_time) * 1000
+        self._total_time_ms += elapsed
+
+        bucket = (final // 10) * 10
+        self._score_distribution[f"{bucket}-{bucket + 9}"] += 1
+
+        return breakdown
+
+    def _build_breakdown(self, user, eligibility, breakdown=None):
+        """
+        Every field score, bonus and penalty (field match rates are tracked here).
+        Pass a ScoreTally as `breakdown` to keep only the numbers.
+        """
+        if breakdown is None:
+            breakdown = ScoreBreakdown()
+            breakdown.strategy = self.profile_name
 
         # Score each dimension
         self._score_age(user, eligibility, breakdown)
@@ -273,17 +866,13 @@ class ScoringEngine:
         self._apply_penalties(user, eligibility, breakdown)
 
         # Calculate final
-        final = breakdown.calculate_final()
-
-        # Track analytics
-        elapsed = (time.time() - start_time) * 1000
-        self._total_time_ms += elapsed
-
-        bucket = (final // 10) * 10
-        self._score_distribution[f"{bucket}-{bucket + 9}"] += 1
-
+        breakdown.calculate_final()
         return breakdown
 
+    # Slot order of the batched field match rate counters
+    RATE_FIELDS = ('age', 'gender', 'state', 'category', 'income', 'occupation') + ScoringColumns.FLAGS
+    RATE_SLOTS = {field: slot for slot, field in enumerate(RATE_FIELDS)}
+
     # ──────────────────────────────────────────────
     # INDIVIDUAL FIELD SCORERS
     # ──────────────────────────────────────────────
@@ -294,7 +883,7 @@ class ScoringEngine:
         max_age = elig.get('max_age')
 
         if min_age is None and max_age is None:
-            breakdown.add_field('age', 0, 0, "No age requirement", gradient=1.0)
+            breakdown.add_field('age', 0, 0, ScoreBreakdown.AGE_NONE, gradient=1.0)
             return
 
         user_age = self._safe_int(user.get('age', 0))
@@ -307,7 +896,7 @@ class ScoringEngine:
         if user_age <= 0:
             breakdown.add_field(
                 'age', 0, weight,
-                "User age not provided",
+                ScoreBreakdown.AGE_MISSING,
                 gradient=0
             )
             return
@@ -333,22 +922,20 @@ class ScoringEngine:
                     earned = weight * gradient
                     breakdown.add_field(
                         'age', earned, weight,
-                        f"Age {user_age} in range {min_age}-{max_age} "
-                        f"(optimality: {gradient:.0%})",
-                        gradient=gradient
+                        ScoreBreakdown.AGE_OPTIMAL,
+                        gradient=gradient, args=(user_age, min_age, max_age, gradient)
                     )
                 else:
                     breakdown.add_field(
                         'age', weight, weight,
-                        f"Age {user_age} matches exact requirement {min_age}",
-                        gradient=1.0
+                        ScoreBreakdown.AGE_EXACT,
+                        gradient=1.0, args=(user_age, min_age)
                     )
             else:
-                age_str = f"{min_age or '?'}-{max_age or '?'}"
                 breakdown.add_field(
                     'age', weight, weight,
-                    f"Age {user_age} within range ({age_str})",
-                    gradient=1.0
+                    ScoreBreakdown.AGE_WITHIN,
+                    gradient=1.0, args=(user_age, min_age, max_age)
                 )
         else:
             # Not in range - check how close (gradient scoring)
@@ -365,19 +952,17 @@ class ScoringEngine:
                     earned = weight * gradient
                     breakdown.add_field(
                         'age', earned, weight,
-                        f"Age {user_age} is {distance} years outside range "
-                        f"(partial credit: {gradient:.0%})",
-                        gradient=gradient
+                        ScoreBreakdown.AGE_NEAR,
+                        gradient=gradient, args=(user_age, distance, gradient)
                     )
                     if earned > 0:
                         self._field_match_rates['age']['matched'] += 1
                     return
 
-            age_str = f"{min_age or '?'}-{max_age or '?'}"
             breakdown.add_field(
                 'age', 0, weight,
-                f"Age {user_age} outside range ({age_str})",
-                gradient=0
+                ScoreBreakdown.AGE_OUTSIDE,
+                gradient=0, args=(user_age, min_age, max_age)
             )
 
     def _score_gender(self, user, elig, breakdown):
@@ -387,7 +972,7 @@ class ScoringEngine:
         if gender_req == 'all':
             breakdown.add_field(
                 'gender', 0, 0,
-                "Open to all genders",
+                ScoreBreakdown.GENDER_ALL,
                 gradient=1.0
             )
             return
@@ -400,7 +985,7 @@ class ScoringEngine:
         if not user_gender:
             breakdown.add_field(
                 'gender', 0, weight,
-                "User gender not provided",
+                ScoreBreakdown.GENDER_MISSING,
                 gradient=0
             )
             return
@@ -409,14 +994,14 @@ class ScoringEngine:
             self._field_match_rates['gender']['matched'] += 1
             breakdown.add_field(
                 'gender', weight, weight,
-                f"Gender '{user_gender}' matches requirement '{gender_req}'",
-                gradient=1.0
+                ScoreBreakdown.GENDER_MATCH,
+                gradient=1.0, args=(user_gender, gender_req)
             )
         else:
             breakdown.add_field(
                 'gender', 0, weight,
-                f"Gender '{user_gender}' doesn't match '{gender_req}'",
-                gradient=0
+                ScoreBreakdown.GENDER_MISMATCH,
+                gradient=0, args=(user_gender, gender_req)
             )
 
     def _score_state(self, user, elig, breakdown):
@@ -431,7 +1016,7 @@ class ScoringEngine:
             self._field_match_rates['state']['matched'] += 1
             breakdown.add_field(
                 'state', weight, weight,
-                "Available across all states",
+                ScoreBreakdown.STATE_ALL,
                 gradient=1.0
             )
             return
@@ -439,7 +1024,7 @@ class ScoringEngine:
         if not user_state:
             breakdown.add_field(
                 'state', 0, weight,
-                "User state not provided",
+                ScoreBreakdown.STATE_MISSING,
                 gradient=0
             )
             return
@@ -450,8 +1035,8 @@ class ScoringEngine:
             self._field_match_rates['state']['matched'] += 1
             breakdown.add_field(
                 'state', weight, weight,
-                f"State '{user_state}' is eligible",
-                gradient=1.0
+                ScoreBreakdown.STATE_MATCH,
+                gradient=1.0, args=(user_state,)
             )
         else:
             # Gradient: check neighboring states (regional proximity)
@@ -461,18 +1046,16 @@ class ScoringEngine:
                     earned = weight * proximity_score
                     breakdown.add_field(
                         'state', earned, weight,
-                        f"State '{user_state}' not listed but "
-                        f"neighboring state is eligible (proximity: {proximity_score:.0%})",
-                        gradient=proximity_score
+                        ScoreBreakdown.STATE_NEAR,
+                        gradient=proximity_score, args=(user_state, proximity_score)
                     )
                     return
 
+            self._check_listed_states(eligible_states)
             breakdown.add_field(
                 'state', 0, weight,
-                f"State '{user_state}' not in eligible list: "
-                f"{', '.join(eligible_states[:5])}"
-                f"{'...' if len(eligible_states) > 5 else ''}",
-                gradient=0
+                ScoreBreakdown.STATE_MISMATCH,
+                gradient=0, args=(user_state, eligible_states)
             )
 
     def _score_category(self, user, elig, breakdown):
@@ -482,7 +1065,7 @@ class ScoringEngine:
         if not categories:
             breakdown.add_field(
                 'category', 0, 0,
-                "No category restriction",
+                ScoreBreakdown.CATEGORY_NONE,
                 gradient=1.0
             )
             return
@@ -495,7 +1078,7 @@ class ScoringEngine:
         if not user_cat:
             breakdown.add_field(
                 'category', 0, weight,
-                "User category not provided",
+                ScoreBreakdown.CATEGORY_MISSING,
                 gradient=0
             )
             return
@@ -506,8 +1089,8 @@ class ScoringEngine:
             self._field_match_rates['category']['matched'] += 1
             breakdown.add_field(
                 'category', weight, weight,
-                f"Category '{user_cat.upper()}' is eligible",
-                gradient=1.0
+                ScoreBreakdown.CATEGORY_MATCH,
+                gradient=1.0, args=(user_cat,)
             )
         else:
             # Gradient: related categories get partial credit
@@ -517,17 +1100,15 @@ class ScoringEngine:
                     earned = weight * related_score
                     breakdown.add_field(
                         'category', earned, weight,
-                        f"Category '{user_cat.upper()}' not listed but "
-                        f"related category is eligible (relation: {related_score:.0%})",
-                        gradient=related_score
+                        ScoreBreakdown.CATEGORY_RELATED,
+                        gradient=related_score, args=(user_cat, related_score)
                     )
                     return
 
             breakdown.add_field(
                 'category', 0, weight,
-                f"Category '{user_cat.upper()}' not in "
-                f"{[c.upper() for c in eligible_cats]}",
-                gradient=0
+                ScoreBreakdown.CATEGORY_MISMATCH,
+                gradient=0, args=(user_cat, eligible_cats)
             )
 
     def _score_income(self, user, elig, breakdown):
@@ -537,7 +1118,7 @@ class ScoringEngine:
         if max_income is None:
             breakdown.add_field(
                 'income', 0, 0,
-                "No income restriction",
+                ScoreBreakdown.INCOME_NONE,
                 gradient=1.0
             )
             return
@@ -550,7 +1131,7 @@ class ScoringEngine:
         if user_income <= 0:
             breakdown.add_field(
                 'income', 0, weight,
-                "User income not provided",
+                ScoreBreakdown.INCOME_MISSING,
                 gradient=0
             )
             return
@@ -563,26 +1144,22 @@ class ScoringEngine:
                 ratio = user_income / max_income
                 if ratio <= 0.5:
                     gradient = 1.0  # Well within limit
-                    note = "well within"
                 elif ratio <= 0.8:
                     gradient = 0.95
-                    note = "comfortably within"
                 else:
                     gradient = 0.85
-                    note = "close to"
 
                 earned = weight * gradient
                 breakdown.add_field(
                     'income', earned, weight,
-                    f"Income ₹{user_income:,} is {note} limit ₹{max_income:,} "
-                    f"({ratio:.0%} of max)",
-                    gradient=gradient
+                    ScoreBreakdown.INCOME_GRADED,
+                    gradient=gradient, args=(user_income, max_income, ratio, gradient)
                 )
             else:
                 breakdown.add_field(
                     'income', weight, weight,
-                    f"Income ₹{user_income:,} within limit ₹{max_income:,}",
-                    gradient=1.0
+                    ScoreBreakdown.INCOME_WITHIN,
+                    gradient=1.0, args=(user_income, max_income)
                 )
         else:
             # Over the limit
@@ -593,16 +1170,15 @@ class ScoringEngine:
                     earned = weight * gradient
                     breakdown.add_field(
                         'income', earned, weight,
-                        f"Income ₹{user_income:,} slightly exceeds limit "
-                        f"₹{max_income:,} by {overshoot:.0%} (marginal credit)",
-                        gradient=gradient
+                        ScoreBreakdown.INCOME_MARGINAL,
+                        gradient=gradient, args=(user_income, max_income, overshoot)
                     )
                     return
 
             breakdown.add_field(
                 'income', 0, weight,
-                f"Income ₹{user_income:,} exceeds limit ₹{max_income:,}",
-                gradient=0
+                ScoreBreakdown.INCOME_OVER,
+                gradient=0, args=(user_income, max_income)
             )
 
     def _score_occupation(self, user, elig, breakdown):
@@ -612,7 +1188,7 @@ class ScoringEngine:
         if not occupations:
             breakdown.add_field(
                 'occupation', 0, 0,
-                "No occupation restriction",
+                ScoreBreakdown.OCCUPATION_NONE,
                 gradient=1.0
             )
             return
@@ -625,7 +1201,7 @@ class ScoringEngine:
         if not user_occ:
             breakdown.add_field(
                 'occupation', 0, weight,
-                "User occupation not provided",
+                ScoreBreakdown.OCCUPATION_MISSING,
                 gradient=0
             )
             return
@@ -636,8 +1212,8 @@ class ScoringEngine:
             self._field_match_rates['occupation']['matched'] += 1
             breakdown.add_field(
                 'occupation', weight, weight,
-                f"Occupation '{user_occ}' matches",
-                gradient=1.0
+                ScoreBreakdown.OCCUPATION_MATCH,
+                gradient=1.0, args=(user_occ,)
             )
         else:
             # Gradient: check related occupations
@@ -647,36 +1223,26 @@ class ScoringEngine:
                     earned = weight * related_score
                     breakdown.add_field(
                         'occupation', earned, weight,
-                        f"Occupation '{user_occ}' related to "
-                        f"eligible: {[o.title() for o in eligible_occs]} "
-                        f"(relation: {related_score:.0%})",
-                        gradient=related_score
+                        ScoreBreakdown.OCCUPATION_RELATED,
+                        gradient=related_score, args=(user_occ, eligible_occs, related_score)
                     )
                     return
 
             breakdown.add_field(
                 'occupation', 0, weight,
-                f"Occupation '{user_occ}' not in "
-                f"{[o.title() for o in eligible_occs]}",
-                gradient=0
+                ScoreBreakdown.OCCUPATION_MISMATCH,
+                gradient=0, args=(user_occ, eligible_occs)
             )
 
     def _score_special_flags(self, user, elig, breakdown):
         """Score special boolean flags (BPL, farmer, student, disability)"""
         weight = self.WEIGHTS['special']
 
-        flags = [
-            ('is_bpl', 'BPL Status'),
-            ('is_farmer', 'Farmer Status'),
-            ('is_student', 'Student Status'),
-            ('disability', 'Disability Status')
-        ]
-
         total_flag_score = 0
         total_flag_applicable = 0
-        flag_details = []
+        flag_checks = []
 
-        for flag_key, flag_label in flags:
+        for flag_key in ScoringColumns.FLAGS:
             elig_value = elig.get(flag_key)
 
             if elig_value is None:
@@ -690,31 +1256,26 @@ class ScoringEngine:
 
             self._field_match_rates[flag_key]['total'] += 1
 
-            if user_value == elig_value:
+            matched = user_value == elig_value
+            if matched:
                 total_flag_score += weight
                 self._field_match_rates[flag_key]['matched'] += 1
-                flag_details.append(f"✅ {flag_label}: matches (you: {user_value})")
-            else:
-                flag_details.append(
-                    f"❌ {flag_label}: mismatch "
-                    f"(you: {user_value}, required: {elig_value})"
-                )
+            flag_checks.append((flag_key, user_value, elig_value, matched))
 
         if total_flag_applicable == 0:
             breakdown.add_field(
                 'special_flags', 0, 0,
-                "No special flag requirements",
+                ScoreBreakdown.FLAGS_NONE,
                 gradient=1.0
             )
             return
 
         gradient = total_flag_score / total_flag_applicable if total_flag_applicable > 0 else 0
-        detail = " | ".join(flag_details)
 
         breakdown.add_field(
             'special_flags', total_flag_score, total_flag_applicable,
-            detail,
-            gradient=gradient
+            ScoreBreakdown.FLAGS_CHECKED,
+            gradient=gradient, args=(flag_checks,)
         )
 
     # ──────────────────────────────────────────────
@@ -725,17 +1286,12 @@ class ScoringEngine:
         """Apply contextual bonuses based on user-scheme alignment"""
 
         # Bonus: all applicable fields matched
-        applicable_fields = sum(
-            1 for f in breakdown.field_scores.values() if f['applicable'] > 0
-        )
-        matched_fields = sum(
-            1 for f in breakdown.field_scores.values()
-            if f['applicable'] > 0 and f['gradient'] >= 0.8
-        )
+        applicable_fields = breakdown.fields_applicable()
+        matched_fields = breakdown.fields_matched()
         if applicable_fields >= 3 and matched_fields == applicable_fields:
             breakdown.add_bonus(
                 'perfect_alignment', 3,
-                f"All {applicable_fields} criteria matched perfectly"
+                ScoreBreakdown.BONUS_ALIGNMENT, args=(applicable_fields,)
             )
 
         # Bonus: vulnerable group priority
@@ -746,19 +1302,19 @@ class ScoringEngine:
         if user_bpl and user_disability:
             breakdown.add_bonus(
                 'vulnerable_priority', 3,
-                "BPL + disability: priority applicant"
+                ScoreBreakdown.BONUS_VULNERABLE
             )
         elif user_bpl:
             breakdown.add_bonus(
                 'bpl_priority', 1,
-                "BPL applicant priority"
+                ScoreBreakdown.BONUS_BPL
             )
 
         # Bonus: senior citizen
         if user_age >= 60:
             breakdown.add_bonus(
                 'senior_citizen', 1,
-                f"Senior citizen (age {user_age})"
+                ScoreBreakdown.BONUS_SENIOR, args=(user_age,)
             )
 
         # Bonus: scheme targets user's exact demographic
@@ -768,7 +1324,7 @@ class ScoringEngine:
             if user_cat in [c.lower() for c in elig_cats]:
                 breakdown.add_bonus(
                     'targeted_scheme', 2,
-                    f"Scheme specifically targets {user_cat.upper()} category"
+                    ScoreBreakdown.BONUS_TARGETED, args=(user_cat,)
                 )
 
     def _apply_penalties(self, user, elig, breakdown):
@@ -785,11 +1341,9 @@ class ScoringEngine:
         if provided_fields <= 2:
             breakdown.add_penalty(
                 'sparse_profile', 3,
-                f"Only {provided_fields}/{len(key_fields)} key fields provided"
-            )
-            breakdown.add_note(
-                "⚠️ Score accuracy limited due to incomplete profile"
+                ScoreBreakdown.PENALTY_SPARSE, args=(provided_fields, len(key_fields))
             )
+            breakdown.add_note(ScoreBreakdown.NOTE_SPARSE)
 
         # Penalty: age at boundary (within 1 year of limit)
         user_age = self._safe_int(user.get('age', 0))
@@ -797,15 +1351,9 @@ class ScoringEngine:
         max_age = elig.get('max_age')
 
         if min_age is not None and user_age == min_age:
-            breakdown.add_note(
-                f"📌 You are at the minimum age limit ({min_age}). "
-                f"Verify exact date of birth eligibility."
-            )
+            breakdown.add_note(ScoreBreakdown.NOTE_MIN_AGE, args=(min_age,))
         if max_age is not None and user_age == max_age:
-            breakdown.add_note(
-                f"📌 You are at the maximum age limit ({max_age}). "
-                f"Apply soon before age cutoff."
-            )
+            breakdown.add_note(ScoreBreakdown.NOTE_MAX_AGE, args=(max_age,))
 
     # ──────────────────────────────────────────────
     # GRADIENT HELPERS
@@ -852,14 +1400,36 @@ class ScoringEngine:
         'Arunachal Pradesh': ['Assam', 'Nagaland'],
     }
 
+    # Bitset and frozenset forms of the map (rebuild them alongside STATE_NEIGHBORS)
+    STATE_RELATIONS = RelationTable(STATE_NEIGHBORS)
+    STATE_NEIGHBOR_SETS = STATE_RELATIONS.relative_sets
+
     def _check_state_proximity(self, user_state, eligible_states):
         """Check if user's state is a neighbor of any eligible state"""
-        neighbors = self.STATE_NEIGHBORS.get(user_state, [])
-        for neighbor in neighbors:
-            if neighbor in eligible_states:
-                return 0.2  # 20% partial credit for neighboring state
+        neighbors = self.STATE_NEIGHBOR_SETS.get(user_state)
+        try:
+            if neighbors and not neighbors.isdisjoint(eligible_states):
+                return self.RELATION_CREDIT['state']
+        except TypeError:
+            if self._scan_related(neighbors, eligible_states):
+                return self.RELATION_CREDIT['state']
         return 0
 
+    @staticmethod
+    def _scan_related(relatives, values):
+        """Relative lookup for lists with unhashable entries (compared one by one)"""
+        return any(relative in values for relative in relatives)
+
+    @staticmethod
+    def _check_listed_states(eligible_states):
+        """
+        The state mismatch detail joins the first five eligible states:
+        reject malformed lists while scoring, not when the text renders
+        """
+        for listed in eligible_states[:5]:
+            if not isinstance(listed, str):
+                raise TypeError(f"eligible state {listed!r} is not a string")
+
     # Related category mappings
     RELATED_CATEGORIES = {
         'sc': ['st', 'obc'],
@@ -869,12 +1439,18 @@ class ScoringEngine:
         'minority': ['obc']
     }
 
+    CATEGORY_RELATIONS = RelationTable(RELATED_CATEGORIES)
+    RELATED_CATEGORY_SETS = CATEGORY_RELATIONS.relative_sets
+
     def _check_category_relation(self, user_cat, eligible_cats):
         """Check if user's category is related to any eligible category"""
-        related = self.RELATED_CATEGORIES.get(user_cat, [])
-        for rel_cat in related:
-            if rel_cat in eligible_cats:
-                return 0.15  # 15% partial credit for related category
+        related = self.RELATED_CATEGORY_SETS.get(user_cat)
+        try:
+            if related and not related.isdisjoint(eligible_cats):
+                return self.RELATION_CREDIT['category']
+        except TypeError:
+            if self._scan_related(related, eligible_cats):
+                return self.RELATION_CREDIT['category']
         return 0
 
     # Related occupation mappings
@@ -890,19 +1466,34 @@ class ScoringEngine:
         'artisan': ['craftsman', 'weaver', 'potter', 'handicraft'],
     }
 
+    # Symmetric: a key and each of its aliases relate in both directions
+    OCCUPATION_RELATIONS = RelationTable(RELATED_OCCUPATIONS, symmetric=True)
+    RELATED_OCCUPATION_SETS = OCCUPATION_RELATIONS.relative_sets
+
+    # Relation tables of the categorical fields that award relation credit
+    RELATION_TABLES = {
+        'state': STATE_RELATIONS,
+        'category': CATEGORY_RELATIONS,
+        'occupation': OCCUPATION_RELATIONS,
+    }
+
+    # Partial credit for a related value
+    RELATION_CREDIT = {
+        'state': 0.2,        # 20% for a neighboring state
+        'category': 0.15,    # 15% for a related category
+        'occupation': 0.5,   # 50% for a closely related occupation
+    }
+
     def _check_occupation_relation(self, user_occ, eligible_occs):
         """Check if user's occupation is related to any eligible occupation"""
-        # Direct alias check
-        related = self.RELATED_OCCUPATIONS.get(user_occ, [])
-        for rel_occ in related:
-            if rel_occ in eligible_occs:
-                return 0.5  # 50% credit for closely related occupation
-
-        # Reverse check
-        for elig_occ in eligible_occs:
-            related = self.RELATED_OCCUPATIONS.get(elig_occ, [])
-            if user_occ in related:
-                return 0.5
+        # Direct or reverse alias (the relation table is symmetric)
+        related = self.RELATED_OCCUPATION_SETS.get(user_occ)
+        try:
+            if related and not related.isdisjoint(eligible_occs):
+                return self.RELATION_CREDIT['occupation']
+        except TypeError:
+            if self._scan_related(related, eligible_occs):
+                return self.RELATION_CREDIT['occupation']
 
         # Partial word match
         for elig_occ in eligible_occs:
@@ -1009,12 +1600,984 @@ class ScoringEngine:
         # Currently stateless per call, but future-proofs
         pass
 
+    # ──────────────────────────────────────────────
+    # VECTORIZED SCORING
+    # ──────────────────────────────────────────────
+
+    def compile_columns(self, schemes):
+        """Compile a scheme list into ScoringColumns for score_profiles()"""
+        return ScoringColumns(schemes)
+
+    def score_profiles(self, profiles, columns):
+        """
+        Vectorized calculate_score for many profiles against a compiled catalog.
+        Every gradient, bonus and penalty is evaluated as array operations in
+        the same float order as the scalar path, so results are bit-identical.
+
+        Returns:
+            int64 matrix (profiles × schemes)
+        """
+        users = self.encode_profiles(profiles)
+        gradients = self.field_gradients(users, columns)
+        scores = self.combine_gradients(users, gradients, columns)
+        self._scores_calculated += scores.size
+        return scores
+
+    def score_matrix(self, users, schemes):
+        """
+        calculate_score for every (user, scheme) pair as one int matrix.
+
+        Args:
+            users: list of profile dicts (a single dict is scored as one row)
+            schemes: list of scheme dicts (each with an 'eligibility' dict), or
+                     ScoringColumns already compiled with compile_columns()
+
+        Returns:
+            int64 matrix (users × schemes); matrix[u, s] ==
+            calculate_score(users[u], schemes[s]['eligibility'])
+        """
+        if isinstance(users, dict):
+            users = [users]
+        columns = schemes if isinstance(schemes, ScoringColumns) else self.compile_columns(schemes)
+        if not users or not columns.size:
+            return np.zeros((len(users), columns.size), dtype=np.int64)
+        return self.score_profiles(users, columns)
+
+    def score_upper_bounds(self, user, columns):
+        """
+        Cheap per-scheme ceiling on calculate_score(user, ...) for one profile.
+
+        Age, income and categorical gradients are exact (categorical credit
+        rows are cached per value); special flags are assumed fully matched
+        and bonuses counted at their best case, so only those add slack.
+
+        Returns:
+            int64 array over schemes, never below the true score
+        """
+        weights = self.WEIGHTS
+        age = self._safe_int(user.get('age', 0))
+        income = self._safe_int(user.get('annual_income', 0))
+
+        earned = np.zeros(columns.size)
+        applicable = np.zeros(columns.size)
+        all_matched = np.ones(columns.size, dtype=bool)
+
+        numeric = {
+            'age': self._age_gradients(np.array([[float(age)]]), columns)[0],
+            'income': self._income_gradients(np.array([[float(income)]]), columns)[0],
+        }
+        categorical = {
+            'gender': user.get('gender', '').lower().strip(),
+            'state': user.get('state', '').strip(),
+            'category': user.get('category', '').lower().strip(),
+            'occupation': user.get('occupation', '').lower().strip(),
+        }
+        for field in ScoringColumns.FIELDS:
+            if field == 'special_flags':
+                sums = self._flag_weight_sums()
+                earned += sums[columns.flag_count]
+                applicable += sums[columns.flag_count]
+                continue
+
+            requires = columns.requires[field]
+            if field in numeric:
+                gradient = numeric[field]
+            else:
+                gradient = self._gather_rows(columns, field, [categorical[field]])[0]
+            earned += np.where(requires, weights[field] * gradient, 0)
+            applicable += np.where(requires, weights[field], 0)
+            all_matched &= ~requires | (gradient >= 0.795)
+
+        user_bpl = self._parse_bool(user.get('is_bpl', False))
+        user_disability = self._parse_bool(user.get('disability', False))
+        bonus = np.where(all_matched, 3, 0)
+        bonus = bonus + (3 if user_bpl and user_disability else 1 if user_bpl else 0)
+        bonus = bonus + (1 if age >= 60 else 0)
+        bonus = bonus + np.where(
+            self._gather_rows(columns, 'targeted', [user.get('category', '').lower()])[0] > 0, 2, 0
+        )
+        key_fields = ['age', 'gender', 'state', 'category', 'annual_income', 'occupation']
+        provided = sum(
+            1 for field in key_fields
+            if user.get(field) is not None and user.get(field) != '' and user.get(field) != 0
+        )
+        penalty = 3 if provided <= 2 else 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Small slack so float summation order can never push a true score above its bound
+            ceiling = (earned / applicable) * 100 + 1e-6 + bonus - penalty
+        ceiling = np.clip(np.trunc(np.nan_to_num(ceiling)), 0, 100).astype(np.int64)
+        return np.where(applicable == 0, 50, ceiling)
+
+    def encode_profiles(self, profiles):
+        """Normalize profiles once into the columns the field scorers read"""
+        count = len(profiles)
+        users = {
+            'age': np.empty(count),
+            'income': np.empty(count),
+            'gender': [],
+            'state': [],
+            'category': [],
+            'category_raw': [],
+            'occupation': [],
+            'flags': np.empty((len(ScoringColumns.FLAGS), count), dtype=np.int8),
+            'bpl': np.empty(count, dtype=bool),
+            'disability': np.empty(count, dtype=bool),
+            'provided': np.empty(count, dtype=np.int64),
+        }
+        key_fields = ['age', 'gender', 'state', 'category', 'annual_income', 'occupation']
+
+        for u, user in enumerate(profiles):
+            users['age'][u] = self._safe_int(user.get('age', 0))
+            users['income'][u] = self._safe_int(user.get('annual_income', 0))
+            users['gender'].append(user.get('gender', '').lower().strip())
+            users['state'].append(user.get('state', '').strip())
+            users['category'].append(user.get('category', '').lower().strip())
+            users['category_raw'].append(user.get('category', '').lower())
+            users['occupation'].append(user.get('occupation', '').lower().strip())
+
+            for f, flag_key in enumerate(ScoringColumns.FLAGS):
+                value = user.get(flag_key, False)
+                if isinstance(value, str):
+                    value = value.lower() in ('true', '1', 'yes')
+                if value == True:  # noqa: E712 - mirrors the == in _score_special_flags
+                    users['flags'][f, u] = 1
+                elif value == False:  # noqa: E712
+                    users['flags'][f, u] = 0
+                else:
+                    users['flags'][f, u] = ScoringColumns.FLAG_NONE
+
+            users['bpl'][u] = self._parse_bool(user.get('is_bpl', False))
+            users['disability'][u] = self._parse_bool(user.get('disability', False))
+            users['provided'][u] = sum(
+                1 for field in key_fields
+                if user.get(field) is not None and user.get(field) != '' and user.get(field) != 0
+            )
+
+        return users
+
+    def encode_columns(self, columns):
+        """
+        encode_profiles for an already columnar population: int arrays for
+        'age' / 'annual_income', CategoricalColumn for 'gender', 'state',
+        'category' and 'occupation', bool arrays for the flags and the
+        number of key fields provided as 'provided'. Normalization runs once
+        per distinct categorical value.
+        """
+        flags = np.empty((len(ScoringColumns.FLAGS), len(columns['age'])), dtype=np.int8)
+        for f, flag_key in enumerate(ScoringColumns.FLAGS):
+            flags[f] = columns[flag_key]
+        return {
+            'age': np.asarray(columns['age'], dtype=float),
+            'income': np.asarray(columns['annual_income'], dtype=float),
+            'gender': columns['gender'].map(lambda value: value.lower().strip()),
+            'state': columns['state'].map(str.strip),
+            'category': columns['category'].map(lambda value: value.lower().strip()),
+            'category_raw': columns['category'].map(str.lower),
+            'occupation': columns['occupation'].map(lambda value: value.lower().strip()),
+            'flags': flags,
+            'bpl': np.asarray(columns['is_bpl'], dtype=bool),
+            'disability': np.asarray(columns['disability'], dtype=bool),
+            'provided': np.asarray(columns['provided'], dtype=np.int64),
+        }
+
+    def field_gradients(self, users, columns):
+        """
+        Per-field gradient matrices (profiles × schemes).
+        Non-applicable fields carry gradient 1.0, exactly like the scalar scorers.
+        """
+        return {field: self.field_gradient(field, users, columns) for field in ScoringColumns.FIELDS}
+
+    def field_gradient(self, field, users, columns):
+        """One field's gradient matrix, e.g. when only that profile field changed"""
+        if field == 'age':
+            # Ages take few distinct values: score each once, then gather rows
+            ages, age_index = np.unique(users['age'], return_inverse=True)
+            return self._age_gradients(ages[:, None], columns)[age_index.reshape(-1)]
+        if field == 'income':
+            return self._income_gradients(users['income'][:, None], columns)
+        if field == 'special_flags':
+            return self._flag_gradients(users['flags'], columns)
+        return self._gather_rows(columns, field, users[field])
+
+    def combine_gradients(self, users, gradients, columns):
+        """Turn per-field gradients into final scores (earned/applicable + bonuses - penalties)"""
+        shape = (len(users['age']), columns.size)
+        total_earned = np.zeros(shape)
+        total_applicable = np.zeros(columns.size)
+        applicable_fields = np.zeros(columns.size, dtype=np.int64)
+        matched_fields = np.zeros(shape, dtype=np.int8)
+        matched = np.empty(shape, dtype=bool)
+
+        for field in ScoringColumns.FIELDS:
+            earned, applicable, counted = self._field_weights(field, users, gradients[field], columns)
+            total_earned += earned
+            total_applicable = total_applicable + applicable
+            applicable_fields += counted
+            np.greater_equal(gradients[field], 0.795, out=matched)
+            matched &= counted
+            matched_fields += matched
+
+        return self._finish_scores(
+            users, total_earned, total_applicable, applicable_fields, matched_fields, columns
+        )
+
+    def field_contribution(self, field, users, gradient, columns):
+        """
+        One field's share of combine_gradients: (earned, applicable, counted,
+        matched), so callers that keep per-field state can re-combine
+        without recomputing unchanged fields (see combine_contributions)
+        """
+        earned, applicable, counted = self._field_weights(field, users, gradient, columns)
+        return earned, applicable, counted, counted & (gradient >= 0.795)
+
+    def combine_contributions(self, users, contributions, columns):
+        """combine_gradients from per-field field_contribution() tuples"""
+        shape = (len(users['age']), columns.size)
+        total_earned = np.zeros(shape)
+        total_applicable = np.zeros(columns.size)
+        applicable_fields = np.zeros(columns.size, dtype=np.int64)
+        matched_fields = np.zeros(shape, dtype=np.int8)
+
+        # Summed in field order, like combine_gradients, so floats round identically
+        for field in ScoringColumns.FIELDS:
+            earned, applicable, counted, matched = contributions[field]
+            total_earned += earned
+            total_applicable = total_applicable + applicable
+            applicable_fields += counted
+            matched_fields += matched
+
+        return self._finish_scores(
+            users, total_earned, total_applicable, applicable_fields, matched_fields, columns
+        )
+
+    def _field_weights(self, field, users, gradient, columns):
+        """Earned and applicable weight for one field, and whether it counts toward the all-matched bonus"""
+        if field == 'special_flags':
+            earned, applicable = self._flag_earned(users['flags'], columns)
+        else:
+            # Gradients are finite, so scaling by a 0/weight row is exact
+            applicable = np.where(columns.requires[field], self.WEIGHTS[field], 0)
+            earned = gradient * applicable
+
+        # Same test as _apply_bonuses on the rounded breakdown values:
+        # round(applicable, 2) > 0 and round(gradient, 2) >= 0.8
+        return earned, applicable, np.round(applicable, 2) > 0
+
+    def _finish_scores(self, users, total_earned, total_applicable, applicable_fields,
+                       matched_fields, columns):
+        """Bonuses, penalties, normalization and capping over the summed field weights"""
+        # Per-profile bonuses are whole numbers, so summing them first is exact
+        bpl = users['bpl']
+        profile_bonus = np.where(bpl & users['disability'], 3, np.where(bpl, 1, 0))
+        profile_bonus += users['age'] >= 60
+        bonus = np.where(
+            (applicable_fields >= 3) & (matched_fields == applicable_fields), 3, 0
+        )
+        bonus += profile_bonus[:, None]
+        bonus += np.where(
+            self._gather_rows(columns, 'targeted', users['category_raw']) > 0, 2, 0
+        )
+        penalty = np.where(users['provided'][:, None] <= 2, 3, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            base = (total_earned / total_applicable) * 100
+            adjusted = base + bonus - penalty
+        final = np.clip(np.trunc(np.nan_to_num(adjusted)), 0, 100).astype(np.int64)
+        return np.where(total_applicable == 0, 50, final)
+
+    def _age_gradients(self, age, columns):
+        """Vectorized _score_age gradient"""
+        lo, hi = columns.min_age, columns.max_age
+        has_lo, has_hi = ~np.isnan(lo), ~np.isnan(hi)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = has_lo & (age < lo)
+            above = has_hi & (age > hi)
+            in_range = ~(below | above)
+
+            if self.enable_gradient:
+                span = hi - lo
+                two_sided = has_lo & has_hi & (span > 0)
+                distance = np.abs(age - (lo + hi) / 2) / (span / 2)
+                inside = np.where(two_sided, np.maximum(0.8, 1.0 - (distance * 0.2)), 1.0)
+
+                outside_by = np.where(below, lo - age, np.where(above, age - hi, 0))
+                partial = np.maximum(0, 1.0 - (outside_by / 5) * 0.8)
+                outside = np.where(outside_by <= 5, partial, 0.0)
+                gradient = np.where(in_range, inside, outside)
+            else:
+                gradient = np.where(in_range, 1.0, 0.0)
+
+        gradient = np.where(age <= 0, 0.0, gradient)
+        return np.where(columns.requires['age'], gradient, 1.0)
+
+    def _income_gradients(self, income, columns):
+        """Vectorized _score_income gradient"""
+        limit = columns.max_income
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            within = income <= limit
+            if self.enable_gradient:
+                ratio = income / limit
+                inside = np.where(
+                    limit > 0,
+                    np.where(ratio <= 0.5, 1.0, np.where(ratio <= 0.8, 0.95, 0.85)),
+                    1.0
+                )
+                overshoot = (income - limit) / limit
+                outside = np.where(overshoot <= 0.1, 0.3, 0.0)
+                gradient = np.where(within, inside, outside)
+            else:
+                gradient = np.where(within, 1.0, 0.0)
+
+        gradient = np.where(income <= 0, 0.0, gradient)
+        return np.where(columns.requires['income'], gradient, 1.0)
+
+    def _flag_matches(self, user_flags, columns):
+        """Number of required special flags each profile matches (profiles × schemes)"""
+        matched = np.zeros((user_flags.shape[1], columns.size), dtype=np.int64)
+        for f in range(len(ScoringColumns.FLAGS)):
+            required = columns.flag_required[f]
+            matched += (required != ScoringColumns.FLAG_NONE) & (
+                user_flags[f][:, None] == required
+            )
+        return matched
+
+    def _flag_gradients(self, user_flags, columns):
+        """Vectorized _score_special_flags gradient (matched / applicable flag weight)"""
+        earned, applicable = self._flag_earned(user_flags, columns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gradient = earned / applicable
+        return np.where(applicable == 0, 1.0, gradient)
+
+    def _flag_earned(self, user_flags, columns):
+        """Earned and applicable special-flag weight, summed like the scalar loop"""
+        sums = self._flag_weight_sums()
+        applicable = sums[columns.flag_count]
+        earned = sums[self._flag_matches(user_flags, columns)]
+        return earned, applicable
+
+    def _flag_weight_sums(self):
+        """Running totals 0, w, w+w, ... accumulated exactly like the scalar loop"""
+        sums = [0]
+        for _ in ScoringColumns.FLAGS:
+            sums.append(sums[-1] + self.WEIGHTS['special'])
+        return np.asarray(sums, dtype=float)
+
+    def _gather_rows(self, columns, field, values):
+        """Factorize a categorical user column and gather its cached credit rows"""
+        if not isinstance(values, CategoricalColumn):
+            values = CategoricalColumn.factorize(values)
+
+        rows = [
+            columns.credit_row(
+                (field, value, self.enable_gradient),
+                lambda value=value: self._credit_row(columns, field, value)
+            )
+            for value in values.values
+        ]
+        if not rows:
+            return np.empty((len(values.codes), columns.size))
+        return values.take(np.vstack(rows))
+
+    def _credit_row(self, columns, field, value):
+        """
+        Per-scheme gradient for one categorical value. Values in a relation
+        table are scored on the columns' eligibility bitsets (member and
+        related are one vectorized AND each); other values, and schemes the
+        bitsets can't decide, go through the scalar helpers.
+        """
+        table = self.RELATION_TABLES.get(field)
+        value_id = table.ids.get(value) if table is not None and value else None
+        if value_id is None:
+            return np.array(
+                [self._categorical_gradient(field, value, elig) for elig in columns.eligibilities],
+                dtype=float
+            )
+
+        bits, listed, undecided = columns.relation_masks(
+            field, partial(self._relation_columns, field)
+        )
+        word = bits.dtype.type
+        member = (bits & word(1 << value_id)) != 0
+        related = (bits & word(table.related(value))) != 0
+        credit = self.RELATION_CREDIT[field] if self.enable_gradient else 0
+        row = np.where(listed & ~member, np.where(related, credit, 0.0), 1.0)
+
+        if field == 'occupation' and self.enable_gradient:
+            # Partial word matches stay a per-scheme substring test
+            undecided = np.union1d(undecided, np.flatnonzero(listed & ~member & ~related))
+        for i in undecided:
+            row[i] = self._categorical_gradient(field, value, columns.eligibilities[i])
+        return row
+
+    @classmethod
+    def _relation_columns(cls, field, eligibilities):
+        """
+        Per-scheme (eligible bitset, criterion listed, undecided indices) for
+        one relation field. Lists normalize as the scalar scorer does; ones it
+        would reject (non-string categories/occupations) stay undecided.
+        """
+        table = cls.RELATION_TABLES[field]
+        masks = []
+        listed = np.zeros(len(eligibilities), dtype=bool)
+        undecided = []
+        for i, elig in enumerate(eligibilities):
+            if field == 'state':
+                states = elig.get('states', 'all')
+                values = None if states == 'all' else states if isinstance(states, list) else [states]
+            else:
+                try:
+                    values = [v.lower() for v in elig.get(field) or ()] or None
+                except (AttributeError, TypeError):
+                    values = ()
+                    undecided.append(i)
+            listed[i] = values is not None
+            masks.append(table.mask(values) if values else 0)
+
+        # One machine word per scheme while the table fits in 64 bits
+        dtype = np.uint64 if len(table) <= 64 else object
+        return np.array(masks, dtype=dtype), listed, np.array(undecided, dtype=np.intp)
+
+    def _categorical_gradient(self, field, value, elig):
+        """Gradient the scalar scorer would assign for one (value, eligibility) pair"""
+        if field == 'gender':
+            gender_req = elig.get('gender', 'all')
+            if gender_req == 'all':
+                return 1.0
+            return 1.0 if value and value == gender_req.lower() else 0
+
+        if field == 'state':
+            states = elig.get('states', 'all')
+            if states == 'all':
+                return 1.0
+            if not value:
+                return 0
+            eligible_states = states if isinstance(states, list) else [states]
+            if value in eligible_states:
+                return 1.0
+            return self._check_state_proximity(value, eligible_states) if self.enable_gradient else 0
+
+        if field == 'category':
+            categories = elig.get('category')
+            if not categories:
+                return 1.0
+            if not value:
+                return 0
+            eligible_cats = [c.lower() for c in categories]
+            if value in eligible_cats:
+                return 1.0
+            return self._check_category_relation(value, eligible_cats) if self.enable_gradient else 0
+
+        if field == 'occupation':
+            occupations = elig.get('occupation')
+            if not occupations:
+                return 1.0
+            if not value:
+                return 0
+            eligible_occs = [o.lower() for o in occupations]
+            if value in eligible_occs:
+                return 1.0
+            return self._check_occupation_relation(value, eligible_occs) if self.enable_gradient else 0
+
+        if field == 'targeted':
+            # 1 when _apply_bonuses would award 'targeted_scheme'
+            elig_cats = elig.get('category', [])
+            if elig_cats and value and len(elig_cats) <= 2:
+                return 1.0 if value in [c.lower() for c in elig_cats] else 0
+            return 0
+
+        raise ValueError(f"Unknown categorical field: {field}")
+
+    # ──────────────────────────────────────────────
+    # COMPILED SCORING
+    # ──────────────────────────────────────────────
+
+    # Score distribution label for every possible final score
+    DISTRIBUTION_LABELS = tuple(f"{s // 10 * 10}-{s // 10 * 10 + 9}" for s in range(101))
+
+    def compile_programs(self, columns):
+        """
+        Per-scheme score programs for a compiled catalog under the current
+        weights. Compiled once per weight setup and cached on `columns`;
+        schemes sharing an eligibility fragment share its (memoized) field
+        scorer through one intern table per weight setup.
+        """
+        key = (tuple(sorted(self.WEIGHTS.items())), self.enable_gradient)
+        return columns.programs(key, partial(
+            self.compile_program,
+            weights=dict(self.WEIGHTS), enable_gradient=self.enable_gradient,
+            fragments={}
+        ))
+
+    def score_facts(self, user):
+        """
+        Normalize a profile once for compiled score programs.
+        Returns: ScoreFacts, or None if a field can't be normalized the way
+        calculate_score reads it (e.g. a non-string gender): score generically
+        """
+        try:
+            gender = user.get('gender', '').lower().strip()
+            state = user.get('state', '').strip()
+            bonus_category = user.get('category', '').lower()
+            occupation = user.get('occupation', '').lower().strip()
+        except AttributeError:
+            return None
+
+        flags = []
+        for flag_key in ScoringColumns.FLAGS:
+            value = user.get(flag_key, False)
+            if isinstance(value, str):
+                value = value.lower() in ('true', '1', 'yes')
+            flags.append(value)
+
+        age = self._safe_int(user.get('age', 0))
+        user_bpl = self._parse_bool(user.get('is_bpl', False))
+        user_disability = self._parse_bool(user.get('disability', False))
+        bonus = 3 if user_bpl and user_disability else 1 if user_bpl else 0
+        if age >= 60:
+            bonus += 1
+
+        provided = sum(
+            1 for field in ('age', 'gender', 'state', 'category', 'annual_income', 'occupation')
+            if user.get(field) is not None and user.get(field) != '' and user.get(field) != 0
+        )
+
+        return ScoreFacts(
+            user=user,
+            age=age,
+            income=self._safe_int(user.get('annual_income', 0)),
+            gender=gender,
+            state=state,
+            category=bonus_category.strip(),
+            occupation=occupation,
+            flags=tuple(flags),
+            bonus_category=bonus_category,
+            bonus=bonus,
+            penalty=3 if provided <= 2 else 0
+        )
+
+    def score_compiled(self, program, facts):
+        """calculate_score through a compiled program: same score, same analytics"""
+        start_time = time.time()
+        self._scores_calculated += 1
+        final = program(facts, self)
+        self._total_time_ms += (time.time() - start_time) * 1000
+        self._pending_scores[final] += 1
+        return final
+
+    @classmethod
+    def compile_program(cls, eligibility, weights, enable_gradient, fragments=None):
+        """
+        Specialize calculate_score for one eligibility dict.
+
+        Returns program(facts, scorer) → final score. Only the criteria the
+        scheme actually sets are checked, against pre-lowered value sets and
+        relation credit resolved at compile time; float operations run in the
+        scalar order, so scores are bit-identical and the scorer's field
+        match rates move exactly as calculate_score would move them.
+        Criteria of unexpected types compile to the generic scorer.
+
+        Each field scorer is memoized on the profile value it reads; with a
+        `fragments` intern table, schemes with identical fragments share it.
+        """
+        try:
+            fields = [field for field in (
+                cls._compile_field('age', cls._compile_age, eligibility, fragments,
+                                   weights['age'], enable_gradient),
+                cls._compile_field('gender', cls._compile_gender, eligibility, fragments,
+                                   weights['gender']),
+                cls._compile_field('state', cls._compile_state, eligibility, fragments,
+                                   weights['state'], enable_gradient),
+                cls._compile_field('category', cls._compile_category, eligibility, fragments,
+                                   weights['category'], enable_gradient),
+                cls._compile_field('income', cls._compile_income, eligibility, fragments,
+                                   weights['income'], enable_gradient),
+                cls._compile_field('occupation', cls._compile_occupation, eligibility, fragments,
+                                   weights['occupation'], enable_gradient),
+                cls._compile_field('special_flags', cls._compile_flags, eligibility, fragments,
+                                   weights['special']),
+            ) if field is not None]
+
+            elig_cats = eligibility.get('category', [])
+            targeted = frozenset(c.lower() for c in elig_cats) if elig_cats and len(elig_cats) <= 2 else None
+        except (AttributeError, TypeError, ValueError):
+            return cls._generic_program(eligibility)
+
+        applicable_total = 0
+        for _, applicable in fields:
+            applicable_total += applicable
+        scorers = tuple(
+            (score_field.memo, score_field.fact, score_field, round(applicable, 2) > 0)
+            for score_field, applicable in fields
+        )
+        applicable_fields = sum(1 for *_, counted in scorers if counted)
+
+        def program(facts, scorer):
+            matched_counts = scorer._pending_matched
+            total_counts = scorer._pending_total
+            stats = scorer._fragment_stats
+            earned_total = 0
+            matched_fields = 0
+            for memo, fact, score_field, counted in scorers:
+                # Memo hits inline; misses (and unhashable facts) go through score_field
+                try:
+                    entry = memo.get(facts[fact])
+                except TypeError:
+                    entry = None
+                if entry is None:
+                    entry = score_field(facts, matched_counts, total_counts, stats)
+                else:
+                    stats[0] += 1
+                    for slot, matched, total in entry[2]:
+                        matched_counts[slot] += matched
+                        total_counts[slot] += total
+                earned_total += entry[0]
+                if counted and entry[3]:
+                    matched_fields += 1
+
+            if applicable_total == 0:
+                return 50
+
+            bonus = facts.bonus
+            if applicable_fields >= 3 and matched_fields == applicable_fields:
+                bonus += 3
+            if targeted and facts.bonus_category and facts.bonus_category in targeted:
+                bonus += 2
+
+            adjusted = (earned_total / applicable_total) * 100 + bonus - facts.penalty
+            return max(0, min(int(adjusted), 100))
+
+        return program
+
+    @staticmethod
+    def _generic_program(eligibility):
+        """Fallback program: the full scalar breakdown"""
+        def program(facts, scorer):
+            return scorer._build_breakdown(facts.user, eligibility).final_score
+        return program
+
+    # ScoreFacts position of the one fact each field scorer reads (its memo key)
+    FIELD_FACTS = {
+        'age': ScoreFacts._fields.index('age'),
+        'gender': ScoreFacts._fields.index('gender'),
+        'state': ScoreFacts._fields.index('state'),
+        'category': ScoreFacts._fields.index('category'),
+        'income': ScoreFacts._fields.index('income'),
+        'occupation': ScoreFacts._fields.index('occupation'),
+        'special_flags': ScoreFacts._fields.index('flags'),
+    }
+
+    # Profile values remembered per field scorer before its memo resets
+    FRAGMENT_MEMO_SIZE = 512
+
+    @classmethod
+    def _compile_field(cls, field, compile_field, eligibility, fragments, *args):
+        """
+        compile_field(eligibility, *args), memoized, or the scorer already
+        interned for an identical fragment (unhashable criteria aren't shared)
+        """
+        try:
+            key = ScoringColumns.fragment(field, eligibility) if fragments is not None else None
+        except TypeError:
+            key = None
+        if key is not None and key in fragments:
+            return fragments[key]
+
+        compiled = compile_field(eligibility, *args)
+        if compiled is not None:
+            score_field, applicable = compiled
+            compiled = cls._memoized(score_field, cls.FIELD_FACTS[field]), applicable
+        if key is not None:
+            fragments[key] = compiled
+        return compiled
+
+    @classmethod
+    def _memoized(cls, score_field, fact):
+        """
+        score_field(facts, rates) cached on the one profile fact it reads.
+
+        A miss scores into scratch counters and keeps their increments with
+        the result; every call replays them into the scorer's pending
+        match-rate slots, so analytics move exactly as without the memo.
+        Returns memoized_field(facts, matched_counts, total_counts, stats)
+        → (earned, gradient, increments, aligned), where aligned is the
+        rounded gradient ≥ 0.8 test; stats is the scorer's [hits, misses].
+        The memo dict and fact position are exposed for inline lookups.
+        """
+        memo = {}
+        limit = cls.FRAGMENT_MEMO_SIZE
+        slots = cls.RATE_SLOTS
+
+        def counted_score(facts, matched_counts, total_counts):
+            counted = defaultdict(lambda: {'matched': 0, 'total': 0})
+            try:
+                earned, gradient = score_field(facts, counted)
+            finally:
+                # Criteria that raise mid-score were still evaluated
+                increments = tuple(
+                    (slots[rate_field], counter['matched'], counter['total'])
+                    for rate_field, counter in counted.items()
+                )
+                for slot, matched, total in increments:
+                    matched_counts[slot] += matched
+                    total_counts[slot] += total
+            return earned, gradient, increments, round(gradient, 2) >= 0.8
+
+        def memoized_field(facts, matched_counts, total_counts, stats):
+            value = facts[fact]
+            try:
+                entry = memo.get(value)
+            except TypeError:
+                # Unhashable flag value: nothing to key on
+                return counted_score(facts, matched_counts, total_counts)
+            if entry is None:
+                stats[1] += 1
+                entry = counted_score(facts, matched_counts, total_counts)
+                if len(memo) >= limit:
+                    memo.clear()
+                memo[value] = entry
+                return entry
+            stats[0] += 1
+            for slot, matched, total in entry[2]:
+                matched_counts[slot] += matched
+                total_counts[slot] += total
+            return entry
+
+        memoized_field.memo = memo
+        memoized_field.fact = fact
+        return memoized_field
+
+    # Field compilers: (score_field(facts, rates) → (earned, gradient), applicable)
+    # or None when the scheme doesn't set the criterion. Each mirrors its _score_* twin.
+
+    @staticmethod
+    def _compile_age(elig, weight, enable_gradient):
+        min_age = elig.get('min_age')
+        max_age = elig.get('max_age')
+        if min_age is None and max_age is None:
+            return None
+
+        low = min_age if min_age is not None else float('-inf')
+        high = max_age if max_age is not None else float('inf')
+        centered = enable_gradient and min_age is not None and max_age is not None and max_age - min_age > 0
+        if centered:
+            mid = (min_age + max_age) / 2
+            half_span = (max_age - min_age) / 2
+
+        def score_age(facts, rates):
+            counter = rates['age']
+            counter['total'] += 1
+            age = facts.age
+            if age <= 0:
+                return 0, 0
+            if low <= age <= high:
+                counter['matched'] += 1
+                if centered:
+                    gradient = max(0.8, 1.0 - (abs(age - mid) / half_span * 0.2))
+                    return weight * gradient, gradient
+                return weight, 1.0
+            if enable_gradient:
+                distance = low - age if age < low else age - high
+                if distance <= 5:
+                    gradient = max(0, 1.0 - (distance / 5) * 0.8)
+                    earned = weight * gradient
+                    if earned > 0:
+                        counter['matched'] += 1
+                    return earned, gradient
+            return 0, 0
+
+        return score_age, weight
+
+    @staticmethod
+    def _compile_gender(elig, weight):
+        gender_req = elig.get('gender', 'all')
+        if gender_req == 'all':
+            return None
+        required = gender_req.lower()
+
+        def score_gender(facts, rates):
+            counter = rates['gender']
+            counter['total'] += 1
+            if facts.gender and facts.gender == required:
+                counter['matched'] += 1
+                return weight, 1.0
+            return 0, 0
+
+        return score_gender, weight
+
+    @classmethod
+    def _compile_state(cls, elig, weight, enable_gradient):
+        states = elig.get('states', 'all')
+        if states == 'all':
+            def score_state(facts, rates):
+                counter = rates['state']
+                counter['total'] += 1
+                counter['matched'] += 1
+                return weight, 1.0
+            return score_state, weight
+
+        eligible_states = states if isinstance(states, list) else [states]
+        members = frozenset(eligible_states)
+        relations = cls.STATE_RELATIONS
+        neighbors = (
+            relations.holders(relations.mask(eligible_states)) if enable_gradient else frozenset()
+        )
+        credit = cls.RELATION_CREDIT['state']
+        neighbor_earned = weight * credit
+
+        def score_state(facts, rates):
+            counter = rates['state']
+            counter['total'] += 1
+            state = facts.state
+            if not state:
+                return 0, 0
+            if state in members:
+                counter['matched'] += 1
+                return weight, 1.0
+            if state in neighbors:
+                return neighbor_earned, credit
+            return 0, 0
+
+        return score_state, weight
+
+    @classmethod
+    def _compile_category(cls, elig, weight, enable_gradient):
+        categories = elig.get('category')
+        if not categories:
+            return None
+
+        eligible_cats = [c.lower() for c in categories]
+        members = frozenset(eligible_cats)
+        relations = cls.CATEGORY_RELATIONS
+        related = (
+            relations.holders(relations.mask(eligible_cats)) if enable_gradient else frozenset()
+        )
+        credit = cls.RELATION_CREDIT['category']
+        related_earned = weight * credit
+
+        def score_category(facts, rates):
+            counter = rates['category']
+            counter['total'] += 1
+            category = facts.category
+            if not category:
+                return 0, 0
+            if category in members:
+                counter['matched'] += 1
+                return weight, 1.0
+            if category in related:
+                return related_earned, credit
+            return 0, 0
+
+        return score_category, weight
+
+    @staticmethod
+    def _compile_income(elig, weight, enable_gradient):
+        max_income = elig.get('max_income')
+        if max_income is None:
+            return None
+        graded = enable_gradient and max_income > 0
+        marginal_earned = weight * 0.3
+
+        def score_income(facts, rates):
+            counter = rates['income']
+            counter['total'] += 1
+            income = facts.income
+            if income <= 0:
+                return 0, 0
+            if income <= max_income:
+                counter['matched'] += 1
+                if graded:
+                    ratio = income / max_income
+                    gradient = 1.0 if ratio <= 0.5 else 0.95 if ratio <= 0.8 else 0.85
+                    return weight * gradient, gradient
+                return weight, 1.0
+            if enable_gradient and (income - max_income) / max_income <= 0.1:
+                return marginal_earned, 0.3
+            return 0, 0
+
+        return score_income, weight
+
+    @classmethod
+    def _compile_occupation(cls, elig, weight, enable_gradient):
+        occupations = elig.get('occupation')
+        if not occupations:
+            return None
+
+        eligible_occs = tuple(o.lower() for o in occupations)
+        members = frozenset(eligible_occs)
+        # Direct and reverse aliases alike (the table is symmetric)
+        related = cls.OCCUPATION_RELATIONS.holders(cls.OCCUPATION_RELATIONS.mask(eligible_occs))
+        credit = cls.RELATION_CREDIT['occupation']
+        related_earned = weight * credit
+        partial_earned = weight * 0.3
+
+        def score_occupation(facts, rates):
+            counter = rates['occupation']
+            counter['total'] += 1
+            occupation = facts.occupation
+            if not occupation:
+                return 0, 0
+            if occupation in members:
+                counter['matched'] += 1
+                return weight, 1.0
+            if enable_gradient:
+                if occupation in related:
+                    return related_earned, credit
+                for elig_occ in eligible_occs:
+                    if occupation in elig_occ or elig_occ in occupation:
+                        return partial_earned, 0.3
+            return 0, 0
+
+        return score_occupation, weight
+
+    @staticmethod
+    def _compile_flags(elig, weight):
+        required = tuple(
+            (index, flag_key, elig.get(flag_key))
+            for index, flag_key in enumerate(ScoringColumns.FLAGS)
+            if elig.get(flag_key) is not None
+        )
+        if not required:
+            return None
+        applicable = 0
+        for _ in required:
+            applicable += weight
+
+        def score_flags(facts, rates):
+            user_flags = facts.flags
+            score = 0
+            for index, flag_key, expected in required:
+                counter = rates[flag_key]
+                counter['total'] += 1
+                if user_flags[index] == expected:
+                    score += weight
+                    counter['matched'] += 1
+            return score, score / applicable if applicable > 0 else 1.0
+
+        return score_flags, applicable
+
     # ──────────────────────────────────────────────
     # ANALYTICS
     # ──────────────────────────────────────────────
 
+    def _flush_analytics(self):
+        """Fold calculate_score's pending counters into the analytics dicts"""
+        for slot, field in enumerate(self.RATE_FIELDS):
+            if self._pending_total[slot]:
+                counter = self._field_match_rates[field]
+                counter['matched'] += self._pending_matched[slot]
+                counter['total'] += self._pending_total[slot]
+                self._pending_matched[slot] = self._pending_total[slot] = 0
+        for final, count in enumerate(self._pending_scores):
+            if count:
+                self._score_distribution[self.DISTRIBUTION_LABELS[final]] += count
+                self._pending_scores[final] = 0
+
     def get_analytics(self):
         """Get scoring engine analytics"""
+        self._flush_analytics()
         avg_time = round(
             self._total_time_ms / self._scores_calculated, 3
         ) if self._scores_calculated > 0 else 0
@@ -1030,6 +2593,9 @@ class ScoringEngine:
                 'match_rate': f"{rate}%"
             }
 
+        hits, misses = self._fragment_stats
+        lookups = hits + misses
+
         return {
             'total_scores_calculated': self._scores_calculated,
             'total_time_ms': round(self._total_time_ms, 2),
@@ -1039,6 +2605,11 @@ class ScoringEngine:
             'gradient_enabled': self.enable_gradient,
             'score_distribution': dict(self._score_distribution),
             'field_match_rates': match_rates,
+            'fragment_cache': {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': f"{round(hits / lookups * 100, 1) if lookups else 0}%"
+            },
             'available_profiles': WeightProfile.list_profiles()
         }
 
@@ -1048,8 +2619,29 @@ class ScoringEngine:
         self._total_time_ms = 0
         self._score_distribution.clear()
         self._field_match_rates.clear()
+        self._pending_matched[:] = [0] * len(self.RATE_FIELDS)
+        self._pending_total[:] = [0] * len(self.RATE_FIELDS)
+        self._pending_scores[:] = [0] * 101
+        self._fragment_stats[:] = [0, 0]
         logger.info("📊 Scoring analytics reset")
 
+    def __getstate__(self):
+        """Picklable state (e.g. for process-pool workers); analytics start fresh"""
+        state = self.__dict__.copy()
+        state['_scores_calculated'] = 0
+        state['_total_time_ms'] = 0
+        state['_score_distribution'] = defaultdict(int)
+        state['_field_match_rates'] = {}
+        state['_pending_matched'] = [0] * len(self.RATE_FIELDS)
+        state['_pending_total'] = [0] * len(self.RATE_FIELDS)
+        state['_pending_scores'] = [0] * 101
+        state['_fragment_stats'] = [0, 0]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._field_match_rates = defaultdict(lambda: {'matched': 0, 'total': 0})
+
     # ──────────────────────────────────────────────
     # HELPERS
     # ──────────────────────────────────────────────
@@ -1088,10 +2680,22 @@ class ScoringEngine:
 # ──────────────────────────────────────────────
 
 if __name__ == '__main__':
+    import sys
+
     print("=" * 60)
     print("🧪 Scoring Engine Test Mode")
     print("=" * 60)
 
+    # Parity / property checks record failures; the run exits 1 if any failed
+    # (❌ lines in the sample breakdowns are scoring output)
+    failed_checks = []
+
+    def verify(ok, message, indent="   "):
+        print(f"{indent}{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failed_checks.append(message)
+        return ok
+
     engine = ScoringEngine(weight_profile='balanced', enable_gradient=True)
 
     # Test user
@@ -1208,6 +2812,211 @@ if __name__ == '__main__':
     print(f"   {test_schemes[0]['name']}: {comparison['scheme_a']['score']}%")
     print(f"   {test_schemes[1]['name']}: {comparison['scheme_b']['score']}%")
 
+    # Vectorized scoring parity
+    print(f"\n{'═' * 60}")
+    print("🧮 Vectorized Scoring Parity")
+    print(f"{'═' * 60}")
+
+    users = [test_user, {}, {'age': 70, 'gender': 'female', 'is_bpl': 'yes', 'disability': True}]
+    for gradient in (True, False):
+        eng = ScoringEngine(enable_gradient=gradient)
+        matrix = eng.score_profiles(users, eng.compile_columns(test_schemes))
+        mismatches = sum(
+            1
+            for u, user in enumerate(users)
+            for j, scheme in enumerate(test_schemes)
+            if eng.calculate_score(user, scheme['eligibility']) != matrix[u, j]
+        )
+        print(f"   gradient={gradient}: {matrix.size} pairs, {mismatches} mismatches")
+
+    # Seeded random profiles / schemes for the timings below; the parity
+    # properties (score_matrix, score_compiled, upper bounds vs
+    # calculate_score) are checked by: python -m unittest test_scoring
+    import random
+    from test_scoring import random_user, random_scheme
+
+    rng = random.Random(2024)
+    pool_users = [random_user(rng) for _ in range(300)]
+    pool_schemes = [random_scheme(rng) for _ in range(60)]
+
+    # calculate_score (ScoreTally) vs the detailed breakdown
+    print(f"\n{'═' * 60}")
+    print("⚡ Numeric vs Detailed Scoring")
+    print(f"{'═' * 60}")
+
+    pairs = [(user, scheme['eligibility']) for user in pool_users for scheme in pool_schemes]
+    for gradient in (True, False):
+        detailed = ScoringEngine(enable_gradient=gradient)
+        numeric = ScoringEngine(enable_gradient=gradient)
+
+        start = time.perf_counter()
+        detailed_scores = [detailed.calculate_detailed_score(user, elig).final_score for user, elig in pairs]
+        detailed_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        numeric_scores = [numeric.calculate_score(user, elig) for user, elig in pairs]
+        numeric_ms = (time.perf_counter() - start) * 1000
+
+        a, b = detailed.get_analytics(), numeric.get_analytics()
+        same = detailed_scores == numeric_scores and all(
+            a[key] == b[key]
+            for key in ('total_scores_calculated', 'score_distribution', 'field_match_rates')
+        )
+        print(f"   gradient={gradient}: {len(pairs):,} pairs")
+        print(f"      Detailed (ScoreBreakdown): {detailed_ms:8.1f}ms "
+              f"({detailed_ms * 1000 / len(pairs):.2f}µs/score)")
+        print(f"      Numeric (ScoreTally):      {numeric_ms:8.1f}ms "
+              f"({numeric_ms * 1000 / len(pairs):.2f}µs/score) → {detailed_ms / numeric_ms:.1f}x")
+        verify(same, "Same scores and analytics", indent="      ")
+
+    # Lazily rendered breakdowns
+    print(f"\n{'═' * 60}")
+    print("🧱 Lazy ScoreBreakdown")
+    print(f"{'═' * 60}")
+
+    import tracemalloc
+
+    lazy = ScoringEngine()
+    start = time.perf_counter()
+    for user, elig in pairs:
+        lazy.calculate_detailed_score(user, elig)
+    build_us = (time.perf_counter() - start) * 1e6 / len(pairs)
+
+    start = time.perf_counter()
+    for user, elig in pairs:
+        lazy.calculate_detailed_score(user, elig).to_dict()
+    render_us = (time.perf_counter() - start) * 1e6 / len(pairs)
+
+    tracemalloc.start()
+    kept = [lazy.calculate_detailed_score(user, elig) for user, elig in pairs[:2000]]
+    unrendered, _ = tracemalloc.get_traced_memory()
+    for breakdown in kept:
+        breakdown.to_dict()
+    rendered, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"   Build only:        {build_us:6.2f}µs/breakdown, {unrendered / len(kept):6.0f} B retained")
+    print(f"   Build + to_dict(): {render_us:6.2f}µs/breakdown, {rendered / len(kept):6.0f} B retained")
+
+    # Rendered views are read-only: edits fail instead of being dropped
+    view = kept[0]
+    rejected = 0
+    for mutate in (
+        lambda: view.bonuses.append({'name': 'x', 'points': 1, 'reason': ''}),
+        lambda: view.notes.append("x"),
+        lambda: view.field_scores.__setitem__('age', {}),
+        lambda: view.field_scores['state'].__setitem__('earned', 0),
+    ):
+        try:
+            mutate()
+        except (AttributeError, TypeError):
+            rejected += 1
+    verify(rejected == 4, f"Mutating field_scores / bonuses / notes raises ({rejected}/4)")
+
+    # Interned eligibility fragments and memoized field scorers
+    print(f"\n{'═' * 60}")
+    print("🧠 Fragment Memo")
+    print(f"{'═' * 60}")
+
+    memo_engine = ScoringEngine()
+    columns = memo_engine.compile_columns(pool_schemes)
+    counts = columns.fragment_counts()
+    print(f"   {columns.size} schemes → distinct fragments: "
+          + ", ".join(f"{field} {count}" for field, count in counts.items()))
+
+    programs = memo_engine.compile_programs(columns)
+    matrix = memo_engine.score_matrix(pool_users, columns)
+    mismatches = 0
+    for u, user in enumerate(pool_users):
+        facts = memo_engine.score_facts(user)
+        for s, program in enumerate(programs):
+            if memo_engine.score_compiled(program, facts) != matrix[u, s]:
+                mismatches += 1
+    verify(not mismatches, f"{len(pool_users) * columns.size:,} compiled scores, "
+          f"{mismatches} differ from score_matrix")
+    print(f"   Memo: {memo_engine.get_analytics()['fragment_cache']}")
+
+    # Scalar relation checks (frozensets) vs the original list scans of the maps
+    print(f"\n{'═' * 60}")
+    print("🕸️ Relation Tables")
+    print(f"{'═' * 60}")
+
+    def scan_state(user_state, eligible_states):
+        for neighbor in ScoringEngine.STATE_NEIGHBORS.get(user_state, []):
+            if neighbor in eligible_states:
+                return 0.2
+        return 0
+
+    def scan_category(user_cat, eligible_cats):
+        for rel_cat in ScoringEngine.RELATED_CATEGORIES.get(user_cat, []):
+            if rel_cat in eligible_cats:
+                return 0.15
+        return 0
+
+    def scan_occupation(user_occ, eligible_occs):
+        for rel_occ in ScoringEngine.RELATED_OCCUPATIONS.get(user_occ, []):
+            if rel_occ in eligible_occs:
+                return 0.5
+        for elig_occ in eligible_occs:
+            if user_occ in ScoringEngine.RELATED_OCCUPATIONS.get(elig_occ, []):
+                return 0.5
+        for elig_occ in eligible_occs:
+            if user_occ in elig_occ or elig_occ in user_occ:
+                return 0.3
+        return 0
+
+    relation_engine = ScoringEngine()
+    checks = [
+        ('state', scan_state, relation_engine._check_state_proximity,
+         list(ScoringEngine.STATE_RELATIONS.ids) + ['Ladakh', 'Atlantis']),
+        ('category', scan_category, relation_engine._check_category_relation,
+         list(ScoringEngine.CATEGORY_RELATIONS.ids) + ['ews']),
+        ('occupation', scan_occupation, relation_engine._check_occupation_relation,
+         list(ScoringEngine.OCCUPATION_RELATIONS.ids) + ['farm', 'engineer', 'daily_wage']),
+    ]
+    for field, scan, check, values in checks:
+        cases = [
+            (value, rng.sample(values, rng.randint(0, 5)))
+            for value in values for _ in range(50)
+        ]
+        mismatches = sum(scan(value, eligible) != check(value, eligible) for value, eligible in cases)
+
+        start = time.perf_counter()
+        for value, eligible in cases:
+            scan(value, eligible)
+        scan_us = (time.perf_counter() - start) * 1e6 / len(cases)
+        start = time.perf_counter()
+        for value, eligible in cases:
+            check(value, eligible)
+        sets_us = (time.perf_counter() - start) * 1e6 / len(cases)
+
+        table = ScoringEngine.RELATION_TABLES[field]
+        verify(not mismatches, f"{field}: {len(table)} values, "
+              f"{len(cases):,} cases, {mismatches} differ | "
+              f"scan {scan_us:.2f}µs → frozenset {sets_us:.2f}µs")
+
+    # Vectorized credit rows: per-scheme scalar loop vs the columns' bitsets
+    wide = [scheme for _ in range(20) for scheme in pool_schemes]
+    scalar_ms = bits_ms = 0.0
+    mismatches = rows = 0
+    for field, _, _, values in checks:
+        columns = relation_engine.compile_columns(wide)
+        for value in values:
+            start = time.perf_counter()
+            expected = np.array([
+                relation_engine._categorical_gradient(field, value, elig)
+                for elig in columns.eligibilities
+            ], dtype=float)
+            scalar_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            row = relation_engine._credit_row(columns, field, value)
+            bits_ms += (time.perf_counter() - start) * 1000
+            mismatches += not np.array_equal(row, expected)
+            rows += 1
+    verify(not mismatches, f"{rows} credit rows × {len(wide)} schemes, "
+          f"{mismatches} differ | scalar {scalar_ms:.1f}ms → bitset {bits_ms:.1f}ms "
+          f"(bitsets built once per field)")
+
     # Analytics
     print(f"\n{'═' * 60}")
     print("📊 Engine Analytics")
@@ -1220,4 +3029,9 @@ if __name__ == '__main__':
     print(f"   Field match rates: {analytics['field_match_rates']}")
 
     print(f"\n{repr(engine)}")
+    if failed_checks:
+        print(f"\n❌ {len(failed_checks)} check(s) failed:")
+        for message in failed_checks:
+            print(f"   - {message}")
+        sys.exit(1)
     print("\n✅ All tests complete!")
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Saarthi AI - Chatbot Recommendation Tests
+=========================================
+Run with: python -m unittest test_chatbot   (from backend/)
+"""
+
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from chatbot import GovSchemeBot
+from matching_engine import MatchingEngine
+
+SCHEMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+
+# One field extracted per chat turn, as EntityExtractor fills the profile in
+TURNS = [
+    {'occupation': 'farmer'},
+    {'state': 'Bihar'},
+    {'age': 28},
+    {'gender': 'male'},
+    {'category': 'obc'},
+    {'state': 'Uttar Pradesh'},
+    {'age': 62},
+]
+
+
+def build_bot(schemes, matcher):
+    # The bot reports model/scheme loading with print(); keep test output clean
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        bot = GovSchemeBot(schemes=schemes, matcher=matcher)
+    return bot, out.getvalue()
+
+
+class PersonalRecommendationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SCHEMES_PATH, 'r', encoding='utf-8') as f:
+            cls.schemes = json.load(f).get('schemes', [])
+
+    def recommend(self, bot, session_id, fields):
+        bot.memory.update_user_info(session_id, fields)
+        context = {'session_id': session_id}
+        bot._personal_recommendations(session_id, context)
+        merged = {**context, **bot.memory.get_user_info(session_id)}
+        return merged, [scheme['id'] for scheme in bot.memory.get_last_schemes(session_id)]
+
+    def test_engine_ranks_chat_recommendations(self):
+        """With an engine, chat recommendations are the recommendation form's top 8"""
+        matcher = MatchingEngine(self.schemes)
+        bot, _ = build_bot(self.schemes, matcher)
+        reference = MatchingEngine(self.schemes)
+
+        for fields in TURNS:
+            merged, recommended = self.recommend(bot, 'chat-1', fields)
+            expected = [s['id'] for s in reference.find_matches(merged, max_results=8)]
+            self.assertEqual(recommended, expected)
+        self.assertGreater(matcher.get_performance_stats()['sessions']['delta_matches'], 0)
+
+        bot.clear_session('chat-1')
+        self.assertEqual(matcher.get_performance_stats()['sessions']['active_sessions'], 0)
+
+    def test_without_engine_uses_basic_filter(self):
+        """Without an engine the fallback is explicit: a warning and the searcher's filter"""
+        bot, output = build_bot(self.schemes, None)
+        self.assertIn("no matching engine", output)
+
+        for fields in TURNS:
+            merged, recommended = self.recommend(bot, 'chat-2', fields)
+            expected = [s['id'] for s in bot.searcher.get_for_user_profile(merged)[:8]]
+            self.assertEqual(recommended, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Saarthi AI - Batch Matching CLI Tests
+=====================================
+Run with: python -m unittest test_match_cli   (from backend/)
+"""
+
+import io
+import json
+import os
+import unittest
+
+from matching_engine import MatchingEngine
+from match_cli import BatchRunner, read_profiles
+
+SCHEMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+
+PROFILE = {
+    'age': 30, 'gender': 'female', 'state': 'Bihar', 'category': 'obc',
+    'annual_income': 100000, 'occupation': 'farmer'
+}
+
+
+class RecordingOutput(io.StringIO):
+    """StringIO that counts the result lines written so far"""
+
+    @property
+    def lines(self):
+        return self.getvalue().count("\n")
+
+
+class BatchRunnerStreamingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SCHEMES_PATH, 'r', encoding='utf-8') as f:
+            cls.engine = MatchingEngine(json.load(f).get('schemes', []))
+
+    def run_rows(self, rows, chunk_size):
+        output = RecordingOutput()
+        runner = BatchRunner(self.engine, output, chunk_size=chunk_size)
+        written_when_read = []
+
+        def source():
+            for row in rows:
+                written_when_read.append(output.lines)
+                yield row
+
+        summary = runner.run(source())
+        return output, summary, written_when_read
+
+    def test_all_invalid_input_keeps_streaming(self):
+        rows = read_profiles(io.StringIO("not json\n" * 100), 'jsonl')
+        output, summary, written_when_read = self.run_rows(rows, chunk_size=10)
+
+        # Every full chunk of bad rows is written before the next chunk is read
+        for row_index, written in enumerate(written_when_read):
+            self.assertEqual(written, row_index // 10 * 10)
+        self.assertEqual(summary['invalid'], 100)
+        self.assertEqual(output.lines, 100)
+
+    def test_mixed_rows_keep_input_order(self):
+        lines = []
+        for i in range(25):
+            if i % 3:
+                lines.append("{bad")
+            else:
+                lines.append(json.dumps(PROFILE))
+        rows = read_profiles(io.StringIO("\n".join(lines)), 'jsonl')
+        output, summary, _ = self.run_rows(rows, chunk_size=4)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([r['row'] for r in records], list(range(1, 26)))
+        self.assertEqual([r['valid'] for r in records], [i % 3 == 0 for i in range(25)])
+        self.assertEqual(summary['valid'] + summary['invalid'], 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Saarthi AI - Scoring Parity Tests
+=================================
+calculate_score is the reference; the vectorized (score_matrix), compiled
+(score_compiled), upper-bound and relation-table paths must agree with it.
+Run with: python -m unittest test_scoring   (from backend/)
+"""
+
+import json
+import os
+import random
+import unittest
+
+import numpy as np
+
+from scoring import ScoringEngine, ScoringColumns, WeightProfile
+
+SCHEMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemes.json')
+
+STATES = ['Bihar', 'Delhi', 'Tamil Nadu', 'Kerala', 'Uttar Pradesh', 'Goa', 'Atlantis', '']
+OCCUPATIONS = ['farmer', 'student', 'labour', 'daily_wage', 'self_employed', 'agriculture',
+               'artisan', 'teacher', '  Farmer ', '']
+FLAG_VALUES = [True, False, 'true', 'false', 'yes', '1', 1, 0]
+
+
+def random_user(rng):
+    """Profile with missing fields, odd casing, string numbers and flag spellings"""
+    user = {}
+    if rng.random() < 0.95:
+        user['age'] = rng.choice([0, 14, 18, 21, 35, 40, 59, 60, 65, rng.randint(1, 100), '45'])
+    if rng.random() < 0.9:
+        user['gender'] = rng.choice(['male', 'female', 'Female ', 'transgender', ''])
+    if rng.random() < 0.9:
+        user['state'] = rng.choice(STATES + [' Bihar'])
+    if rng.random() < 0.8:
+        user['category'] = rng.choice(['general', 'obc', 'SC', 'st', 'ews', 'minority', ''])
+    if rng.random() < 0.9:
+        user['annual_income'] = rng.choice([0, 1, 100000, 150000, 200000, 250000, 800000,
+                                            rng.randint(1, 1000000), '120000'])
+    if rng.random() < 0.8:
+        user['occupation'] = rng.choice(OCCUPATIONS)
+    for flag in ScoringColumns.FLAGS:
+        if rng.random() < 0.5:
+            user[flag] = rng.choice(FLAG_VALUES)
+    return user
+
+
+def random_scheme(rng):
+    """Eligibility with scalar-or-list fields, 'all', band edges and flag spellings"""
+    elig = {}
+    if rng.random() < 0.6:
+        elig['min_age'] = rng.choice([0, 14, 18, 21, 60, 17.5])
+    if rng.random() < 0.6:
+        elig['max_age'] = rng.choice([18, 35, 40, 59, 60, 100])
+    if rng.random() < 0.6:
+        # Include the income gradient's band edges relative to the user pool
+        base = rng.choice([100000, 200000, 250000])
+        elig['max_income'] = rng.choice([base, int(base * 0.8), int(base * 1.1)])
+    if rng.random() < 0.5:
+        elig['gender'] = rng.choice(['all', 'female', 'male', 'Female', 'any'])
+    if rng.random() < 0.6:
+        elig['states'] = rng.choice(['all', 'Bihar', rng.sample(STATES[:6], rng.randint(1, 3))])
+    if rng.random() < 0.5:
+        elig['category'] = rng.choice(['all', 'sc', ['obc', 'sc', 'st'], ['General'], ['ews']])
+    if rng.random() < 0.5:
+        elig['occupation'] = rng.choice(['all', 'farm', ['farmer'], ['student', 'labour'],
+                                         ['Self_Employed'], ['artisan', 'daily_wage']])
+    for flag in ScoringColumns.FLAGS:
+        if rng.random() < 0.2:
+            elig[flag] = rng.choice([True, False, 'true', 1])
+    return {'eligibility': elig}
+
+
+class ScoringParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Seeded, so a failure reproduces
+        rng = random.Random(2024)
+        cls.users = [random_user(rng) for _ in range(200)]
+        cls.schemes = [random_scheme(rng) for _ in range(60)]
+        with open(SCHEMES_PATH, 'r', encoding='utf-8') as f:
+            cls.schemes += json.load(f).get('schemes', [])
+
+    def engines(self):
+        for profile in WeightProfile.list_profiles():
+            for gradient in (True, False):
+                with self.subTest(profile=profile, gradient=gradient):
+                    yield ScoringEngine(weight_profile=profile, enable_gradient=gradient)
+
+    def reference(self, engine):
+        return np.array([
+            [engine.calculate_score(user, scheme['eligibility']) for scheme in self.schemes]
+            for user in self.users
+        ])
+
+    def assertSameScores(self, actual, expected):
+        mismatched = np.argwhere(actual != expected)
+        if len(mismatched):
+            u, s = mismatched[0]
+            self.fail(f"{len(mismatched)} scores differ; first: user {self.users[u]!r}, "
+                      f"eligibility {self.schemes[s]['eligibility']!r}: "
+                      f"{actual[u, s]} != {expected[u, s]}")
+
+    def test_score_matrix_matches_calculate_score(self):
+        for engine in self.engines():
+            self.assertSameScores(engine.score_matrix(self.users, self.schemes), self.reference(engine))
+
+    def test_score_compiled_matches_calculate_score(self):
+        for engine in self.engines():
+            programs = engine.compile_programs(engine.compile_columns(self.schemes))
+            compiled = []
+            for user in self.users:
+                facts = engine.score_facts(user)
+                if facts is None:
+                    compiled.append([engine.calculate_score(user, s['eligibility']) for s in self.schemes])
+                else:
+                    compiled.append([engine.score_compiled(program, facts) for program in programs])
+            self.assertSameScores(np.array(compiled), self.reference(engine))
+
+    def test_score_compiled_keeps_analytics(self):
+        generic, compiled = ScoringEngine(), ScoringEngine()
+        programs = compiled.compile_programs(compiled.compile_columns(self.schemes))
+        for user in self.users:
+            facts = compiled.score_facts(user)
+            for scheme, program in zip(self.schemes, programs):
+                generic.calculate_score(user, scheme['eligibility'])
+                if facts is None:
+                    compiled.calculate_score(user, scheme['eligibility'])
+                else:
+                    compiled.score_compiled(program, facts)
+        for key in ('total_scores_calculated', 'score_distribution', 'field_match_rates'):
+            self.assertEqual(compiled.get_analytics()[key], generic.get_analytics()[key], key)
+
+    def test_detailed_score_matches_calculate_score(self):
+        for gradient in (True, False):
+            engine = ScoringEngine(enable_gradient=gradient)
+            for user in self.users[:50]:
+                for scheme in self.schemes:
+                    eligibility = scheme['eligibility']
+                    self.assertEqual(
+                        engine.calculate_detailed_score(user, eligibility).final_score,
+                        engine.calculate_score(user, eligibility),
+                        (gradient, user, eligibility)
+                    )
+
+    def test_upper_bounds_never_below_score(self):
+        for engine in self.engines():
+            columns = engine.compile_columns(self.schemes)
+            expected = self.reference(engine)
+            for u, user in enumerate(self.users):
+                bounds = engine.score_upper_bounds(user, columns)
+                self.assertTrue((bounds >= expected[u]).all(), user)
+
+    def test_score_matrix_rows_and_columns(self):
+        engine = ScoringEngine()
+        columns = engine.compile_columns(self.schemes)
+        matrix = engine.score_matrix(self.users, columns)
+        self.assertTrue(((matrix >= 0) & (matrix <= 100)).all())
+
+        order = list(range(len(self.schemes)))
+        random.Random(7).shuffle(order)
+        permuted = engine.score_matrix(self.users, [self.schemes[i] for i in order])
+        self.assertTrue((permuted == matrix[:, order]).all())
+
+        chunked = np.vstack([engine.score_matrix(self.users[i:i + 7], columns)
+                             for i in range(0, len(self.users), 7)])
+        self.assertTrue((chunked == matrix).all())
+
+        self.assertEqual(engine.score_matrix(self.users[0], columns).shape, (1, columns.size))
+        self.assertEqual(engine.score_matrix([], columns).shape, (0, columns.size))
+
+    def test_relation_credit_rows_match_scalar_checks(self):
+        engine = ScoringEngine()
+        columns = engine.compile_columns(self.schemes)
+        for field, table in ScoringEngine.RELATION_TABLES.items():
+            for value in list(table.ids) + ['Atlantis', 'ews', 'farm', '']:
+                with self.subTest(field=field, value=value):
+                    expected = np.array([
+                        engine._categorical_gradient(field, value, eligibility)
+                        for eligibility in columns.eligibilities
+                    ], dtype=float)
+                    np.testing.assert_array_equal(engine._credit_row(columns, field, value), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()